@@ -24,6 +24,8 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=datas,
+    # whisper/torch são importados sob demanda (primeira transcrição por IA);
+    # listados aqui para entrarem no bundle mesmo sem import no nível do módulo
     hiddenimports=[
         'customtkinter',
         'yt_dlp',
@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+"""Compara os motores de transcrição num trecho de áudio de referência.
+
+Para cada motor instalado mede o tempo de carga do modelo, o fator de tempo
+real (RTF = tempo de transcrição / duração do áudio; menor é melhor) e, se
+houver a transcrição de referência (.txt ao lado do áudio), a taxa de erro
+por palavra (WER).
+
+O trecho padrão é ``benchmarks/data/jfk.wav`` (11 s do discurso de posse de
+John F. Kennedy, 1961, obra do governo dos EUA em domínio público) com a
+transcrição em ``jfk.txt``. ``--clip`` aceita qualquer arquivo que o FFmpeg
+leia; um trecho de 1 a 5 minutos dá um RTF mais estável.
+
+Uso: python benchmarks/bench_backends.py [--clip trecho.wav] [--model base] [--engines whisper,faster-whisper]
+"""
+import os
+import re
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from audio import SAMPLE_RATE, load_audio  # noqa: E402
+from backends import BACKENDS, get_backend  # noqa: E402
+from inference_engine import transcribe_audio  # noqa: E402
+
+CLIP = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "jfk.wav")
+
+
+def words(text):
+    return re.findall(r"\w+", text.lower())
+
+
+def wer(reference, hypothesis):
+    """Distância de edição entre as palavras, dividida pelo tamanho da referência"""
+    ref, hyp = words(reference), words(hypothesis)
+    previous = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, 1):
+        current = [i]
+        for j, h in enumerate(hyp, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (r != h)))
+        previous = current
+    return previous[-1] / max(1, len(ref))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clip", default=CLIP, help="áudio de teste (fala)")
+    parser.add_argument("--reference", help="transcrição correta (padrão: .txt com o mesmo nome)")
+    parser.add_argument("--model", default="base")
+    parser.add_argument("--device", default="cpu")
+    parser.add_argument("--engines", default=",".join(BACKENDS), help="motores separados por vírgula")
+    parser.add_argument("--language", help="idioma do áudio (ex.: pt); sem ele o motor detecta")
+    parser.add_argument("--threads", type=int, default=os.cpu_count(), help="threads de CPU por motor")
+    parser.add_argument("--repeat", type=int, default=2, help="transcrições por motor (vale a mais rápida)")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.clip):
+        sys.exit(f"❌ Áudio não encontrado: {args.clip}")
+    reference_path = args.reference or os.path.splitext(args.clip)[0] + ".txt"
+    reference = None
+    if os.path.exists(reference_path):
+        with open(reference_path, "r", encoding="utf-8") as f:
+            reference = f.read()
+
+    audio = load_audio(args.clip)
+    duration = len(audio) / SAMPLE_RATE
+    print(f"🎧 {os.path.basename(args.clip)}: {duration:.1f}s | modelo {args.model} | {args.device}"
+          f" | {args.threads} threads")
+    # O trecho padrão é em inglês; em outro áudio o motor detecta o idioma
+    language = args.language or ("en" if args.clip == CLIP else None)
+    options = {"language": language} if language else {}
+
+    for name in args.engines.split(","):
+        backend = get_backend(name.strip())
+        if not backend.available():
+            print(f"⏭️ {backend.name}: não instalado")
+            continue
+        started = time.perf_counter()
+        model = backend.load(args.model, args.device, threads=args.threads)
+        load_time = time.perf_counter() - started
+        best, text = None, ""
+        for _ in range(max(1, args.repeat)):
+            started = time.perf_counter()
+            text = transcribe_audio(model, audio, **options)
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        accuracy = f" | WER {wer(reference, text):.1%}" if reference is not None else ""
+        print(f"⏱️ {backend.name}: carga {load_time:.1f}s | transcrição {best:.1f}s"
+              f" | RTF {best / duration:.3f}{accuracy}")
+        del model
+
+
+if __name__ == "__main__":
+    main()
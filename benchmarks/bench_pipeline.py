@@ -0,0 +1,390 @@
+#!/usr/bin/env python
+"""Roda o pipeline completo (``TranscriberCore.run_playlist``) sem acessar o YouTube.
+
+Um ``YoutubeDL`` falso serve uma playlist sintética de ``--videos`` vídeos.
+Uma fração deles (``--caption-ratio``) tem legenda VTT; os demais só têm
+áudio e seguem para a IA. Legendas e áudios vêm de um servidor HTTP local
+(``--transport http``) ou direto do disco (``file``). São gerados na hora:
+um VTT de ``--vtt-minutes`` e um WAV de ``--clip-seconds`` com tons e
+silêncios. Com ``--fixtures PASTA``, os arquivos .vtt e de áudio dessa pasta
+são usados em rodízio (ex.: trechos com fala real).
+
+Cada combinação de ``--workers`` x ``--engines`` roda num processo novo.
+O relatório traz vídeos/min, os percentis de latência por etapa (das
+métricas do ``TranscriberCore``) e o pico de memória (RSS) do processo
+principal e do maior processo de inferência. ``captions`` desativa a IA e
+mede só o caminho das legendas; os motores não instalados (ou sem FFmpeg)
+são pulados.
+
+``--json`` grava os resultados; ``--baseline`` compara com uma execução
+anterior e sai com código 1 se alguma combinação ficar mais lenta que
+``--tolerance``.
+
+Uso: python benchmarks/bench_pipeline.py [--videos 200] [--workers 1,2,4] [--engines captions,whisper]
+"""
+import os
+import sys
+import json
+import math
+import time
+import wave
+import array
+import random
+import shutil
+import argparse
+import resource
+import tempfile
+import statistics
+import subprocess
+import threading
+import urllib.request
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.insert(0, SRC)
+
+WATCH = "https://www.youtube.com/watch?v="
+PLAYLIST = "https://www.youtube.com/playlist?list=BENCH"
+AUDIO_EXTS = (".wav", ".mp3", ".m4a", ".webm", ".opus", ".ogg", ".flac")
+STAGES = ("playlist_fetch", "subtitle_probe", "caption_download", "vtt_parse", "audio_download",
+          "vad_scan", "decode", "model_load", "inference", "write")
+WORDS = ("o vídeo mostra como configurar o servidor e depois explica cada passo da instalação "
+         "para quem está começando agora com a ferramenta de linha de comando").split()
+
+
+def timestamp(seconds):
+    return f"{seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}.000"
+
+
+def make_vtt(path, minutes, rng):
+    """Legenda no estilo das automáticas do YouTube: uma fala a cada 4 s"""
+    lines = ["WEBVTT", ""]
+    for i in range(int(minutes * 15)):
+        text = " ".join(rng.choice(WORDS) for _ in range(8))
+        lines += [f"{timestamp(i * 4)} --> {timestamp(i * 4 + 4)}", text, ""]
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines))
+
+
+def make_wav(path, seconds, rng, sr=16000):
+    """Tons com modulação separados por pausas (há silêncio para o VAD cortar)"""
+    samples = array.array("h")
+    t = 0
+    while len(samples) < seconds * sr:
+        burst, pause = rng.uniform(1.0, 4.0), rng.choice((0.3, 0.3, 2.5))
+        freq = rng.uniform(150, 400)
+        for n in range(int(burst * sr)):
+            envelope = 0.5 + 0.5 * math.sin(2 * math.pi * 4 * n / sr)
+            samples.append(int(8000 * envelope * math.sin(2 * math.pi * freq * t / sr)))
+            t += 1
+        samples.extend([0] * int(pause * sr))
+    with wave.open(path, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(sr)
+        w.writeframes(samples[:int(seconds * sr)].tobytes())
+
+
+def prepare_fixtures(folder, args):
+    """Lista (vtts, áudios) em ``args.fixtures`` ou gerados em ``folder``"""
+    if args.fixtures:
+        names = sorted(os.listdir(args.fixtures))
+        vtts = [os.path.join(args.fixtures, n) for n in names if n.endswith(".vtt")]
+        audios = [os.path.join(args.fixtures, n) for n in names if n.endswith(AUDIO_EXTS)]
+        if vtts and audios:
+            return vtts, audios
+        sys.exit(f"❌ {args.fixtures} precisa ter ao menos um .vtt e um áudio")
+    rng = random.Random(args.seed)
+    vtt, wav = os.path.join(folder, "sample.vtt"), os.path.join(folder, "sample.wav")
+    make_vtt(vtt, args.vtt_minutes, rng)
+    make_wav(wav, args.clip_seconds, rng)
+    return [vtt], [wav]
+
+
+class Catalog:
+    """Playlist sintética: quais vídeos têm legenda e de onde vêm os arquivos"""
+
+    def __init__(self, videos, caption_ratio, vtts, audios, base_url=None, seed=0, latency=0.0):
+        rng = random.Random(seed)
+        self.vtts, self.audios = vtts, audios
+        self.base_url = base_url
+        self.latency = latency
+        self.videos = {}
+        for i in range(videos):
+            vid_id = f"bench{i:05d}"
+            self.videos[vid_id] = {
+                "index": i,
+                "captions": rng.random() < caption_ratio,
+                "duration": 60 * rng.randint(1, 20),
+            }
+
+    def url(self, path):
+        if self.base_url:
+            return f"{self.base_url}/{os.path.basename(path)}"
+        return path
+
+    def entries(self):
+        return [{"_type": "url", "id": vid_id, "url": WATCH + vid_id, "title": f"Vídeo {v['index']}",
+                 "duration": v["duration"]} for vid_id, v in self.videos.items()]
+
+    def info(self, vid_id):
+        video = self.videos[vid_id]
+        vtt = self.vtts[video["index"] % len(self.vtts)]
+        audio = self.audios[video["index"] % len(self.audios)]
+        subtitles = {"pt": [{"ext": "vtt", "url": self.url(vtt)}]} if video["captions"] else {}
+        return {
+            "id": vid_id, "title": f"Vídeo {video['index']}", "duration": video["duration"],
+            "language": "pt", "subtitles": subtitles, "automatic_captions": {},
+            "formats": [{"format_id": "audio", "vcodec": "none", "acodec": "pcm",
+                         "ext": os.path.splitext(audio)[1][1:], "url": self.url(audio),
+                         "filesize": os.path.getsize(audio)}],
+        }
+
+
+class FakeYoutubeDL:
+    """O suficiente da API do ``yt_dlp.YoutubeDL`` usada pelo TranscriberCore"""
+
+    catalog = None
+
+    def __init__(self, opts=None):
+        self.opts = opts or {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def extract_info(self, url, download=False, process=True, **kwargs):
+        time.sleep(self.catalog.latency)
+        if url.startswith(WATCH):
+            info = self.catalog.info(url[len(WATCH):])
+            return self.process_ie_result(info, download=True) if download else info
+        entries = self.catalog.entries()
+        if self.opts.get("lazy_playlist"):
+            entries = iter(entries)
+        return {"_type": "playlist", "id": "BENCH", "title": "Benchmark", "entries": entries}
+
+    def urlopen(self, url):
+        if url.startswith("http"):
+            return urllib.request.urlopen(url, timeout=30)
+        return open(url, "rb")
+
+    def process_ie_result(self, info, download=True):
+        fmt = info["formats"][0]
+        result = dict(info, ext=fmt["ext"])
+        path = self.prepare_filename(result)
+        with self.urlopen(fmt["url"]) as source, open(path, "wb") as target:
+            while True:
+                block = source.read(64 * 1024)
+                if not block:
+                    break
+                target.write(block)
+                for hook in self.opts.get("progress_hooks", []):
+                    hook({"status": "downloading"})
+        return result
+
+    def prepare_filename(self, info):
+        return self.opts["outtmpl"] % {"ext": info["ext"]}
+
+
+def serve(folders):
+    """Servidor HTTP local que atende arquivos de várias pastas pelo nome"""
+    class Handler(SimpleHTTPRequestHandler):
+        def translate_path(self, path):
+            name = os.path.basename(path.split("?", 1)[0])
+            for folder in folders:
+                if os.path.exists(os.path.join(folder, name)):
+                    return os.path.join(folder, name)
+            return os.path.join(folders[0], name)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run_child(config):
+    """Uma combinação (workers, motor) num processo novo. Retorna o resultado como dict."""
+    import audio
+    import transcriber
+
+    vtts, audios = config["vtts"], config["audios"]
+    server = None
+    base_url = None
+    if config["transport"] == "http":
+        server = serve(sorted({os.path.dirname(p) for p in vtts + audios}))
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    FakeYoutubeDL.catalog = Catalog(config["videos"], config["caption_ratio"], vtts, audios, base_url,
+                                    config["seed"], config["latency"])
+    transcriber.YoutubeDL = audio.YoutubeDL = FakeYoutubeDL
+
+    engine = config["engine"]
+    core = transcriber.TranscriberCore(
+        logger_callback=lambda message: None,
+        model_size=config["model"],
+        engine="whisper" if engine == "captions" else engine,
+        inference_mode=config["inference"],
+        batch_size=config["batch_size"],
+        use_cache=False,
+        prefetch_audio=config["prefetch"],
+    )
+    if engine == "captions":
+        core.has_whisper = False
+    # Servidor local: o limite de taxa do YouTube (4/s) esconderia o resto do pipeline
+    core.scheduler.rate_per_host = core.scheduler.burst = config["rate"]
+
+    finished = {}
+    core.progress_callback = lambda event: finished.update(event) if event["event"] == "finish" else None
+    output = tempfile.mkdtemp(prefix="bench_pipeline_")
+    try:
+        started = time.perf_counter()
+        core.run_playlist(PLAYLIST, output, max_workers=config["workers"])
+        elapsed = time.perf_counter() - started
+    finally:
+        shutil.rmtree(output, ignore_errors=True)
+        if server is not None:
+            server.shutdown()
+
+    total = finished.get("total") or 0
+    # ru_maxrss em KB no Linux; RUSAGE_CHILDREN é o maior processo filho já encerrado
+    return {
+        "engine": engine, "workers": config["workers"], "videos": total,
+        "success": finished.get("success") or 0, "elapsed": elapsed,
+        "videos_per_min": total / elapsed * 60 if elapsed else 0.0,
+        "stages": (finished.get("metrics") or {}).get("stages", {}),
+        "counters": (finished.get("metrics") or {}).get("counters", {}),
+        "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "children_rss_mb": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024,
+    }
+
+
+def measure(config):
+    proc = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", json.dumps(config)],
+                          capture_output=True, text=True)
+    if proc.returncode != 0:
+        last = (proc.stderr.strip().splitlines() or ["?"])[-1]
+        return None, last
+    return json.loads(proc.stdout.strip().splitlines()[-1]), None
+
+
+def skip_reason(engine):
+    if engine == "captions":
+        return None
+    from backends import BACKENDS, get_backend
+    if engine not in BACKENDS:
+        return "motor desconhecido"
+    if shutil.which("ffmpeg") is None:
+        return "FFmpeg não encontrado"
+    if not get_backend(engine).available():
+        return "não instalado"
+    return None
+
+
+def report(result, runs):
+    stages = result["stages"]
+    print(f"⏱️ {result['engine']} | {result['workers']} workers: {result['videos_per_min']:.1f} vídeos/min"
+          f" ({result['success']}/{result['videos']} ok, mediana de {runs})"
+          f" | RSS {result['rss_mb']:.0f} MB + inferência {result['children_rss_mb']:.0f} MB")
+    for name in STAGES + tuple(sorted(set(stages) - set(STAGES))):
+        if name in stages:
+            s = stages[name]
+            print(f"   {name:<17} n={s['count']:<5} p50 {s['p50'] * 1000:8.1f} ms"
+                  f" | p90 {s['p90'] * 1000:8.1f} ms | p99 {s['p99'] * 1000:8.1f} ms")
+    errors = result["counters"].get("errors")
+    if errors:
+        print(f"   ⚠️ erros: {errors}")
+
+
+def compare(results, baseline_path, tolerance):
+    """Compara vídeos/min com uma execução anterior. Retorna quantas combinações pioraram."""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {(r["engine"], r["workers"]): r for r in json.load(f)["results"]}
+    regressions = 0
+    for result in results:
+        previous = baseline.get((result["engine"], result["workers"]))
+        if not previous or not previous["videos_per_min"]:
+            continue
+        change = result["videos_per_min"] / previous["videos_per_min"] - 1
+        slower = change < -tolerance
+        regressions += slower
+        print(f"{'⚠️' if slower else '✅'} {result['engine']} | {result['workers']} workers: "
+              f"{previous['videos_per_min']:.1f} -> {result['videos_per_min']:.1f} vídeos/min ({change:+.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--videos", type=int, default=200, help="tamanho da playlist sintética")
+    parser.add_argument("--caption-ratio", type=float, default=0.8, help="fração dos vídeos com legenda")
+    parser.add_argument("--workers", default="1,2,4", help="workers de rede, separados por vírgula")
+    parser.add_argument("--engines", default="captions,whisper,faster-whisper",
+                        help="motores separados por vírgula (captions: sem IA)")
+    parser.add_argument("--model", default="tiny", help="tamanho do modelo (padrão: tiny)")
+    parser.add_argument("--inference", choices=("process", "thread"), default="process")
+    parser.add_argument("--batch-size", type=int, default=1, help="lotes de janelas entre vídeos")
+    parser.add_argument("--prefetch", action="store_true", help="ativa o download especulativo do áudio")
+    parser.add_argument("--transport", choices=("http", "file"), default="http",
+                        help="legendas e áudio por servidor HTTP local ou direto do disco")
+    parser.add_argument("--fixtures", help="pasta com .vtt e áudios a usar no lugar dos gerados")
+    parser.add_argument("--vtt-minutes", type=float, default=10, help="duração da legenda gerada")
+    parser.add_argument("--clip-seconds", type=float, default=20, help="duração do áudio gerado")
+    parser.add_argument("--latency", type=float, default=0.0, help="atraso (s) de cada extração de metadados")
+    parser.add_argument("--rate", type=float, default=1000.0, help="requisições/s por host no scheduler")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=1, help="execuções por combinação (vale a mediana)")
+    parser.add_argument("--json", help="grava os resultados neste arquivo")
+    parser.add_argument("--baseline", help="resultados anteriores (--json) para comparar")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="queda aceita de vídeos/min")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(json.loads(args.child))))
+        return
+
+    folder = tempfile.mkdtemp(prefix="bench_fixtures_")
+    try:
+        vtts, audios = prepare_fixtures(folder, args)
+        print(f"🎬 {args.videos} vídeos sintéticos | {args.caption_ratio:.0%} com legenda | "
+              f"transporte {args.transport} | modelo {args.model}")
+        results = []
+        for engine in [e.strip() for e in args.engines.split(",") if e.strip()]:
+            reason = skip_reason(engine)
+            if reason:
+                print(f"⏭️ {engine}: {reason}")
+                continue
+            for workers in [int(w) for w in args.workers.split(",")]:
+                config = dict(vars(args), engine=engine, workers=workers, vtts=vtts, audios=audios)
+                runs = []
+                for _ in range(max(1, args.repeat)):
+                    result, error = measure(config)
+                    if result is None:
+                        print(f"❌ {engine} | {workers} workers: {error}")
+                        break
+                    runs.append(result)
+                if not runs:
+                    continue
+                runs.sort(key=lambda r: r["videos_per_min"])
+                result = dict(runs[len(runs) // 2],
+                              videos_per_min=statistics.median(r["videos_per_min"] for r in runs),
+                              rss_mb=max(r["rss_mb"] for r in runs),
+                              children_rss_mb=max(r["children_rss_mb"] for r in runs))
+                report(result, len(runs))
+                results.append(result)
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"args": {k: v for k, v in vars(args).items() if k != "child"}, "results": results},
+                      f, ensure_ascii=False, indent=2)
+        print(f"💾 Resultados gravados em {args.json}")
+    if args.baseline and compare(results, args.baseline, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
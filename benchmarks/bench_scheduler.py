@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+"""Exercita o RequestScheduler contra um servidor HTTP local que limita a taxa.
+
+O servidor responde 429 quando recebe mais que ``--server-limit`` requisições
+simultâneas (e 503 numa fração aleatória), imitando o YouTube sob carga. O
+script mostra como a concorrência se ajusta (AIMD), quantas repetições foram
+feitas e a vazão final. Não usa a rede externa.
+
+Sai com código 1 se alguma verificação falhar: requisição perdida, 429/503
+não repetido, ou concorrência que não caiu diante dos 429. Os testes de
+unidade do scheduler ficam em ``tests/test_request_scheduler.py``.
+
+Uso: python benchmarks/bench_scheduler.py [--requests 200] [--threads 8]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import threading
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from request_scheduler import RequestScheduler  # noqa: E402
+
+
+def make_handler(server_limit, error_rate, latency):
+    state = {"active": 0, "peak": 0, "429": 0, "503": 0}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            with lock:
+                state["active"] += 1
+                state["peak"] = max(state["peak"], state["active"])
+                overloaded = state["active"] > server_limit
+            try:
+                time.sleep(latency)
+                if overloaded:
+                    with lock:
+                        state["429"] += 1
+                    self.send_response(429)
+                    self.send_header("Retry-After", "0.2")
+                    self.end_headers()
+                elif random.random() < error_rate:
+                    with lock:
+                        state["503"] += 1
+                    self.send_response(503)
+                    self.end_headers()
+                else:
+                    body = b"WEBVTT\n\n00:00:00.000 --> 00:00:01.000\nok\n"
+                    self.send_response(200)
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+            finally:
+                with lock:
+                    state["active"] -= 1
+
+        def log_message(self, *args):
+            pass
+
+    return Handler, state
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=8, help="workers de rede (teto de concorrência)")
+    parser.add_argument("--server-limit", type=int, default=3, help="simultâneas aceitas pelo servidor")
+    parser.add_argument("--error-rate", type=float, default=0.02, help="fração de respostas 503")
+    parser.add_argument("--latency", type=float, default=0.05, help="latência do servidor (s)")
+    parser.add_argument("--rate", type=float, default=50.0, help="requisições/s por host no scheduler")
+    args = parser.parse_args()
+
+    handler, state = make_handler(args.server_limit, args.error_rate, args.latency)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/timedtext"
+
+    scheduler = RequestScheduler(max_concurrency=args.threads, rate_per_host=args.rate,
+                                 burst=args.rate, base_delay=0.1, max_delay=2.0,
+                                 target_latency=args.latency * 4, max_retries=8)
+
+    limits = []
+
+    def fetch(_):
+        limits.append(scheduler.limit("127.0.0.1"))
+        return scheduler.call(lambda: urllib.request.urlopen(url, timeout=10).read(), url)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(args.threads) as executor:
+        results = list(executor.map(fetch, range(args.requests)))
+    elapsed = time.perf_counter() - start
+    server.shutdown()
+
+    print(f"✅ {len(results)} requisições em {elapsed:.2f}s ({len(results) / elapsed:.1f}/s)")
+    print(f"   servidor: pico de {state['peak']} simultâneas, {state['429']}x 429, {state['503']}x 503")
+    print(f"   scheduler: {scheduler.stats}")
+    print(f"   concorrência: média {sum(limits) / len(limits):.2f}, final {scheduler.limit('127.0.0.1'):.2f}")
+
+    checks = [
+        ("todas as requisições concluídas", len(results) == args.requests and not scheduler.stats["errors"]),
+        ("cada 429/503 foi repetido", scheduler.stats["retries"] == state["429"] + state["503"]),
+        ("429 contados pelo scheduler", scheduler.stats["throttled"] == state["429"]),
+    ]
+    if state["429"]:
+        checks.append(("concorrência reduzida após 429", min(limits) < args.threads))
+    failed = [name for name, ok in checks if not ok]
+    for name in failed:
+        print(f"❌ Falhou: {name}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+"""Mede o tempo de inicialização da aplicação.
+
+Cada medição roda num interpretador novo (sem módulos em cache):
+
+- ``core``: ``import transcriber`` + ``TranscriberCore()``, como na CLI;
+- ``gui``: ``import main`` + ``TranscriberApp()`` até a janela aparecer
+  (primeiro frame). Precisa de display; sem ele a etapa é pulada;
+- ``whisper``: ``import whisper``, o custo que a inicialização deixou de pagar.
+
+Também indica se torch/whisper foram importados durante a inicialização.
+
+Uso: python benchmarks/bench_startup.py [--repeat 5]
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+CORE = """
+import time, sys
+t0 = time.perf_counter()
+import transcriber
+t1 = time.perf_counter()
+core = transcriber.TranscriberCore(use_cache=False)
+t2 = time.perf_counter()
+result = {"import": t1 - t0, "init": t2 - t1}
+"""
+
+GUI = """
+import time, sys
+t0 = time.perf_counter()
+import main
+t1 = time.perf_counter()
+# Sem o download do FFmpeg da primeira execução
+main.TranscriberApp.check_ffmpeg = lambda self: None
+app = main.TranscriberApp()
+mapped = []
+app.bind("<Map>", lambda e: mapped.append(time.perf_counter()), add="+")
+while not mapped:
+    app.update()
+t2 = mapped[0]
+app.update_idletasks()
+app.destroy()
+result = {"import": t1 - t0, "first_frame": t2 - t1}
+"""
+
+WHISPER = """
+import time, sys
+t0 = time.perf_counter()
+import whisper
+result = {"import": time.perf_counter() - t0}
+"""
+
+FOOTER = """
+import json
+result["torch_loaded"] = "torch" in sys.modules
+result["whisper_loaded"] = "whisper" in sys.modules
+print(json.dumps(result))
+"""
+
+
+def measure(code):
+    proc = subprocess.run([sys.executable, "-c", code + FOOTER], cwd=SRC, capture_output=True, text=True)
+    if proc.returncode != 0:
+        last = (proc.stderr.strip().splitlines() or ["?"])[-1]
+        return None, last
+    return json.loads(proc.stdout.strip().splitlines()[-1]), None
+
+
+def report(name, code, repeat):
+    runs = []
+    for _ in range(repeat):
+        result, error = measure(code)
+        if result is None:
+            print(f"⏭️ {name}: pulado ({error})")
+            return
+        runs.append(result)
+    timings = {k: statistics.median(r[k] for r in runs) for k in runs[0] if not k.endswith("_loaded")}
+    parts = ", ".join(f"{k} {v * 1000:.0f} ms" for k, v in timings.items())
+    heavy = [m for m in ("torch", "whisper") if runs[0][f"{m}_loaded"]]
+    print(f"⏱️ {name}: {parts} (mediana de {repeat})"
+          f"{' | importou ' + ', '.join(heavy) if heavy else ''}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    report("core", CORE, args.repeat)
+    report("gui", GUI, args.repeat)
+    report("whisper", WHISPER, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+"""Micro-benchmark do parser de legendas WebVTT.
+
+Gera legendas automáticas sintéticas no formato do YouTube (cues rolantes,
+tags de karaokê) e compara o parser antigo (regex por linha + set) com o
+parser em streaming de ``vtt_parser``.
+
+Uso: python benchmarks/bench_vtt.py [--hours 3] [--repeat 5]
+"""
+import os
+import re
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from vtt_parser import parse_vtt, parse_vtt_batch  # noqa: E402
+
+WORDS = ("video aula exemplo playlist modelo texto legenda fala tempo "
+         "hoje vamos ver como funciona o processo de transcrição").split()
+
+
+def fmt(seconds):
+    h, rem = divmod(seconds, 3600)
+    m, s = divmod(rem, 60)
+    return f"{int(h):02d}:{int(m):02d}:{s:06.3f}"
+
+
+def synthetic_vtt(hours, seed=0):
+    """Legenda automática com ~1 linha nova a cada 2 s, repetida como no YouTube"""
+    rng = random.Random(seed)
+    out = ["WEBVTT", "Kind: captions", "Language: pt", ""]
+    previous = ""
+    t = 0.0
+    while t < hours * 3600:
+        words = [rng.choice(WORDS) for _ in range(8)]
+        karaoke = words[0] + "".join(
+            f"<{fmt(t + 0.2 * i)}><c> {w}</c>" for i, w in enumerate(words[1:], 1))
+        out += [f"{fmt(t)} --> {fmt(t + 2)} align:start position:0%", previous, karaoke, ""]
+        line = " ".join(words)
+        out += [f"{fmt(t + 2)} --> {fmt(t + 2.01)} align:start position:0%", line, " ", ""]
+        previous = line
+        t += 2.01
+    return "\n".join(out)
+
+
+def legacy_vtt_to_text(content):
+    """Implementação original de TranscriberCore.vtt_to_text (para comparação)"""
+    text_lines = []
+    seen_lines = set()
+    for line in content.splitlines():
+        if 'WEBVTT' in line or '-->' in line or not line.strip(): continue
+        clean = re.sub(r'<[^>]+>', '', line).strip()
+        clean = re.sub(r'\d{2}:\d{2}:\d{2}\.\d{3}', '', clean).strip()
+        if clean and clean not in seen_lines:
+            text_lines.append(clean)
+            seen_lines.add(clean)
+            if len(seen_lines) > 10: seen_lines.remove(next(iter(seen_lines)))
+    return " ".join(text_lines)
+
+
+def bench(name, fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    print(f"  {name:<28} {best * 1000:9.1f} ms")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hours", type=float, default=3.0, help="duração da legenda sintética")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--batch", type=int, default=20, help="payloads curtos no teste em lote")
+    args = parser.parse_args()
+
+    content = synthetic_vtt(args.hours)
+    print(f"📄 Legenda sintética: {args.hours:g} h, {len(content) / 1024 / 1024:.1f} MB, "
+          f"{content.count('-->')} cues")
+    legacy = bench("legado (regex + set)", lambda: legacy_vtt_to_text(content), args.repeat)
+    streaming = bench("vtt_parser.parse_vtt", lambda: parse_vtt(content), args.repeat)
+    bench("parse_vtt + timestamps", lambda: parse_vtt(content, keep_timestamps=True), args.repeat)
+    print(f"  palavras: legado={len(legacy.split())} streaming={len(streaming.split())}")
+
+    short = [synthetic_vtt(0.1, seed=i) for i in range(args.batch)]
+    bench(f"parse_vtt_batch ({args.batch}x6 min)", lambda: parse_vtt_batch(short), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
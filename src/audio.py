@@ -0,0 +1,138 @@
+import os
+import copy
+import glob
+import shutil
+import subprocess
+import tempfile
+from yt_dlp import YoutubeDL
+from cancellation import OperationCancelled, check_cancelled
+
+SAMPLE_RATE = 16000
+# Evita abrir uma janela de console para o ffmpeg no executável Windows
+_NO_WINDOW = getattr(subprocess, "CREATE_NO_WINDOW", 0)
+
+
+def temp_audio_dir():
+    """Pasta temporária do sistema para os áudios baixados (nunca a pasta de saída)"""
+    path = os.path.join(tempfile.gettempdir(), "youtube_transcriber")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def remove_audio_files(basename, folder=None):
+    """Apaga o áudio e restos de download (.part, .ytdl) de um vídeo"""
+    folder = folder or temp_audio_dir()
+    for path in glob.glob(os.path.join(glob.escape(folder), f"{glob.escape(basename)}.*")):
+        try: os.remove(path)
+        except OSError: pass
+
+
+def download_audio(video_url, basename, folder=None, info=None, is_cancelled=None):
+    """Baixa o stream de áudio original (sem reconverter para mp3).
+
+    Com ``info`` (resultado de ``extract_info(..., process=False)``) os
+    formatos já extraídos são reaproveitados, sem buscar a página de novo.
+    ``is_cancelled`` é consultado a cada bloco recebido e interrompe o download.
+    Retorna o caminho do arquivo baixado (webm/m4a/...) ou None.
+    """
+    folder = folder or temp_audio_dir()
+
+    def hook(_):
+        check_cancelled(is_cancelled)
+
+    ydl_opts = {
+        'format': 'bestaudio/best',
+        'outtmpl': os.path.join(folder, f"{basename}.%(ext)s"),
+        'progress_hooks': [hook],
+        'quiet': True, 'no_warnings': True, 'nocheckcertificate': True
+    }
+    try:
+        with YoutubeDL(ydl_opts) as ydl:
+            if info is not None:
+                result = ydl.process_ie_result(copy.deepcopy(info), download=True)
+            else:
+                result = ydl.extract_info(video_url, download=True)
+            path = ydl.prepare_filename(result)
+    except Exception:
+        # O yt-dlp pode embrulhar a exceção do hook em DownloadError
+        if is_cancelled is not None and is_cancelled():
+            remove_audio_files(basename, folder)
+            raise OperationCancelled("Download cancelado")
+        raise
+    return path if os.path.exists(path) else None
+
+
+def ffmpeg_decode_cmd(source, start=None, duration=None, sr=SAMPLE_RATE):
+    """Comando ffmpeg que decodifica ``source`` para PCM float32 mono no stdout"""
+    cmd = ["ffmpeg", "-nostdin", "-hide_banner", "-loglevel", "error", "-threads", "0"]
+    if start:
+        cmd += ["-ss", f"{start:.3f}"]
+    cmd += ["-i", source]
+    if duration is not None:
+        cmd += ["-t", f"{duration:.3f}"]
+    cmd += ["-vn", "-f", "f32le", "-acodec", "pcm_f32le", "-ac", "1", "-ar", str(sr), "-"]
+    return cmd
+
+
+def load_audio(source, start=None, duration=None, sr=SAMPLE_RATE, is_cancelled=None):
+    """Decodifica o áudio uma única vez direto para um array float32 16 kHz mono.
+
+    O array pode ser passado diretamente para ``model.transcribe``, sem
+    arquivo intermediário. Se ``is_cancelled`` passar a retornar True, o
+    ffmpeg é encerrado em até meio segundo.
+    """
+    import numpy as np
+    if shutil.which("ffmpeg") is None:
+        raise RuntimeError("FFmpeg não encontrado")
+    proc = subprocess.Popen(ffmpeg_decode_cmd(source, start, duration, sr), stdout=subprocess.PIPE,
+                            stderr=subprocess.PIPE, creationflags=_NO_WINDOW)
+    try:
+        while True:
+            try:
+                out, err = proc.communicate(timeout=0.5)
+                break
+            except subprocess.TimeoutExpired:
+                check_cancelled(is_cancelled)
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
+    if proc.returncode != 0:
+        raise RuntimeError(f"Falha ao decodificar áudio: {err.decode(errors='ignore').strip()}")
+    return np.frombuffer(out, np.float32)
+
+
+def iter_audio_windows(source, window=600.0, overlap=2.0, start=0.0, sr=SAMPLE_RATE, is_cancelled=None):
+    """Decodifica o áudio em janelas fixas com uma pequena sobreposição.
+
+    Um único processo ffmpeg alimenta o pipe e apenas uma janela (mais a
+    sobreposição) fica em memória por vez, independente da duração do vídeo.
+    Produz tuplas ``(inicio_em_segundos, array)``.
+    """
+    import numpy as np
+    if shutil.which("ffmpeg") is None:
+        raise RuntimeError("FFmpeg não encontrado")
+    window_bytes = int(window * sr) * 4
+    overlap_samples = int(overlap * sr)
+    proc = subprocess.Popen(ffmpeg_decode_cmd(source, start, None, sr), stdout=subprocess.PIPE,
+                            stderr=subprocess.DEVNULL, creationflags=_NO_WINDOW)
+    try:
+        carry = np.zeros(0, np.float32)
+        offset = start
+        while True:
+            check_cancelled(is_cancelled)
+            data = proc.stdout.read(window_bytes)
+            if not data:
+                break
+            samples = np.frombuffer(data[:len(data) - len(data) % 4], np.float32)
+            chunk = np.concatenate([carry, samples]) if len(carry) else samples
+            yield offset - len(carry) / sr, chunk
+            offset += len(samples) / sr
+            carry = samples[-overlap_samples:] if overlap_samples else carry
+            if len(data) < window_bytes:
+                break
+    finally:
+        proc.stdout.close()
+        if proc.poll() is None:
+            proc.kill()
+        proc.wait()
@@ -0,0 +1,132 @@
+import os
+from cancellation import check_cancelled, current_cancel_check
+from model_registry import load_whisper_model, module_available, whisper_available
+
+WHISPER = "whisper"
+FASTER_WHISPER = "faster-whisper"
+
+# Opções do whisper.transcribe com equivalente no faster-whisper
+_FASTER_OPTIONS = ("language", "task", "initial_prompt", "beam_size", "best_of", "temperature",
+                   "condition_on_previous_text", "no_speech_threshold", "word_timestamps")
+
+
+class WhisperBackend:
+    """openai-whisper (PyTorch, fp32 em CPU). Implementação original."""
+
+    name = WHISPER
+
+    def available(self):
+        return whisper_available()
+
+    def load(self, model_size, device, threads=None):
+        if threads:
+            import torch
+            torch.set_num_threads(threads)
+            try:
+                torch.set_num_interop_threads(1)
+            except RuntimeError:
+                pass
+        return load_whisper_model(model_size, device)
+
+    def decode_batch(self, model, windows, language=None, task="transcribe"):
+        """Decodifica várias janelas de até 30 s com um único lote no encoder e no decoder.
+
+        Sem timestamps nem prompt entre janelas (elas rodam juntas); janelas
+        que o modelo julga silêncio voltam vazias, como no ``transcribe``.
+        """
+        import torch
+        import whisper
+        mels = torch.stack([
+            whisper.log_mel_spectrogram(whisper.pad_or_trim(torch.tensor(window)), model.dims.n_mels)
+            for window in windows
+        ]).to(model.device)
+        options = whisper.DecodingOptions(language=language, task=task, without_timestamps=True,
+                                          fp16=model.device.type != "cpu")
+        results = whisper.decode(model, mels, options)
+        return ["" if r.no_speech_prob > 0.6 and r.avg_logprob < -1.0 else r.text.strip() for r in results]
+
+    def detect_language(self, model, audio):
+        """Idioma mais provável de um trecho de até 30 s (uma passada do encoder)"""
+        import torch
+        import whisper
+        mel = whisper.log_mel_spectrogram(whisper.pad_or_trim(torch.tensor(audio)), model.dims.n_mels)
+        _, probs = model.detect_language(mel.to(model.device))
+        return max(probs, key=probs.get)
+
+
+class FasterWhisperModel:
+    """Adapta o faster-whisper à interface ``model.transcribe`` do openai-whisper.
+
+    Retorna ``{"text", "segments"}`` como o Whisper, então o processamento em
+    janelas e o pool de inferência funcionam sem mudanças. Com ``batch_size``
+    maior que 1, as janelas de 30 s do áudio são decodificadas em lote.
+    """
+
+    def __init__(self, model, batch_size=8):
+        self.model = model
+        self.batch_size = batch_size
+        self._batched = None
+        if batch_size > 1:
+            try:
+                from faster_whisper import BatchedInferencePipeline
+                self._batched = BatchedInferencePipeline(model=model)
+            except ImportError:
+                # Versões anteriores à 1.1 não têm decodificação em lote
+                pass
+
+    def transcribe(self, audio, **options):
+        kwargs = {k: v for k, v in options.items() if k in _FASTER_OPTIONS}
+        if self._batched is not None:
+            segments, _ = self._batched.transcribe(audio, batch_size=self.batch_size, **kwargs)
+        else:
+            segments, _ = self.model.transcribe(audio, **kwargs)
+        # Os segmentos são gerados sob demanda: o cancelamento vale a cada segmento
+        is_cancelled = current_cancel_check()
+        found = []
+        for seg in segments:
+            check_cancelled(is_cancelled)
+            found.append({"start": seg.start, "end": seg.end, "text": seg.text})
+        return {"text": "".join(s["text"] for s in found), "segments": found}
+
+
+class FasterWhisperBackend:
+    """faster-whisper (CTranslate2) com pesos int8 em CPU: várias vezes mais rápido que o fp32"""
+
+    name = FASTER_WHISPER
+
+    def __init__(self, compute_type=None, batch_size=8):
+        self.compute_type = compute_type
+        self.batch_size = batch_size
+
+    def available(self):
+        return module_available("faster_whisper")
+
+    def detect_language(self, model, audio):
+        # A detecção roda antes de o gerador de segmentos ser consumido
+        _, info = model.model.transcribe(audio, beam_size=1, without_timestamps=True)
+        return info.language
+
+    def load(self, model_size, device, threads=None):
+        from faster_whisper import WhisperModel
+        compute_type = self.compute_type or ("int8" if device == "cpu" else "float16")
+        model = WhisperModel(model_size, device=device, compute_type=compute_type,
+                             cpu_threads=threads or os.cpu_count() or 0)
+        return FasterWhisperModel(model, self.batch_size)
+
+
+BACKENDS = {
+    WHISPER: WhisperBackend,
+    FASTER_WHISPER: FasterWhisperBackend,
+}
+
+
+def get_backend(name=WHISPER, **options):
+    """Instancia o motor de transcrição pelo nome ("whisper" ou "faster-whisper")"""
+    try:
+        return BACKENDS[name](**options)
+    except KeyError:
+        raise ValueError(f"Motor de transcrição desconhecido: {name}")
+
+
+def available_backends():
+    return [name for name, cls in BACKENDS.items() if cls().available()]
@@ -0,0 +1,189 @@
+import time
+import threading
+from concurrent.futures import Future
+from cancellation import OperationCancelled
+from inference_engine import InferenceStage
+
+WINDOW_SECONDS = 30.0    # contexto do encoder do Whisper
+SEARCH_SECONDS = 3.0     # região antes do fim da janela onde se procura o silêncio
+
+
+def plan_windows(duration, window=WINDOW_SECONDS, search=SEARCH_SECONDS):
+    """Janelas ``(inicio, fim, margem)`` de até ``window`` segundos para ``duration`` s de áudio.
+
+    Os cortes nominais ficam a cada ``window - search`` segundos; ao
+    decodificar, o processo de inferência move cada um para o quadro mais
+    silencioso a até ``search / 2`` s (``vad.boundary_cut``), para não partir
+    palavras ao meio sem que nenhuma janela passe de ``window`` segundos.
+    """
+    margin = search / 2
+    bounds = [0.0]
+    while duration - bounds[-1] > window - margin:
+        bounds.append(bounds[-1] + window - search)
+    return [(start, end, margin) for start, end in zip(bounds, bounds[1:] + [None])]
+
+
+class _Job:
+    def __init__(self, count, on_done, language=None, on_timings=None):
+        self.language = language
+        self.future = Future()
+        self.future.set_running_or_notify_cancel()
+        self.texts = [None] * count
+        self.remaining = count
+        self.on_done = on_done
+        self.on_timings = on_timings
+        self.timings = {}
+
+
+class BatchingStage:
+    """Junta janelas de 30 s de vários vídeos numa única passada do modelo.
+
+    Cada vídeo curto colocado com ``put`` é dividido em janelas pela
+    duração; um despachante envia lotes de até ``batch_size`` janelas (de
+    vídeos diferentes) aos processos de inferência, que decodificam o áudio
+    e rodam encoder e decoder do lote de uma vez. Só caminhos e limites
+    trafegam entre os processos. Os textos voltam para o vídeo certo, na ordem.
+    Um lote incompleto sai depois de ``max_latency`` segundos, então um vídeo
+    sozinho não fica esperando o lote encher.
+    """
+
+    def __init__(self, engine, batch_size=8, max_latency=2.0, max_windows=None, on_batch=None):
+        self.engine = engine
+        # Recebe (segundos, janelas) de cada lote concluído
+        self.on_batch = on_batch
+        self.batch_size = max(1, batch_size)
+        self.max_latency = max_latency
+        self.max_windows = max_windows or self.batch_size * engine.workers * 4
+        self._pending = []      # (instante, job, indice, janela)
+        self._cond = threading.Condition()
+        self._slots = threading.Semaphore(engine.workers)
+        self._closed = False
+        self._cancelled = False
+        self._dispatcher = threading.Thread(target=self._dispatch, daemon=True)
+        self._dispatcher.start()
+
+    def put(self, audio, duration, on_done=None, language=None, trim_silence=False, on_timings=None):
+        """Enfileira um áudio (caminho) de ``duration`` segundos. Retorna um Future com o texto.
+
+        Um lote só junta janelas do mesmo ``language`` (None: detecção por janela).
+        ``trim_silence`` descarta os silêncios longos de cada janela;
+        ``on_timings`` recebe os tempos somados das janelas do vídeo.
+        """
+        job = None
+        try:
+            windows = [(audio, start, end, margin, trim_silence)
+                       for start, end, margin in plan_windows(duration)]
+            job = _Job(len(windows), on_done, language, on_timings)
+            now = time.monotonic()
+            with self._cond:
+                for index, window in enumerate(windows):
+                    # Fila limitada (áudios baixados à espera): espera o despachante esvaziá-la
+                    while len(self._pending) >= self.max_windows and not self._cancelled:
+                        self._cond.wait(0.2)
+                    if self._cancelled:
+                        raise OperationCancelled("Inferência cancelada")
+                    self._pending.append((now, job, index, window))
+                    self._cond.notify_all()
+        except Exception as e:
+            if job is None:
+                job = _Job(0, on_done)
+            self._fail(job, e)
+        return job.future
+
+    def _take_batch(self):
+        """Espera um lote cheio ou a janela mais antiga estourar ``max_latency``"""
+        with self._cond:
+            while True:
+                if self._cancelled:
+                    return None
+                if self._pending:
+                    waited = time.monotonic() - self._pending[0][0]
+                    language = self._pending[0][1].language
+                    same = [item for item in self._pending if item[1].language == language]
+                    if len(same) >= self.batch_size or waited >= self.max_latency or self._closed:
+                        batch = same[:self.batch_size]
+                        taken = set(map(id, batch))
+                        self._pending = [item for item in self._pending if id(item) not in taken]
+                        self._cond.notify_all()
+                        return batch
+                    self._cond.wait(self.max_latency - waited)
+                elif self._closed:
+                    return None
+                else:
+                    self._cond.wait(0.5)
+
+    def _dispatch(self):
+        while True:
+            self._slots.acquire()
+            batch = self._take_batch()
+            if batch is None:
+                self._slots.release()
+                return
+            started = time.monotonic()
+            try:
+                inner = self.engine.submit_batch([window for _, _, _, window in batch],
+                                                 language=batch[0][1].language)
+            except Exception as e:
+                self._slots.release()
+                self._on_batch_done(batch, None, None, e)
+                continue
+            inner.add_done_callback(lambda f, batch=batch, started=started: self._on_inner_done(f, batch, started))
+
+    def _on_inner_done(self, inner, batch, started=None):
+        self._slots.release()
+        if self.on_batch and started is not None and not inner.cancelled() and not inner.exception():
+            try:
+                self.on_batch(time.monotonic() - started, len(batch))
+            except Exception:
+                pass
+        if inner.cancelled():
+            self._on_batch_done(batch, None, None, OperationCancelled("Inferência cancelada"))
+        elif inner.exception() is not None:
+            self._on_batch_done(batch, None, None, inner.exception())
+        else:
+            self._on_batch_done(batch, *inner.result())
+
+    def _on_batch_done(self, batch, texts, timings, error=None):
+        for position, (_, job, index, _) in enumerate(batch):
+            if error is not None:
+                self._fail(job, error)
+                continue
+            with self._cond:
+                if job.future.done() or job.texts[index] is not None:
+                    continue
+                job.texts[index] = texts[position]
+                for name, seconds in timings[position].items():
+                    job.timings[name] = job.timings.get(name, 0.0) + seconds
+                job.remaining -= 1
+                finished = job.remaining == 0
+            if finished:
+                if job.on_timings:
+                    try:
+                        job.on_timings(job.timings)
+                    except Exception:
+                        pass
+                InferenceStage._finish(job.future, job.on_done, " ".join(t for t in job.texts if t), None)
+
+    def _fail(self, job, error):
+        with self._cond:
+            if job.remaining < 0:
+                return
+            # Marca o vídeo como encerrado para ignorar as demais janelas dele
+            job.remaining = -1
+        InferenceStage._finish(job.future, job.on_done, None, error)
+
+    def cancel(self):
+        """Descarta as janelas enfileiradas (chamando ``on_done`` para limpar os áudios)"""
+        with self._cond:
+            self._cancelled = True
+            pending, self._pending = self._pending, []
+            self._cond.notify_all()
+        for _, job, _, _ in pending:
+            self._fail(job, OperationCancelled("Inferência cancelada"))
+
+    def close(self):
+        """Fim da fila: os lotes restantes são enviados sem esperar ``max_latency``"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._dispatcher.join()
@@ -0,0 +1,70 @@
+import sys
+import threading
+from contextlib import contextmanager
+
+
+class OperationCancelled(Exception):
+    """Levantada quando o usuário cancela a operação no meio de uma etapa"""
+
+
+_local = threading.local()
+_hook_installed = False
+_hook_lock = threading.Lock()
+
+
+def check_cancelled(is_cancelled):
+    if is_cancelled is not None and is_cancelled():
+        raise OperationCancelled("Operação cancelada")
+
+
+def _install_whisper_hook():
+    """Faz o laço de ``whisper.transcribe`` checar o cancelamento a cada segmento.
+
+    O openai-whisper atualiza uma barra ``tqdm`` ao fim de cada janela de 30 s
+    (mesmo com ``verbose`` desligado, quando a barra fica desabilitada). A barra
+    usada pelo módulo é trocada por uma subclasse que levanta
+    ``OperationCancelled`` nesse ponto, apenas na thread que pediu.
+    """
+    global _hook_installed
+    with _hook_lock:
+        if _hook_installed:
+            return
+        import types
+        import importlib
+        import tqdm
+        # ``whisper/__init__`` faz ``from .transcribe import transcribe``: o atributo
+        # ``whisper.transcribe`` é a função, o módulo só existe em sys.modules
+        module = importlib.import_module("whisper.transcribe")
+
+        class _CancellableTqdm(tqdm.tqdm):
+            def update(self, n=1):
+                check_cancelled(getattr(_local, "is_cancelled", None))
+                return super().update(n)
+
+        module.tqdm = types.SimpleNamespace(tqdm=_CancellableTqdm)
+        _hook_installed = True
+
+
+def current_cancel_check():
+    """``is_cancelled`` do ``cancel_scope`` ativo na thread atual (ou None)"""
+    return getattr(_local, "is_cancelled", None)
+
+
+@contextmanager
+def cancel_scope(is_cancelled):
+    """Durante o bloco, a inferência da thread atual para no próximo segmento se cancelada"""
+    if is_cancelled is None:
+        yield
+        return
+    if "whisper" in sys.modules:
+        # Só o openai-whisper precisa do gancho; outros motores consultam ``current_cancel_check``
+        try:
+            _install_whisper_hook()
+        except ImportError:
+            pass
+    previous = getattr(_local, "is_cancelled", None)
+    _local.is_cancelled = is_cancelled
+    try:
+        yield
+    finally:
+        _local.is_cancelled = previous
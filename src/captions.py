@@ -0,0 +1,65 @@
+CAPTION_LANGS = ("pt", "en")
+
+
+def _find_track(tracks, lang):
+    """Primeira faixa VTT cujo código de idioma começa com ``lang`` (pt, pt-BR, ...)"""
+    for code in sorted(tracks or {}, key=lambda c: (c != lang, not c.endswith("-orig"), c)):
+        if code == lang or code.startswith(f"{lang}-"):
+            for fmt in tracks[code]:
+                if fmt.get("ext") == "vtt" and fmt.get("url"):
+                    return code, fmt
+    return None
+
+
+def pick_caption_track(info, langs=CAPTION_LANGS):
+    """Escolhe, a partir do info dict, a única legenda que vale a pena baixar.
+
+    Prioridade: legendas manuais nos idiomas de ``langs`` (na ordem), depois as
+    automáticas. Retorna ``(idioma, formato)`` ou None.
+    """
+    for key in ("subtitles", "automatic_captions"):
+        for lang in langs:
+            found = _find_track(info.get(key), lang)
+            if found:
+                return found
+    return None
+
+
+def fetch_caption(ydl, track):
+    """Baixa o conteúdo da faixa em memória, usando a sessão do próprio YoutubeDL"""
+    with ydl.urlopen(track["url"]) as response:
+        return response.read().decode("utf-8", errors="replace")
+
+
+# Códigos aceitos pelo Whisper (whisper.tokenizer.LANGUAGES), sem importá-lo
+WHISPER_LANGUAGES = frozenset(
+    "en zh de es ru ko fr ja pt tr pl ca nl ar sv it id hi fi vi he uk el ms cs ro da hu ta no th ur "
+    "hr bg lt la mi ml cy sk te fa lv bn sr az sl kn et mk br eu is hy ne mn bs kk sq sw gl mr pa si "
+    "km sn yo so af oc ka be tg sd gu am yi lo uz fo ht ps tk nn mt sa lb my bo tl mg as tt haw ln ha "
+    "ba jw su yue".split()
+)
+# Códigos do YouTube que o Whisper conhece por outro nome
+_LANGUAGE_ALIASES = {"iw": "he", "jv": "jw", "fil": "tl", "nb": "no"}
+
+
+def normalize_language(code):
+    """``pt-BR`` -> ``pt``; None se o Whisper não conhece o idioma"""
+    if not code:
+        return None
+    code = code.lower().replace("_", "-").split("-")[0]
+    code = _LANGUAGE_ALIASES.get(code, code)
+    return code if code in WHISPER_LANGUAGES else None
+
+
+def guess_language(info):
+    """Idioma falado no vídeo segundo os metadados, sem ouvir o áudio.
+
+    A faixa automática ``<idioma>-orig`` é o reconhecimento de fala do próprio
+    YouTube, a pista mais confiável; depois vem o campo ``language`` do vídeo.
+    """
+    for code in (info or {}).get("automatic_captions") or {}:
+        if code.endswith("-orig"):
+            lang = normalize_language(code[:-len("-orig")])
+            if lang:
+                return lang
+    return normalize_language((info or {}).get("language"))
@@ -0,0 +1,128 @@
+import os
+import json
+import time
+from audio import SAMPLE_RATE, iter_audio_windows
+from cancellation import cancel_scope, check_cancelled
+
+CHECKPOINT_DIR = os.path.join(os.path.expanduser("~"), ".youtube_transcriber", "checkpoints")
+
+
+def checkpoint_path(vid_id, model_size):
+    return os.path.join(CHECKPOINT_DIR, f"{vid_id}_{model_size}.json")
+
+
+def load_checkpoint(path, window, overlap, trim_silence=False, language=None):
+    """Lê o checkpoint se ele foi gerado com a mesma configuração.
+
+    Janelas, sobreposição, corte de silêncios e idioma forçado precisam
+    coincidir; senão o texto retomado misturaria duas configurações.
+    """
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if state.get("window") != window or state.get("overlap") != overlap:
+        return None
+    # Checkpoints antigos, sem esses campos, também são descartados
+    if state.get("trim_silence") != bool(trim_silence) or state.get("language", False) != language:
+        return None
+    return state
+
+
+def save_checkpoint(path, state):
+    """Grava o checkpoint de forma atômica (arquivo temporário + rename)"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def stitch_segments(committed, segments, boundary):
+    """Junta os segmentos de uma nova janela aos já aceitos.
+
+    Na região de sobreposição vale o ponto médio: um segmento só entra se o
+    seu meio cair depois de ``boundary`` (fim da janela anterior). Repetições
+    exatas do último texto aceito também são descartadas.
+    """
+    last_text = committed[-1]["text"].strip() if committed else None
+    for seg in segments:
+        if (seg["start"] + seg["end"]) / 2 < boundary:
+            continue
+        text = seg["text"].strip()
+        if not text or text == last_text:
+            continue
+        committed.append(seg)
+        last_text = text
+    return committed
+
+
+def transcribe_chunked(model, source, checkpoint=None, window=600.0, overlap=2.0,
+                       is_cancelled=None, trim_silence=False, timings=None, **options):
+    """Transcreve ``source`` janela a janela com memória constante.
+
+    Após cada janela o progresso é salvo em ``checkpoint``; uma execução
+    interrompida recomeça da última janela concluída. O checkpoint é removido
+    ao final. Com ``is_cancelled``, levanta ``OperationCancelled`` no próximo
+    segmento de 30 s ou janela, mantendo o checkpoint para retomar depois.
+    Com ``trim_silence``, cada janela perde os silêncios longos (analisados
+    na própria janela decodificada) e os tempos dos segmentos são convertidos
+    de volta para o áudio original.
+    ``timings`` (dict) acumula os segundos gastos em "decode", "vad_scan" e
+    "inference", e em "skipped_seconds" o áudio sem fala descartado.
+    """
+    from vad import drop_silence, original_time
+    language = options.get("language")
+    state = load_checkpoint(checkpoint, window, overlap, trim_silence, language) or {
+        "window": window, "overlap": overlap, "trim_silence": bool(trim_silence), "language": language,
+        "next_offset": 0.0, "segments": []
+    }
+    segments = state["segments"]
+    timings = {} if timings is None else timings
+    decode = inference = 0.0
+
+    # Recomeça um pouco antes do ponto salvo para reaproveitar a sobreposição
+    resume_at = max(0.0, state["next_offset"] - overlap)
+    waited = time.perf_counter()
+    for start, samples in iter_audio_windows(source, window, overlap, start=resume_at,
+                                             is_cancelled=is_cancelled):
+        decode += time.perf_counter() - waited
+        check_cancelled(is_cancelled)
+        boundary = state["next_offset"]
+        samples_end = start + len(samples) / SAMPLE_RATE
+        mapping = None
+        if trim_silence:
+            samples, mapping = drop_silence(samples, timings)
+            if len(samples) == 0:
+                # Janela inteira sem fala
+                state["next_offset"] = samples_end
+                if checkpoint:
+                    save_checkpoint(checkpoint, state)
+                waited = time.perf_counter()
+                continue
+        if segments:
+            # Mantém a continuidade do contexto entre as janelas
+            options["initial_prompt"] = "".join(s["text"] for s in segments[-5:])[-200:]
+        started = time.perf_counter()
+        with cancel_scope(is_cancelled):
+            result = model.transcribe(samples, **options)
+        inference += time.perf_counter() - started
+        found = [
+            {"start": start + original_time(s["start"], mapping),
+             "end": start + original_time(s["end"], mapping), "text": s["text"]}
+            for s in result.get("segments", [])
+        ]
+        stitch_segments(segments, found, boundary)
+        state["next_offset"] = samples_end
+        if checkpoint:
+            save_checkpoint(checkpoint, state)
+        waited = time.perf_counter()
+
+    timings["decode"] = timings.get("decode", 0.0) + decode
+    timings["inference"] = timings.get("inference", 0.0) + inference
+    if checkpoint and os.path.exists(checkpoint):
+        os.remove(checkpoint)
+    return "".join(s["text"] for s in segments).strip()
@@ -0,0 +1,253 @@
+"""Linha de comando sem interface gráfica (servidores, lotes, agendadores).
+
+Não importa customtkinter nem PIL: pode rodar em máquinas sem display.
+Cada evento de progresso vira uma linha JSON no stdout; as mensagens de log
+vão para o stderr (ou também para o stdout como JSON, com ``--log-json``).
+"""
+import os
+import sys
+import json
+import signal
+import argparse
+import threading
+from urllib.parse import urlparse, parse_qs
+from ffmpeg_manager import FFmpegManager
+from scheduling import PLAYLIST_ORDER, POLICIES
+from backends import BACKENDS, WHISPER
+
+EXIT_OK = 0
+EXIT_PARTIAL = 1       # algum vídeo falhou
+EXIT_USAGE = 2         # argumentos inválidos (mesmo código do argparse)
+EXIT_ERROR = 3         # nenhuma URL pôde ser processada
+EXIT_CANCELLED = 130   # interrompido (Ctrl+C / SIGTERM)
+
+
+def read_urls(urls=(), files=()):
+    """URLs da linha de comando e de arquivos (uma por linha, ``#`` comenta, ``-`` é o stdin)"""
+    result = [u.strip() for u in urls if u.strip()]
+    for path in files:
+        handle = sys.stdin if path == "-" else open(path, "r", encoding="utf-8")
+        try:
+            for line in handle:
+                line = line.split("#", 1)[0].strip()
+                if line:
+                    result.append(line)
+        finally:
+            if handle is not sys.stdin:
+                handle.close()
+    # Remove repetidas mantendo a ordem
+    return list(dict.fromkeys(result))
+
+
+def url_label(url):
+    """Nome de pasta para uma URL cuja listagem ainda não foi buscada (streaming)"""
+    query = parse_qs(urlparse(url).query)
+    for key in ("list", "v"):
+        if query.get(key):
+            return query[key][0]
+    return urlparse(url).path.strip("/").replace("/", "_") or "playlist"
+
+
+def is_single_video(videos):
+    # Entradas de playlist (extract_flat) chegam como "_type": "url"
+    return len(videos) == 1 and videos[0].get('_type', 'video') == 'video'
+
+
+class JsonLinesWriter:
+    """Escreve um objeto JSON por linha, de várias threads"""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+        self._lock = threading.Lock()
+
+    def __call__(self, obj):
+        line = json.dumps(obj, ensure_ascii=False, default=str)
+        with self._lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+
+
+def run(urls, output_dir, workers=3, stream=False, max_queued=None, on_event=None, logger=None,
+        core=None, **core_options):
+    """Transcreve várias playlists/vídeos. Retorna ``(exit_code, resumo)``.
+
+    Cada playlist vai para uma subpasta com o seu título; vídeos avulsos são
+    agrupados numa única execução direto em ``output_dir``. ``on_event``
+    recebe os eventos de progresso do ``TranscriberCore`` acrescidos de
+    ``url`` e ``folder``, além de ``error`` (URL que falhou) e ``summary``.
+    ``core_options`` são repassadas ao ``TranscriberCore``.
+    """
+    from transcriber import TranscriberCore
+
+    emit = on_event or (lambda event: None)
+    core = core or TranscriberCore(logger_callback=logger, **core_options)
+    summary = {"urls": len(urls), "failed_urls": 0, "videos": 0, "success": 0, "cancelled": False}
+
+    def process(url, folder, videos=None):
+        finished = {}
+
+        def on_progress(event):
+            if event.get("event") == "finish":
+                finished.update(event)
+            emit(dict(event, url=url, folder=folder))
+
+        core.progress_callback = on_progress
+        try:
+            core.run_playlist(url, folder, max_workers=workers, videos=videos, stream=stream,
+                              max_queued=max_queued)
+        except Exception as e:
+            # Em streaming a listagem só falha aqui, depois de a execução começar
+            fail(url, e)
+        summary["videos"] += finished.get("total") or 0
+        summary["success"] += finished.get("success") or 0
+
+    def fail(url, error):
+        summary["failed_urls"] += 1
+        emit({"event": "error", "url": url, "message": str(error)})
+
+    singles = []
+    for url in urls:
+        if core.is_cancelled():
+            break
+        if stream:
+            process(url, os.path.join(output_dir, url_label(url)))
+            continue
+        try:
+            title, videos = core.fetch_playlist_videos(url)
+        except Exception as e:
+            fail(url, e)
+            continue
+        if is_single_video(videos):
+            singles.extend(videos)
+        else:
+            process(url, os.path.join(output_dir, core.sanitize_filename(title).strip() or url_label(url)),
+                    videos)
+
+    if singles and not core.is_cancelled():
+        process("videos", output_dir, singles)
+
+    summary["cancelled"] = core.is_cancelled()
+    emit({"event": "summary", **summary})
+    if summary["cancelled"]:
+        code = EXIT_CANCELLED
+    elif summary["failed_urls"] and not summary["videos"]:
+        code = EXIT_ERROR
+    elif summary["failed_urls"] or summary["success"] < summary["videos"]:
+        code = EXIT_PARTIAL
+    else:
+        code = EXIT_OK
+    return code, summary
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="YouTube Transcriber Pro sem interface gráfica",
+        epilog="Códigos de saída: 0 sucesso, 1 algum vídeo falhou, 2 uso incorreto, "
+               "3 nenhuma URL processada, 130 cancelado."
+    )
+    parser.add_argument("urls", nargs="*", help="URLs de playlists ou vídeos")
+    parser.add_argument("-f", "--urls-file", action="append", default=[], metavar="ARQUIVO",
+                        help="arquivo com uma URL por linha (- lê do stdin); pode repetir")
+    parser.add_argument("-o", "--output", default="transcricoes", help="pasta de saída (padrão: transcricoes)")
+    parser.add_argument("-w", "--workers", type=int, default=3, help="workers de rede (padrão: 3)")
+    parser.add_argument("--stream", action="store_true", help="processa conforme a listagem é paginada")
+    parser.add_argument("--max-queued", type=int, help="vídeos aguardando na fila (padrão: 2x workers)")
+    parser.add_argument("--engine", choices=list(BACKENDS), default=WHISPER,
+                        help="motor de transcrição (faster-whisper: int8 em CPU)")
+    parser.add_argument("--model", default="base", help="tamanho do modelo Whisper (padrão: base)")
+    parser.add_argument("--language", help="idioma falado (ex.: pt); padrão: metadados do vídeo ou detecção")
+    parser.add_argument("--language-lock", action="store_true",
+                        help="detecta o idioma no primeiro vídeo de cada playlist e usa nos demais")
+    parser.add_argument("--device", help="cpu ou cuda (padrão: automático)")
+    parser.add_argument("--inference", choices=("process", "thread"), default="process",
+                        help="inferência em pool de processos ou nos próprios workers")
+    parser.add_argument("--inference-workers", type=int, help="processos de inferência")
+    parser.add_argument("--chunk-seconds", type=float, default=600,
+                        help="janela de áudio em segundos (0 desativa)")
+    parser.add_argument("--split-seconds", type=float,
+                        help="divide vídeos longos em trechos deste tamanho para transcrição paralela "
+                             "(só com --inference process)")
+    parser.add_argument("--batch-size", type=int, default=1,
+                        help="janelas de 30 s de vídeos curtos transcritas por lote (1 desativa)")
+    parser.add_argument("--batch-latency", type=float, default=2.0,
+                        help="espera máxima (s) para completar um lote")
+    parser.add_argument("--no-trim", action="store_true", help="não descarta os silêncios antes da IA")
+    parser.add_argument("--schedule", choices=POLICIES, default=PLAYLIST_ORDER, help="ordem de processamento")
+    parser.add_argument("--prefetch", action="store_true", help="baixa o áudio especulativamente")
+    parser.add_argument("--no-cache", action="store_true", help="não usa o cache de transcrições")
+    parser.add_argument("--metrics-log", metavar="ARQUIVO",
+                        help="acrescenta tempos por etapa, contadores e progresso (JSON lines) a este arquivo")
+    parser.add_argument("--metrics-file", metavar="ARQUIVO",
+                        help="grava as métricas no formato texto do Prometheus (textfile collector)")
+    parser.add_argument("--log-json", action="store_true", help="envia também o log como JSON no stdout")
+    parser.add_argument("-q", "--quiet", action="store_true", help="não escreve o log no stderr")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    try:
+        urls = read_urls(args.urls, args.urls_file)
+    except OSError as e:
+        parser.error(str(e))
+    if not urls:
+        parser.error("informe ao menos uma URL (ou --urls-file)")
+    if args.workers < 1:
+        parser.error("--workers deve ser pelo menos 1")
+    if args.split_seconds and args.inference == "thread":
+        parser.error("--split-seconds exige --inference process")
+
+    writer = JsonLinesWriter()
+
+    def logger(message):
+        if args.log_json:
+            writer({"event": "log", "message": message})
+        elif not args.quiet:
+            print(message, file=sys.stderr, flush=True)
+
+    # FFmpeg baixado pela interface gráfica fica numa pasta própria
+    if not FFmpegManager.is_ffmpeg_available() and FFmpegManager.is_local_ffmpeg_available():
+        FFmpegManager.add_ffmpeg_to_path()
+
+    from transcriber import TranscriberCore
+    core = TranscriberCore(
+        logger_callback=logger,
+        model_size=args.model,
+        engine=args.engine,
+        language=args.language,
+        language_lock=args.language_lock,
+        device=args.device,
+        inference_mode=args.inference,
+        inference_workers=args.inference_workers,
+        chunk_seconds=args.chunk_seconds or None,
+        split_segment_seconds=args.split_seconds,
+        trim_silence=not args.no_trim,
+        batch_size=args.batch_size,
+        batch_max_latency=args.batch_latency,
+        use_cache=not args.no_cache,
+        schedule_policy=args.schedule,
+        prefetch_audio=args.prefetch,
+        metrics_log=args.metrics_log,
+        metrics_file=args.metrics_file,
+    )
+
+    def on_signal(signum, frame):
+        if core.is_cancelled():
+            # Segundo sinal: encerra sem esperar a limpeza
+            os._exit(EXIT_CANCELLED)
+        core.cancel()
+
+    signal.signal(signal.SIGINT, on_signal)
+    if hasattr(signal, "SIGTERM"):
+        signal.signal(signal.SIGTERM, on_signal)
+
+    code, _ = run(urls, args.output, workers=args.workers, stream=args.stream, max_queued=args.max_queued,
+                  on_event=writer, core=core)
+    return code
+
+
+if __name__ == "__main__":
+    import multiprocessing
+    multiprocessing.freeze_support()
+    sys.exit(main())
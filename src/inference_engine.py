@@ -0,0 +1,387 @@
+import os
+import time
+import queue
+import threading
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from audio import SAMPLE_RATE, load_audio
+from chunked import transcribe_chunked
+from cancellation import OperationCancelled, cancel_scope
+from backends import get_backend
+
+# Estado de cada processo de inferência (preenchido pelo initializer)
+_worker_model = None
+_worker_backend = None
+_worker_threads = None
+_worker_cancel = None
+_worker_load_seconds = None
+
+
+def split_threads(cores, workers):
+    """Divide os núcleos entre os workers. A soma sempre é igual a ``cores``."""
+    workers = max(1, min(workers, cores))
+    base, extra = divmod(cores, workers)
+    return [base + (1 if i < extra else 0) for i in range(workers)]
+
+
+def _init_worker(backend, model_size, device, cores, workers, slot_counter, cancel_event):
+    """Executado uma vez em cada processo: fixa as threads e carrega o modelo"""
+    global _worker_model, _worker_backend, _worker_threads, _worker_cancel, _worker_load_seconds
+    _worker_cancel = cancel_event
+    _worker_backend = backend
+    with slot_counter.get_lock():
+        slot = slot_counter.value
+        slot_counter.value += 1
+    _worker_threads = split_threads(cores, workers)[slot % workers]
+
+    # Precisa vir antes do import do torch/CTranslate2 para valer para OpenMP/MKL
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ[var] = str(_worker_threads)
+
+    started = time.perf_counter()
+    _worker_model = backend.load(model_size, device, threads=_worker_threads)
+    _worker_load_seconds = time.perf_counter() - started
+
+
+def _ping():
+    return os.getpid(), _worker_threads, _worker_load_seconds
+
+
+def cut_clip(samples, offset, start, end, margin=0.0, sr=SAMPLE_RATE):
+    """Recorta ``[start, end)`` de ``samples``, decodificado a partir de ``offset`` segundos.
+
+    Com ``margin``, cada ponta interna é movida para a pausa mais próxima a
+    até ``margin`` segundos (``vad.boundary_cut``): o trecho vizinho escolhe o
+    mesmo corte, então nenhuma palavra é partida nem repetida.
+    """
+    first = int((start - offset) * sr) if start else 0
+    last = len(samples) if end is None else int((end - offset) * sr)
+    if margin:
+        from vad import boundary_cut
+        if start:
+            first = boundary_cut(samples, start - offset, margin)
+        if end is not None:
+            last = boundary_cut(samples, end - offset, margin)
+    return samples[max(0, first):last]
+
+
+def load_clip(source, start, end, margin=0.0, is_cancelled=None):
+    """Decodifica o trecho ``[start, end)`` do arquivo (``end`` None: até o fim), ver ``cut_clip``"""
+    lo = max(0.0, start - margin) if start else 0.0
+    duration = None if end is None else end + margin - lo
+    samples = load_audio(source, start=lo, duration=duration, is_cancelled=is_cancelled)
+    return cut_clip(samples, lo, start, end, margin)
+
+
+def load_windows(windows, is_cancelled=None):
+    """Decodifica as janelas ``(caminho, inicio, fim, margem, trim_silence)`` de um lote.
+
+    Um único ffmpeg por arquivo cobre todas as janelas dele no lote. Retorna
+    ``(arrays, tempos)``, com um dict de tempos por janela ("decode" dividido
+    entre as janelas do arquivo e, com ``trim_silence``, "vad_scan" e
+    "skipped_seconds").
+    """
+    spans = {}
+    for path, start, end, margin, _ in windows:
+        lo = max(0.0, start - margin)
+        hi = None if end is None else end + margin
+        if path in spans:
+            old_lo, old_hi, count = spans[path]
+            hi = None if hi is None or old_hi is None else max(hi, old_hi)
+            spans[path] = (min(lo, old_lo), hi, count + 1)
+        else:
+            spans[path] = (lo, hi, 1)
+    decoded = {}
+    for path, (lo, hi, count) in spans.items():
+        started = time.perf_counter()
+        samples = load_audio(path, start=lo, duration=None if hi is None else hi - lo, is_cancelled=is_cancelled)
+        decoded[path] = (lo, samples, (time.perf_counter() - started) / count)
+    arrays, timings = [], []
+    for path, start, end, margin, trim_silence in windows:
+        lo, samples, decode = decoded[path]
+        clip = cut_clip(samples, lo, start, end, margin)
+        window_timings = {"decode": decode}
+        if trim_silence and len(clip):
+            from vad import drop_silence
+            clip, _ = drop_silence(clip, window_timings)
+        arrays.append(clip)
+        timings.append(window_timings)
+    return arrays, timings
+
+
+def transcribe_audio(model, audio, chunking=None, clip=None, is_cancelled=None, trim_silence=False,
+                     timings=None, **options):
+    """Transcreve um caminho de arquivo ou array já decodificado.
+
+    Com ``chunking`` (dict com window/overlap/checkpoint) arquivos são
+    processados em janelas com memória constante e checkpoint por janela.
+    ``clip`` = (inicio, fim, margem) decodifica apenas um trecho do arquivo
+    (``load_clip``).
+    ``trim_silence`` descarta os silêncios longos do áudio decodificado antes
+    da inferência (``vad.drop_silence``), sem decodificar o arquivo de novo.
+    ``is_cancelled`` interrompe a decodificação e a inferência no próximo
+    segmento com ``OperationCancelled``.
+    ``timings`` (dict) acumula os segundos gastos em "decode", "vad_scan" e
+    "inference", e em "skipped_seconds" o áudio sem fala descartado.
+    """
+    timings = {} if timings is None else timings
+    started = time.perf_counter()
+    if isinstance(audio, str):
+        if clip:
+            audio = load_clip(audio, *clip, is_cancelled=is_cancelled)
+        elif chunking:
+            return transcribe_chunked(model, audio, is_cancelled=is_cancelled, trim_silence=trim_silence,
+                                      timings=timings, **chunking, **options)
+        else:
+            audio = load_audio(audio, is_cancelled=is_cancelled)
+    timings["decode"] = timings.get("decode", 0.0) + time.perf_counter() - started
+    if trim_silence:
+        from vad import drop_silence
+        audio, _ = drop_silence(audio, timings)
+        if len(audio) == 0:
+            return ""
+    started = time.perf_counter()
+    with cancel_scope(is_cancelled):
+        result = model.transcribe(audio, **options)
+    timings["inference"] = timings.get("inference", 0.0) + time.perf_counter() - started
+    return result["text"].strip()
+
+
+def _transcribe(audio, options):
+    # Decodifica no próprio processo de inferência: o array não trafega entre processos.
+    # Retorna (texto, tempos por etapa)
+    timings = {}
+    text = transcribe_audio(_worker_model, audio, is_cancelled=_worker_cancel.is_set, timings=timings, **options)
+    return text, timings
+
+
+def _decode_batch(windows, options):
+    # As janelas chegam como (caminho, limites): o áudio é decodificado aqui, não no estágio de rede.
+    # Retorna (textos, tempos por janela)
+    if _worker_cancel.is_set():
+        raise OperationCancelled("Inferência cancelada")
+    arrays, timings = load_windows(windows, is_cancelled=_worker_cancel.is_set)
+    texts = [""] * len(windows)
+    # Janelas vazias (só silêncio ou além do fim do arquivo) não vão ao modelo
+    keep = [i for i, samples in enumerate(arrays) if len(samples)]
+    if keep:
+        decoded = _worker_backend.decode_batch(_worker_model, [arrays[i] for i in keep], **options)
+        for i, text in zip(keep, decoded):
+            texts[i] = text
+    return texts, timings
+
+
+def _detect_language(source, start, duration):
+    samples = load_audio(source, start=start, duration=duration, is_cancelled=_worker_cancel.is_set)
+    return _worker_backend.detect_language(_worker_model, samples)
+
+
+def gather_futures(futures, on_done):
+    """Future que conclui quando todos de ``futures`` concluírem.
+
+    ``on_done(resultados_em_ordem, erro)`` define o resultado final.
+    """
+    combined = Future()
+    combined.set_running_or_notify_cancel()
+    results = [None] * len(futures)
+    state = {"pending": len(futures), "error": None}
+    lock = threading.Lock()
+
+    def done(index, future):
+        with lock:
+            if future.cancelled():
+                state["error"] = state["error"] or OperationCancelled("Inferência cancelada")
+            elif future.exception() is not None:
+                state["error"] = state["error"] or future.exception()
+            else:
+                results[index] = future.result()
+            state["pending"] -= 1
+            finished = state["pending"] == 0
+        if finished:
+            try:
+                combined.set_result(on_done(results, state["error"]))
+            except Exception as e:
+                combined.set_exception(e)
+
+    for i, future in enumerate(futures):
+        future.add_done_callback(lambda f, i=i: done(i, f))
+    return combined
+
+
+class InferenceEngine:
+    """Pool de processos dedicados à inferência do Whisper.
+
+    Cada processo carrega o modelo uma única vez na inicialização e usa uma
+    fatia dos núcleos, de forma que o pool inteiro ocupe exatamente
+    ``cores`` threads do motor (``backend``, padrão openai-whisper).
+    """
+
+    def __init__(self, model_size="base", device="cpu", workers=None, cores=None, backend=None):
+        self.cores = cores or os.cpu_count() or 1
+        self.workers = max(1, min(workers or 1, self.cores))
+        self.model_size = model_size
+        self.device = device
+        self.backend = backend or get_backend()
+        ctx = multiprocessing.get_context("spawn")
+        self._cancel_event = ctx.Event()
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=ctx,
+            initializer=_init_worker,
+            initargs=(self.backend, model_size, device, self.cores, self.workers, ctx.Value("i", 0),
+                      self._cancel_event)
+        )
+
+    def warm_up(self):
+        """Sobe todos os processos já no início (cada um carrega o modelo).
+
+        Não bloqueia: retorna os Futures com (pid, threads, segundos de carga)
+        de cada worker.
+        """
+        return [self._executor.submit(_ping) for _ in range(self.workers)]
+
+    def submit(self, audio, **options):
+        """Future com ``(texto, {etapa: segundos})``"""
+        return self._executor.submit(_transcribe, audio, options)
+
+    def submit_batch(self, windows, **options):
+        """Transcreve várias janelas de até 30 s numa única passada.
+
+        ``windows`` são tuplas ``(caminho, inicio, fim, margem, trim_silence)``
+        (``load_windows``). Future com ``(textos, tempos por janela)``.
+        """
+        return self._executor.submit(_decode_batch, windows, options)
+
+    def submit_detect(self, source, start=0.0, duration=30.0):
+        """Detecta o idioma de um trecho do arquivo. Future com o código (ex.: "pt")."""
+        return self._executor.submit(_detect_language, source, start, duration)
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        self._executor.shutdown(wait=wait, cancel_futures=cancel_futures)
+
+    def cancel(self, grace=5.0):
+        """Interrompe a inferência em todos os processos.
+
+        Os workers param no próximo segmento de 30 s; os que não terminarem em
+        ``grace`` segundos são encerrados à força.
+        """
+        self._cancel_event.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        # ProcessPoolExecutor não expõe os processos; _processes é estável desde o 3.2
+        processes = list((getattr(self._executor, "_processes", None) or {}).values())
+
+        def terminate_later():
+            deadline = time.monotonic() + grace
+            for proc in processes:
+                proc.join(max(0.0, deadline - time.monotonic()))
+                if proc.is_alive():
+                    proc.terminate()
+
+        threading.Thread(target=terminate_later, daemon=True).start()
+
+
+class InferenceStage:
+    """Fila limitada entre o estágio de rede e o pool de inferência.
+
+    Os workers de rede colocam áudios baixados na fila e seguem para o próximo
+    vídeo; um despachante envia os trabalhos ao pool mantendo no máximo um
+    trabalho em execução por processo. Quando a fila enche, ``put`` bloqueia,
+    limitando quantos áudios ficam baixados à espera.
+    """
+
+    def __init__(self, engine, max_pending=None):
+        self.engine = engine
+        self._queue = queue.Queue(maxsize=max_pending or engine.workers * 2)
+        self._slots = threading.Semaphore(engine.workers)
+        self._cancelled = threading.Event()
+        self._dispatcher = threading.Thread(target=self._dispatch, daemon=True)
+        self._dispatcher.start()
+
+    def put(self, audio, on_done=None, on_timings=None, **options):
+        """Enfileira um áudio. Retorna um Future com o texto transcrito.
+
+        ``on_timings`` recebe os segundos por etapa medidos no processo de inferência.
+        """
+        future = Future()
+        item = (future, audio, options, on_done, on_timings)
+        while True:
+            if self._cancelled.is_set():
+                future.set_running_or_notify_cancel()
+                self._finish(future, on_done, None, OperationCancelled("Inferência cancelada"))
+                return future
+            try:
+                self._queue.put(item, timeout=0.2)
+                return future
+            except queue.Full:
+                pass
+
+    def _dispatch(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            future, audio, options, on_done, on_timings = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            if self._cancelled.is_set():
+                self._finish(future, on_done, None, OperationCancelled("Inferência cancelada"))
+                continue
+            self._slots.acquire()
+            try:
+                inner = self.engine.submit(audio, **options)
+            except Exception as e:
+                self._slots.release()
+                self._finish(future, on_done, None, e)
+                continue
+            inner.add_done_callback(
+                lambda f, future=future, on_done=on_done, on_timings=on_timings:
+                self._on_inner_done(f, future, on_done, on_timings)
+            )
+
+    def _on_inner_done(self, inner, future, on_done, on_timings=None):
+        self._slots.release()
+        if inner.cancelled():
+            self._finish(future, on_done, None, OperationCancelled("Inferência cancelada"))
+        elif inner.exception() is not None:
+            self._finish(future, on_done, None, inner.exception())
+        else:
+            text, timings = inner.result()
+            if on_timings:
+                try:
+                    on_timings(timings)
+                except Exception:
+                    pass
+            self._finish(future, on_done, text, None)
+
+    @staticmethod
+    def _finish(future, on_done, text, error):
+        if on_done:
+            try:
+                text = on_done(text, error)
+                error = None
+            except Exception as e:
+                error = e
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(text)
+
+    def cancel(self):
+        """Descarta os trabalhos enfileirados (chamando ``on_done`` para limpar os áudios)"""
+        self._cancelled.set()
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                self._queue.put(None)
+                break
+            future, _, _, on_done, _ = item
+            if future.set_running_or_notify_cancel():
+                self._finish(future, on_done, None, OperationCancelled("Inferência cancelada"))
+
+    def close(self):
+        """Sinaliza o fim da fila; trabalhos já enfileirados continuam sendo processados"""
+        self._queue.put(None)
+        self._dispatcher.join()
@@ -1,9 +1,13 @@
 import os
 import threading
+import multiprocessing
 import customtkinter as ctk
 from tkinter import messagebox, filedialog
 from PIL import Image, ImageDraw
 from transcriber import TranscriberCore
+from selection import SelectionModel, format_duration
+from run_manifest import RunManifest
+from backends import WHISPER, available_backends
 from ffmpeg_manager import FFmpegManager
 
 # Configurar tema de cores
@@ -17,16 +21,31 @@ ctk.set_appearance_mode("dark")
 ctk.set_default_color_theme("dark-blue")
 
 class VideoSelectionWindow(ctk.CTkToplevel):
-    """Janela para seleção de vídeos da playlist"""
-    def __init__(self, parent, videos, playlist_title):
+    """Janela para seleção de vídeos da playlist.
+
+    A lista é virtualizada: só as linhas visíveis existem como widgets e são
+    reaproveitadas na rolagem; a seleção fica num ``SelectionModel``. Assim a
+    janela abre no mesmo tempo com 50 ou 5000 vídeos. Clique marca/desmarca,
+    Shift+clique aplica o mesmo valor ao intervalo desde o último clique.
+    """
+
+    ROW_HEIGHT = 28
+
+    def __init__(self, parent, videos, playlist_title, caption_lookup=None):
         super().__init__(parent)
         self.title(f"Selecionar Vídeos - {playlist_title}")
-        self.geometry("700x600")
+        self.geometry("760x600")
         self.resizable(True, True)
         
         self.videos = videos
+        self.model = SelectionModel(videos)
         self.selected_indices = []
-        self.checkboxes = []
+        # Coluna "Legenda": consultada só para as linhas exibidas, uma vez por vídeo
+        self.caption_lookup = caption_lookup
+        self._captions = {}
+        self.top = 0
+        self.rows = []
+        self._filter_job = None
         
         # Frame para título
         title_frame = ctk.CTkFrame(self, fg_color=secondary_color)
@@ -40,15 +59,15 @@ class VideoSelectionWindow(ctk.CTkToplevel):
         )
         title_label.pack(side="left", padx=20, pady=15)
         
-        info_label = ctk.CTkLabel(
+        self.info_label = ctk.CTkLabel(
             title_frame, 
-            text=f"Total: {len(videos)} vídeos", 
+            text="", 
             font=ctk.CTkFont(size=12),
             text_color="gray"
         )
-        info_label.pack(side="right", padx=20, pady=15)
+        self.info_label.pack(side="right", padx=20, pady=15)
         
-        # Botões de seleção rápida
+        # Botões de seleção rápida e filtro
         button_frame = ctk.CTkFrame(self, fg_color=secondary_color)
         button_frame.pack(fill="x", padx=0, pady=0)
         
@@ -71,30 +90,37 @@ class VideoSelectionWindow(ctk.CTkToplevel):
             hover_color="gray25"
         )
         deselect_all_btn.pack(side="left", padx=10, pady=10)
-        
-        # Frame scrollável para a lista de vídeos
-        self.scrollable_frame = ctk.CTkScrollableFrame(self, fg_color=secondary_color)
-        self.scrollable_frame.pack(fill="both", expand=True, padx=0, pady=10)
-        
-        # Adicionar checkboxes para cada vídeo
-        for idx, video in enumerate(videos):
-            title = video.get('title', 'Sem título')
-            if title in ['[Deleted video]', '[Private video]']:
-                continue
-            
-            checkbox_var = ctk.BooleanVar(value=True)  # Marcado por padrão
-            checkbox = ctk.CTkCheckBox(
-                self.scrollable_frame, 
-                text=f"{idx+1}. {title[:65]}", 
-                variable=checkbox_var,
-                onvalue=True,
-                offvalue=False,
-                font=ctk.CTkFont(size=11),
-                checkbox_width=20,
-                checkbox_height=20
-            )
-            checkbox.pack(anchor="w", padx=20, pady=6)
-            self.checkboxes.append((idx, checkbox_var))
+
+        # Com filtro, os botões acima valem só para os vídeos filtrados
+        self.filter_entry = ctk.CTkEntry(
+            button_frame,
+            placeholder_text="🔍 Filtrar por título...",
+            height=30
+        )
+        self.filter_entry.pack(side="left", padx=10, pady=10, fill="x", expand=True)
+        self.filter_entry.bind("<KeyRelease>", self.schedule_filter)
+
+        # Cabeçalho das colunas
+        header = ctk.CTkFrame(self, fg_color=bg_color, height=self.ROW_HEIGHT)
+        header.pack(fill="x", padx=0, pady=(10, 0))
+        self._grid_columns(header)
+        for column, text in ((1, "Título"), (2, "Duração"), (3, "Legenda")):
+            ctk.CTkLabel(header, text=text, font=ctk.CTkFont(size=11, weight="bold"),
+                         text_color="gray", anchor="w").grid(row=0, column=column, sticky="ew", padx=4)
+
+        # Lista virtualizada: linhas fixas + barra de rolagem sobre ``self.top``
+        list_frame = ctk.CTkFrame(self, fg_color=secondary_color)
+        list_frame.pack(fill="both", expand=True, padx=0, pady=(0, 10))
+        self.scrollbar = ctk.CTkScrollbar(list_frame, command=self.on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        self.rows_frame = ctk.CTkFrame(list_frame, fg_color="transparent")
+        self.rows_frame.pack(side="left", fill="both", expand=True)
+        # A altura vem da janela, não das linhas: o redimensionamento decide quantas existem
+        self.rows_frame.grid_propagate(False)
+        self.rows_frame.bind("<Configure>", self.on_resize)
+        for widget in (self.rows_frame, list_frame):
+            self._bind_wheel(widget)
+        self.ensure_rows(18)
         
         # Botões de ação
         action_frame = ctk.CTkFrame(self)
@@ -123,17 +149,136 @@ class VideoSelectionWindow(ctk.CTkToplevel):
         cancel_btn.pack(side="left", padx=5, fill="x", expand=True)
         
         self.result = None
+        self.render()
+
+    def _grid_columns(self, frame):
+        frame.grid_columnconfigure(0, minsize=30)
+        frame.grid_columnconfigure(1, weight=1)
+        frame.grid_columnconfigure(2, minsize=80)
+        frame.grid_columnconfigure(3, minsize=70)
+
+    def _bind_wheel(self, widget):
+        widget.bind("<MouseWheel>", self.on_wheel)
+        widget.bind("<Button-4>", lambda e: self.scroll_to(self.top - 3))
+        widget.bind("<Button-5>", lambda e: self.scroll_to(self.top + 3))
+
+    def ensure_rows(self, count):
+        """Mantém ``count`` linhas de widgets (as que cabem na altura da lista)"""
+        while len(self.rows) < count:
+            slot = len(self.rows)
+            row = ctk.CTkFrame(self.rows_frame, fg_color="transparent", height=self.ROW_HEIGHT)
+            row.grid(row=slot, column=0, sticky="ew")
+            self._grid_columns(row)
+            labels = [
+                ctk.CTkLabel(row, text="", width=30, text_color=primary_color, font=ctk.CTkFont(size=14)),
+                ctk.CTkLabel(row, text="", anchor="w", font=ctk.CTkFont(size=11)),
+                ctk.CTkLabel(row, text="", anchor="w", text_color="gray", font=ctk.CTkFont(size=11)),
+                ctk.CTkLabel(row, text="", anchor="w", font=ctk.CTkFont(size=11)),
+            ]
+            for column, label in enumerate(labels):
+                label.grid(row=0, column=column, sticky="ew", padx=4)
+            for widget in [row] + labels:
+                widget.bind("<Button-1>", lambda e, slot=slot: self.on_click(slot, False))
+                widget.bind("<Shift-Button-1>", lambda e, slot=slot: self.on_click(slot, True))
+                self._bind_wheel(widget)
+            self.rows.append((row, labels))
+        self.rows_frame.grid_columnconfigure(0, weight=1)
+        while len(self.rows) > count:
+            row, _ = self.rows.pop()
+            row.destroy()
+
+    def visible_count(self):
+        return len(self.rows)
+
+    def on_resize(self, event):
+        count = max(1, event.height // self.ROW_HEIGHT)
+        if count != len(self.rows):
+            self.ensure_rows(count)
+            self.render()
+
+    def caption_text(self, index):
+        if index not in self._captions:
+            status = None
+            if self.caption_lookup is not None:
+                try:
+                    status = self.caption_lookup(self.videos[index])
+                except Exception:
+                    pass
+            self._captions[index] = {True: "✓", False: "IA"}.get(status, "?")
+        return self._captions[index]
+
+    def render(self):
+        """Preenche as linhas visíveis a partir de ``self.top``"""
+        view = self.model.view
+        self.top = max(0, min(self.top, len(view) - self.visible_count()))
+        for slot, (_, (check, title, duration, captions)) in enumerate(self.rows):
+            position = self.top + slot
+            if position >= len(view):
+                for label in (check, title, duration, captions):
+                    label.configure(text="")
+                continue
+            index = view[position]
+            check.configure(text="☑" if self.model.is_selected(index) else "☐")
+            title.configure(text=f"{index+1}. {self.model.title(index)[:80]}")
+            duration.configure(text=format_duration(self.videos[index].get('duration')))
+            captions.configure(text=self.caption_text(index))
+        if view:
+            self.scrollbar.set(self.top / len(view), min(1.0, (self.top + self.visible_count()) / len(view)))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+        shown = f" • {len(view)} exibidos" if len(view) != self.model.total() else ""
+        self.info_label.configure(text=f"{self.model.count()} de {self.model.total()} selecionados{shown}")
+
+    def scroll_to(self, top):
+        top = max(0, min(int(top), len(self.model.view) - self.visible_count()))
+        if top != self.top:
+            self.top = top
+            self.render()
+
+    def on_scrollbar(self, action, value, unit=None):
+        if action == "moveto":
+            self.scroll_to(float(value) * len(self.model.view))
+        elif action == "scroll":
+            step = self.visible_count() if unit == "pages" else 1
+            self.scroll_to(self.top + int(value) * step)
+
+    def on_wheel(self, event):
+        # Windows: múltiplos de 120; macOS: valores pequenos
+        steps = -event.delta // 120 if abs(event.delta) >= 120 else -event.delta
+        self.scroll_to(self.top + steps * 3)
+
+    def on_click(self, slot, extend):
+        position = self.top + slot
+        if position >= len(self.model.view):
+            return
+        if extend:
+            self.model.extend_to(position)
+        else:
+            self.model.toggle(position)
+        self.render()
+
+    def schedule_filter(self, event=None):
+        # Espera uma pausa na digitação antes de filtrar
+        if self._filter_job is not None:
+            self.after_cancel(self._filter_job)
+        self._filter_job = self.after(150, self.apply_filter)
+
+    def apply_filter(self):
+        self._filter_job = None
+        self.model.filter(self.filter_entry.get())
+        self.top = 0
+        self.render()
     
     def select_all(self):
-        for _, var in self.checkboxes:
-            var.set(True)
+        self.model.set_all(True)
+        self.render()
     
     def deselect_all(self):
-        for _, var in self.checkboxes:
-            var.set(False)
+        self.model.set_all(False)
+        self.render()
     
     def confirm(self):
-        self.selected_indices = [idx for idx, var in self.checkboxes if var.get()]
+        self.selected_indices = self.model.selected_indices()
         if not self.selected_indices:
             messagebox.showwarning("Aviso", "Selecione pelo menos um vídeo!")
             return
@@ -226,6 +371,27 @@ class TranscriberApp(ctk.CTk):
         self.label_worker_val.pack(side="left", padx=15, pady=15)
         self.workers_slider.configure(command=self.update_worker_label)
 
+        # Motor e tamanho do modelo da IA (escolhidos a cada execução)
+        self.engine_menu = ctk.CTkOptionMenu(
+            self.settings_frame,
+            values=available_backends() or [WHISPER],
+            width=130,
+            fg_color=primary_color,
+            button_color=accent_color
+        )
+        self.engine_menu.set(WHISPER)
+        self.engine_menu.pack(side="left", padx=(15, 5), pady=15)
+
+        self.model_menu = ctk.CTkOptionMenu(
+            self.settings_frame,
+            values=["tiny", "base", "small", "medium"],
+            width=90,
+            fg_color=primary_color,
+            button_color=accent_color
+        )
+        self.model_menu.set("base")
+        self.model_menu.pack(side="left", padx=(5, 15), pady=15)
+
         # Botões de Ação
         buttons_frame = ctk.CTkFrame(self)
         buttons_frame.grid(row=5, column=0, padx=20, pady=15, sticky="ew")
@@ -266,14 +432,25 @@ class TranscriberApp(ctk.CTk):
             text_color=primary_color
         )
         console_label.grid(row=7, column=0, padx=20, pady=(10, 5), sticky="w")
+
+        # Progresso e vazão (preenchido pelos eventos do TranscriberCore)
+        self.progress_label = ctk.CTkLabel(
+            self,
+            text="",
+            font=ctk.CTkFont(size=11),
+            text_color="gray"
+        )
+        self.progress_label.grid(row=7, column=0, padx=20, pady=(10, 5), sticky="e")
         
         self.console = ctk.CTkTextbox(self, height=150, fg_color=secondary_color)
         self.console.grid(row=8, column=0, padx=20, pady=(0, 20), sticky="nsew")
         self.console.insert("0.0", "Aguardando URL...\n")
         self.console.configure(state="disabled")
 
-        self.core = TranscriberCore(logger_callback=self.update_console)
+        self.core = TranscriberCore(logger_callback=self.update_console, progress_callback=self.update_progress)
         self.playlist_data = None
+        # Com a janela já desenhada, adianta as importações pesadas (torch/Whisper)
+        self.after(1000, self.core.warm_up_imports)
 
     def check_ffmpeg(self):
         """Verifica e baixa FFmpeg se necessário"""
@@ -393,6 +570,28 @@ class TranscriberApp(ctk.CTk):
         self.console.see("end")
         self.console.configure(state="disabled")
 
+    def update_progress(self, event):
+        self.after(0, self._safe_update_progress, event)
+
+    def _safe_update_progress(self, event):
+        total = event.get("total")
+        done = event.get("done", 0)
+        if total:
+            self.progress_bar.stop()
+            self.progress_bar.configure(mode="determinate")
+            self.progress_bar.set(done / total)
+        parts = [f"{done}/{total}" if total else f"{done} vídeos"]
+        rate = event.get("videos_per_min")
+        if rate:
+            parts.append(f"{rate:.1f} vídeos/min")
+        eta = event.get("eta")
+        if eta is not None and event.get("event") == "video":
+            minutes, seconds = divmod(int(eta), 60)
+            parts.append(f"ETA {minutes:02d}:{seconds:02d}")
+        if event.get("event") == "finish":
+            parts.append(f"✅ {event.get('success', 0)} transcritos")
+        self.progress_label.configure(text=" • ".join(parts))
+
     def fetch_videos(self):
         """Busca os vídeos da playlist e abre janela de seleção"""
         url = self.url_entry.get().strip()
@@ -424,7 +623,13 @@ class TranscriberApp(ctk.CTk):
 
     def show_video_selection(self, playlist_title, videos):
         """Mostra janela de seleção de vídeos"""
-        selection_window = VideoSelectionWindow(self, videos, playlist_title)
+        # Legendas já conhecidas: cache e manifesto de uma execução anterior na pasta
+        folder = self.folder_var.get()
+        manifest = RunManifest(folder) if os.path.isdir(folder) else None
+        selection_window = VideoSelectionWindow(
+            self, videos, playlist_title,
+            caption_lookup=lambda video: self.core.caption_status(video, manifest)
+        )
         self.wait_window(selection_window)
         
         if selection_window.result is not None:
@@ -446,12 +651,15 @@ class TranscriberApp(ctk.CTk):
         self.core.reset_cancel()
         self.fetch_button.configure(state="disabled")
         self.cancel_op_button.configure(state="normal", fg_color="#CC0000")
-        self.progress_bar.configure(mode="indeterminate")
-        self.progress_bar.start()
+        self.progress_bar.configure(mode="determinate")
+        self.progress_bar.set(0)
+        self.progress_label.configure(text="")
         
         workers = int(self.workers_slider.get())
+        engine = (self.engine_menu.get(), self.model_menu.get())
         
-        thread = threading.Thread(target=self.run_core, args=(url, output_folder, selected_indices, workers))
+        thread = threading.Thread(target=self.run_core,
+                                  args=(url, output_folder, selected_indices, workers, videos, engine))
         thread.daemon = True
         thread.start()
 
@@ -461,10 +669,15 @@ class TranscriberApp(ctk.CTk):
             self.core.cancel()
             self.cancel_op_button.configure(state="disabled", fg_color="gray30")
 
-    def run_core(self, url, output_folder, selected_indices, workers):
+    def run_core(self, url, output_folder, selected_indices, workers, videos=None, engine=(None, None)):
         try:
-            self.core.run_playlist(url, output_folder, selected_video_indices=selected_indices, max_workers=workers)
-            self.after(0, lambda: messagebox.showinfo("Sucesso", "Transcrição concluída!"))
+            # Reaproveita a lista exibida na seleção, sem buscar a playlist de novo
+            self.core.run_playlist(url, output_folder, selected_video_indices=selected_indices,
+                                   max_workers=workers, videos=videos, engine=engine[0], model_size=engine[1])
+            if self.core.is_cancelled():
+                self.after(0, lambda: messagebox.showinfo("Cancelado", "Operação cancelada."))
+            else:
+                self.after(0, lambda: messagebox.showinfo("Sucesso", "Transcrição concluída!"))
         except Exception as e:
             self.update_console(f"ERRO: {e}")
             self.after(0, lambda: messagebox.showerror("Erro", str(e)))
@@ -483,5 +696,7 @@ class TranscriberApp(ctk.CTk):
         self.progress_bar.set(0)
 
 if __name__ == "__main__":
+    # Necessário para o pool de inferência no executável do PyInstaller
+    multiprocessing.freeze_support()
     app = TranscriberApp()
     app.mainloop()
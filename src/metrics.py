@@ -0,0 +1,209 @@
+import os
+import json
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+# Etapas medidas por vídeo (nomes usados nos eventos, no log e no Prometheus)
+PLAYLIST_FETCH = "playlist_fetch"
+SUBTITLE_PROBE = "subtitle_probe"
+CAPTION_DOWNLOAD = "caption_download"
+VTT_PARSE = "vtt_parse"
+AUDIO_DOWNLOAD = "audio_download"
+VAD_SCAN = "vad_scan"
+LANGUAGE_DETECT = "language_detect"
+DECODE = "decode"
+MODEL_LOAD = "model_load"
+INFERENCE = "inference"
+WRITE = "write"
+
+QUANTILES = (0.5, 0.9, 0.99)
+SAMPLES_PER_STAGE = 2048    # amostras recentes guardadas para os quantis
+
+COUNTER_HELP = {
+    "videos": "Vídeos processados por resultado",
+    "cache_hits": "Transcrições servidas pelo cache local",
+    "ai_fallbacks": "Vídeos sem legenda enviados à IA",
+    "requests": "Requisições ao YouTube",
+    "retries": "Requisições repetidas após 429/5xx",
+    "throttled": "Respostas de limite de taxa (429)",
+    "http_errors": "Requisições que falharam",
+    "errors": "Erros por etapa e tipo de exceção",
+}
+
+
+def quantile(values, q):
+    """Quantil por vizinho mais próximo de uma lista já ordenada"""
+    if not values:
+        return None
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def _label_text(labels):
+    escaped = ((k, str(v).replace("\\", "\\\\").replace('"', '\\"')) for k, v in labels)
+    return ",".join(f'{k}="{v}"' for k, v in escaped)
+
+
+class _StageStats:
+    def __init__(self):
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self.samples = deque(maxlen=SAMPLES_PER_STAGE)
+
+    def add(self, seconds):
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+        self.samples.append(seconds)
+
+    def summary(self):
+        ordered = sorted(self.samples)
+        result = {"count": self.count, "sum": round(self.sum, 4), "max": round(self.max, 4)}
+        for q in QUANTILES:
+            result[f"p{int(q * 100)}"] = round(quantile(ordered, q), 4)
+        return result
+
+
+class RunMetrics:
+    """Tempos por etapa e contadores de todas as execuções de um ``TranscriberCore``.
+
+    Cada medição vai para os agregados (contagem, soma, máximo e quantis
+    recentes), para o total do vídeo (``pop_video``) e, como evento, para
+    ``callback`` e para o log JSON-lines em ``log_path``. ``prometheus_path``
+    recebe os agregados no formato texto do Prometheus (``flush``), para o
+    textfile collector do node_exporter. Os valores são acumulados durante a
+    vida do objeto, como contadores do Prometheus.
+    """
+
+    def __init__(self, callback=None, log_path=None, prometheus_path=None, flush_interval=1.0):
+        self.callback = callback
+        self.log_path = log_path
+        self.prometheus_path = prometheus_path
+        self.flush_interval = flush_interval
+        self._stages = {}
+        self._counters = {}
+        self._videos = {}
+        self._last_flush = 0.0
+        self._lock = threading.Lock()
+        self._log_lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, vid_id, name):
+        """Mede o bloco ``with`` como a etapa ``name`` do vídeo (None: da execução)"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(vid_id, name, time.perf_counter() - started)
+
+    def record(self, vid_id, name, seconds, **details):
+        with self._lock:
+            self._stages.setdefault(name, _StageStats()).add(seconds)
+            if vid_id:
+                stages = self._videos.setdefault(vid_id, {})
+                stages[name] = stages.get(name, 0.0) + seconds
+        self._emit({"event": "stage", "vid_id": vid_id, "stage": name, "seconds": round(seconds, 4), **details})
+
+    def record_many(self, vid_id, timings):
+        """Registra um dict ``{etapa: segundos}`` (ex.: vindo de um processo de inferência)"""
+        for name, seconds in (timings or {}).items():
+            self.record(vid_id, name, seconds)
+
+    def count(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+        self._emit({"event": "count", "name": name, "amount": amount, **labels})
+
+    def error(self, stage, exc):
+        """Conta um erro pelo tipo da exceção"""
+        self.count("errors", stage=stage, type=type(exc).__name__)
+
+    def pop_video(self, vid_id):
+        """Segundos por etapa do vídeo (somados), removidos dos pendentes"""
+        with self._lock:
+            stages = self._videos.pop(vid_id, {})
+        return {name: round(seconds, 4) for name, seconds in stages.items()}
+
+    def clear_videos(self):
+        with self._lock:
+            self._videos.clear()
+
+    def snapshot(self):
+        """Agregados atuais: ``{"stages": {etapa: resumo}, "counters": {...}}``.
+
+        Contadores com rótulos viram um dict ``{"k=v,...": valor}``.
+        """
+        with self._lock:
+            stages = {name: stats.summary() for name, stats in self._stages.items()}
+            counters = {}
+            for (name, labels), value in sorted(self._counters.items()):
+                if labels:
+                    counters.setdefault(name, {})[",".join(f"{k}={v}" for k, v in labels)] = value
+                else:
+                    counters[name] = value
+        return {"stages": stages, "counters": counters}
+
+    def log(self, event):
+        """Acrescenta um evento (ex.: de progresso) ao log JSON-lines"""
+        if not self.log_path:
+            return
+        line = json.dumps({"ts": round(time.time(), 3), **event}, ensure_ascii=False, default=str)
+        with self._log_lock:
+            try:
+                with open(self.log_path, "a", encoding="utf-8") as f:
+                    f.write(line + "\n")
+            except OSError:
+                pass
+
+    def _emit(self, event):
+        self.log(event)
+        if self.callback:
+            try:
+                self.callback(event)
+            except Exception:
+                pass
+
+    def render_prometheus(self, prefix="transcriber"):
+        lines = [f"# HELP {prefix}_stage_seconds Duração de cada etapa do processamento",
+                 f"# TYPE {prefix}_stage_seconds summary"]
+        with self._lock:
+            stages = {name: (stats.count, stats.sum, sorted(stats.samples))
+                      for name, stats in sorted(self._stages.items())}
+            counters = sorted(self._counters.items())
+        for name, (count, total, ordered) in stages.items():
+            for q in QUANTILES:
+                lines.append(f'{prefix}_stage_seconds{{stage="{name}",quantile="{q}"}} {quantile(ordered, q):.6f}')
+            lines.append(f'{prefix}_stage_seconds_sum{{stage="{name}"}} {total:.6f}')
+            lines.append(f'{prefix}_stage_seconds_count{{stage="{name}"}} {count}')
+        declared = set()
+        for (name, labels), value in counters:
+            metric = f"{prefix}_{name}_total"
+            if metric not in declared:
+                declared.add(metric)
+                lines.append(f"# HELP {metric} {COUNTER_HELP.get(name, name)}")
+                lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric}{{{_label_text(labels)}}} {value}" if labels else f"{metric} {value}")
+        return "\n".join(lines) + "\n"
+
+    def flush(self, force=False):
+        """Regrava o arquivo do Prometheus (no máximo a cada ``flush_interval`` s)"""
+        if not self.prometheus_path:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_flush < self.flush_interval:
+            return
+        self._last_flush = now
+        # Gravação atômica: o coletor nunca lê um arquivo pela metade
+        tmp = f"{self.prometheus_path}.tmp"
+        try:
+            folder = os.path.dirname(self.prometheus_path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(self.render_prometheus())
+            os.replace(tmp, self.prometheus_path)
+        except OSError:
+            pass
@@ -0,0 +1,211 @@
+import gc
+import sys
+import threading
+import time
+import importlib.util
+from contextlib import contextmanager
+from functools import lru_cache
+
+
+def module_available(name):
+    """Verifica se um pacote está instalado sem importá-lo"""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def whisper_available():
+    """Whisper e torch instalados; a importação real (segundos) fica para o primeiro uso"""
+    return module_available("whisper") and module_available("torch")
+
+
+def import_whisper():
+    """Importa o Whisper (e com ele torch, numba e tiktoken)"""
+    import whisper
+    return whisper
+
+
+@lru_cache(maxsize=None)
+def default_device():
+    """Retorna 'cuda' se houver GPU disponível, senão 'cpu'"""
+    try:
+        import torch
+        return "cuda" if torch.cuda.is_available() else "cpu"
+    except ImportError:
+        return "cpu"
+
+
+def load_whisper_model(model_size, device):
+    """Loader padrão: carrega o modelo do openai-whisper"""
+    return import_whisper().load_model(model_size, device=device)
+
+
+class _ModelEntry:
+    """Instâncias carregadas de um par (tamanho, device)"""
+
+    def __init__(self, max_replicas):
+        self.max_replicas = max_replicas
+        self.idle = []          # instâncias livres para uso
+        self.loaded = 0         # total de instâncias (livres + emprestadas)
+        self.borrowed = 0
+        self.last_used = time.monotonic()
+        self.cond = threading.Condition()
+
+
+class ModelRegistry:
+    """Carrega cada modelo uma única vez e compartilha entre vídeos e workers.
+
+    Cada par (tamanho, device) é carregado sob demanda. Uma instância nunca é
+    usada por dois workers ao mesmo tempo: quem pede um modelo recebe uma
+    réplica livre ou espera até que uma seja devolvida. Com ``max_replicas``
+    maior que 1, até N cópias são carregadas para permitir inferência paralela.
+
+    Modelos ociosos por mais de ``idle_timeout`` segundos são descarregados
+    automaticamente (``None`` desativa a política).
+    """
+
+    def __init__(self, loader=None, max_replicas=1, idle_timeout=300, logger=None, on_load=None):
+        self._loader = loader or load_whisper_model
+        # Recebe (chave, segundos) a cada modelo carregado
+        self.on_load = on_load
+        self.max_replicas = max(1, int(max_replicas))
+        self.idle_timeout = idle_timeout
+        self._logger = logger
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._reaper = None
+        self._stop_reaper = threading.Event()
+
+    def log(self, message):
+        if self._logger:
+            self._logger(message)
+
+    def _entry(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = _ModelEntry(self.max_replicas)
+                self._entries[key] = entry
+            return entry
+
+    def _checkout(self, key):
+        entry = self._entry(key)
+        with entry.cond:
+            while True:
+                if entry.idle:
+                    model = entry.idle.pop()
+                    break
+                if entry.loaded < entry.max_replicas:
+                    # Reserva a vaga antes de carregar fora do lock
+                    entry.loaded += 1
+                    model = None
+                    break
+                entry.cond.wait()
+            entry.borrowed += 1
+
+        if model is None:
+            try:
+                self.log(f"🧠 Carregando modelo Whisper '{key[0]}' ({key[1]})...")
+                started = time.perf_counter()
+                model = self._loader(*key)
+                if self.on_load:
+                    self.on_load(key, time.perf_counter() - started)
+            except Exception:
+                with entry.cond:
+                    entry.loaded -= 1
+                    entry.borrowed -= 1
+                    entry.cond.notify()
+                raise
+        return entry, model
+
+    def _checkin(self, entry, model):
+        with entry.cond:
+            entry.idle.append(model)
+            entry.borrowed -= 1
+            entry.last_used = time.monotonic()
+            entry.cond.notify()
+        self._ensure_reaper()
+
+    @contextmanager
+    def use(self, model_size="base", device=None):
+        """Empresta uma instância exclusiva do modelo durante o bloco ``with``"""
+        key = (model_size, device or default_device())
+        entry, model = self._checkout(key)
+        try:
+            yield model
+        finally:
+            self._checkin(entry, model)
+
+    def preload(self, model_size="base", device=None):
+        """Carrega o modelo antecipadamente (sem usar)"""
+        with self.use(model_size, device):
+            pass
+
+    def loaded_keys(self):
+        with self._lock:
+            return [key for key, entry in self._entries.items() if entry.loaded]
+
+    def unload(self, model_size, device=None):
+        """Descarrega as instâncias livres do modelo. Retorna quantas foram liberadas."""
+        key = (model_size, device or default_device())
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return 0
+        with entry.cond:
+            released = len(entry.idle)
+            entry.idle.clear()
+            entry.loaded -= released
+        if released:
+            self.log(f"♻️ Modelo '{key[0]}' ({key[1]}) descarregado da memória.")
+            self._release_memory()
+        return released
+
+    def unload_idle(self, now=None):
+        """Descarrega modelos sem uso há mais de ``idle_timeout`` segundos"""
+        if self.idle_timeout is None:
+            return 0
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            items = list(self._entries.items())
+        released = 0
+        for key, entry in items:
+            with entry.cond:
+                expired = (entry.borrowed == 0 and entry.idle
+                           and now - entry.last_used >= self.idle_timeout)
+            if expired:
+                released += self.unload(*key)
+        return released
+
+    def clear(self):
+        """Descarrega todos os modelos livres e encerra o monitor de ociosidade"""
+        self._stop_reaper.set()
+        with self._lock:
+            keys = list(self._entries)
+        for key in keys:
+            self.unload(*key)
+
+    def _ensure_reaper(self):
+        if self.idle_timeout is None:
+            return
+        with self._lock:
+            if self._reaper and self._reaper.is_alive():
+                return
+            self._stop_reaper.clear()
+            self._reaper = threading.Thread(target=self._reap_loop, daemon=True)
+            self._reaper.start()
+
+    def _reap_loop(self):
+        interval = max(1.0, min(60.0, self.idle_timeout / 4))
+        while not self._stop_reaper.wait(interval):
+            self.unload_idle()
+            if not self.loaded_keys():
+                break
+
+    @staticmethod
+    def _release_memory():
+        gc.collect()
+        torch = sys.modules.get("torch")
+        if torch is not None and torch.cuda.is_available():
+            torch.cuda.empty_cache()
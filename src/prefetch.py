@@ -0,0 +1,176 @@
+import os
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from audio import download_audio, remove_audio_files
+from cancellation import OperationCancelled
+
+# Áudio original (opus/m4a ~128 kbps) quando o tamanho não é conhecido
+BYTES_PER_SECOND = 16 * 1024
+UNKNOWN_BYTES = 10 * 1024 * 1024
+
+
+def estimate_audio_bytes(info=None, duration=None):
+    """Tamanho esperado do melhor áudio, pelos formatos extraídos ou pela duração"""
+    if info:
+        sizes = [f.get('filesize') or f.get('filesize_approx') for f in info.get('formats') or []
+                 if f.get('vcodec') == 'none' and f.get('acodec') not in (None, 'none')]
+        sizes = [s for s in sizes if s]
+        if sizes:
+            return max(sizes)
+        duration = duration or info.get('duration')
+    return int(duration * BYTES_PER_SECOND) if duration else UNKNOWN_BYTES
+
+
+class _Prefetch:
+    def __init__(self, vid_id, estimate):
+        self.vid_id = vid_id
+        self.estimate = estimate
+        self.cancelled = False
+        self.future = None
+
+
+class AudioPrefetcher:
+    """Baixa o áudio especulativamente, antes de saber se a legenda serve.
+
+    Cada download roda em segundo plano (``workers`` simultâneos, o limite de
+    banda) e ocupa uma parte de ``max_bytes`` (o limite em disco) até ser
+    reclamado com ``take`` ou descartado com ``discard``, que cancela o
+    download em andamento e apaga o arquivo. Pedidos acima do orçamento são
+    simplesmente ignorados: o vídeo baixa o áudio normalmente se precisar.
+    """
+
+    def __init__(self, max_bytes=500 * 1024 * 1024, workers=2, download=None, call=None,
+                 is_cancelled=None, logger=None):
+        self.max_bytes = max_bytes
+        self.workers = max(1, workers)
+        self.is_cancelled = is_cancelled
+        self._download = download or download_audio
+        # Envolve o download (ex.: ``RequestScheduler.call``)
+        self._call = call or (lambda fn: fn())
+        self._logger = logger
+        self._items = {}
+        self._reserved = 0
+        self._lock = threading.Lock()
+        self._executor = None
+        # Últimos vídeos processados: True quando precisaram da IA
+        self._outcomes = deque(maxlen=20)
+        self.stats = {"started": 0, "used": 0, "discarded": 0, "over_budget": 0, "wasted_bytes": 0,
+                      "not_started": 0}
+
+    def log(self, message):
+        if self._logger:
+            self._logger(message)
+
+    def record_outcome(self, needed_ai):
+        with self._lock:
+            self._outcomes.append(bool(needed_ai))
+
+    def ai_ratio(self, min_samples=3):
+        """Fração recente de vídeos sem legenda utilizável (None sem amostras suficientes)"""
+        with self._lock:
+            if len(self._outcomes) < min_samples:
+                return None
+            return sum(self._outcomes) / len(self._outcomes)
+
+    def start(self, video_url, vid_id, info=None, duration=None):
+        """Inicia o download em segundo plano. Retorna False se já existe ou não cabe no orçamento."""
+        if not vid_id or (self.is_cancelled is not None and self.is_cancelled()):
+            return False
+        estimate = estimate_audio_bytes(info, duration)
+        with self._lock:
+            if vid_id in self._items:
+                return False
+            if self._reserved + estimate > self.max_bytes:
+                self.stats["over_budget"] += 1
+                return False
+            item = self._items[vid_id] = _Prefetch(vid_id, estimate)
+            self._reserved += estimate
+            self.stats["started"] += 1
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers,
+                                                    thread_name_prefix="prefetch")
+            item.future = self._executor.submit(self._run, item, video_url, info)
+        return True
+
+    def _run(self, item, video_url, info):
+        def cancelled():
+            return item.cancelled or (self.is_cancelled is not None and self.is_cancelled())
+
+        if cancelled():
+            raise OperationCancelled("Pré-carregamento cancelado")
+        path = self._call(lambda: self._download(video_url, item.vid_id, info=info, is_cancelled=cancelled))
+        if path:
+            # Ajusta a reserva ao tamanho real
+            size = os.path.getsize(path)
+            with self._lock:
+                if self._items.get(item.vid_id) is item:
+                    self._reserved += size - item.estimate
+                    item.estimate = size
+        return path
+
+    def _release(self, vid_id):
+        with self._lock:
+            item = self._items.pop(vid_id, None)
+            if item is not None:
+                self._reserved -= item.estimate
+        return item
+
+    def pending(self, vid_id):
+        with self._lock:
+            return vid_id in self._items
+
+    def take(self, vid_id):
+        """Espera o download especulativo do vídeo e assume o arquivo.
+
+        Retorna o caminho ou None (sem pré-carregamento, ainda na fila atrás
+        de downloads adiantados, ou falhou); nesse caso quem chamou baixa o
+        áudio normalmente, sem esperar a fila.
+        """
+        with self._lock:
+            item = self._items.get(vid_id)
+        if item is None:
+            return None
+        if item.future.cancel():
+            # Nem começou: esperar seria ficar atrás dos vídeos seguintes
+            self._release(vid_id)
+            self.stats["not_started"] += 1
+            return None
+        try:
+            path = item.future.result()
+        except Exception:
+            path = None
+        self._release(vid_id)
+        if path:
+            self.stats["used"] += 1
+        return path
+
+    def discard(self, vid_id):
+        """A legenda serviu: cancela o download e apaga o que já foi baixado"""
+        item = self._release(vid_id)
+        if item is None:
+            return
+        item.cancelled = True
+        self.stats["discarded"] += 1
+
+        def cleanup(future):
+            try:
+                path = future.result()
+            except Exception:
+                path = None
+            if path and os.path.exists(path):
+                self.stats["wasted_bytes"] += os.path.getsize(path)
+            remove_audio_files(item.vid_id)
+
+        item.future.add_done_callback(cleanup)
+
+    def clear(self):
+        """Fim da execução: descarta tudo o que não foi usado"""
+        with self._lock:
+            vid_ids = list(self._items)
+        for vid_id in vid_ids:
+            self.discard(vid_id)
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
@@ -0,0 +1,247 @@
+import re
+import time
+import random
+import threading
+from urllib.parse import urlparse
+from cancellation import OperationCancelled, check_cancelled
+
+RETRYABLE_STATUS = (429, 500, 502, 503, 504)
+_STATUS_RE = re.compile(r'HTTP Error (\d{3})')
+
+
+def error_status(exc):
+    """Código HTTP de uma exceção do urllib/yt-dlp (ou None).
+
+    O yt-dlp embrulha o erro original em ``DownloadError.exc_info`` e às vezes
+    só deixa o código na mensagem ("HTTP Error 429: Too Many Requests").
+    """
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        for attr in ("status", "code"):
+            value = getattr(exc, attr, None)
+            if isinstance(value, int) and 100 <= value < 600:
+                return value
+        response = getattr(exc, "response", None)
+        if isinstance(getattr(response, "status", None), int):
+            return response.status
+        match = _STATUS_RE.search(str(exc))
+        if match:
+            return int(match.group(1))
+        exc_info = getattr(exc, "exc_info", None)
+        exc = (exc_info[1] if exc_info else None) or exc.__cause__ or exc.__context__
+    return None
+
+
+def retry_after(exc):
+    """Segundos pedidos pelo servidor no cabeçalho Retry-After, se houver"""
+    headers = getattr(exc, "headers", None) or getattr(getattr(exc, "response", None), "headers", None)
+    try:
+        return float(headers.get("Retry-After")) if headers else None
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Limita a taxa de requisições: ``rate`` por segundo com rajadas de até ``burst``"""
+
+    def __init__(self, rate, burst=None, clock=time.monotonic):
+        self.rate = float(rate)
+        self.burst = float(burst or max(1.0, rate))
+        self._tokens = self.burst
+        self._clock = clock
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self._clock()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self):
+        """Consome um token. Retorna 0 se conseguiu, senão quantos segundos esperar."""
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self, is_cancelled=None):
+        while True:
+            wait = self.try_acquire()
+            if not wait:
+                return
+            check_cancelled(is_cancelled)
+            time.sleep(min(wait, 0.5))
+
+
+class _HostState:
+    """Concorrência AIMD de um host"""
+
+    def __init__(self, limit, bucket):
+        self.limit = float(limit)
+        self.bucket = bucket
+        self.in_flight = 0
+        self.last_decrease = 0.0
+        self.latency = None     # média móvel do tempo de resposta
+
+
+class RequestScheduler:
+    """Intermedia as requisições do TranscriberCore ao YouTube.
+
+    - um token bucket por host limita a taxa de requisições;
+    - respostas 429/5xx são repetidas com backoff exponencial e jitter
+      (respeitando Retry-After);
+    - o número de requisições simultâneas a cada host segue AIMD: sobe aos
+      poucos enquanto a latência fica abaixo de ``target_latency`` e cai pela
+      metade a cada erro de limite/servidor. Hosts diferentes não disputam
+      vagas entre si (downloads de mídia não seguram as consultas de legenda).
+    """
+
+    def __init__(self, max_concurrency=3, min_concurrency=1, rate_per_host=4.0, burst=8,
+                 max_retries=4, base_delay=1.0, max_delay=60.0, target_latency=5.0,
+                 logger=None, is_cancelled=None, on_count=None):
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_concurrency = max(1, min(min_concurrency, self.max_concurrency))
+        self.rate_per_host = rate_per_host
+        self.burst = burst
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.target_latency = target_latency
+        self.is_cancelled = is_cancelled
+        self._logger = logger
+        self._hosts = {}
+        self._cond = threading.Condition()
+        self.stats = {"requests": 0, "retries": 0, "throttled": 0, "errors": 0}
+        # Recebe o nome de cada contador incrementado (ex.: métricas da execução)
+        self.on_count = on_count
+
+    def log(self, message):
+        if self._logger:
+            self._logger(message)
+
+    def _count(self, key):
+        with self._cond:
+            self.stats[key] += 1
+        if self.on_count:
+            self.on_count(key)
+
+    def set_max_concurrency(self, value):
+        """Ajusta o teto de concorrência por host (ex.: valor do slider de workers)"""
+        with self._cond:
+            self.max_concurrency = max(1, value)
+            self.min_concurrency = min(self.min_concurrency, self.max_concurrency)
+            for state in self._hosts.values():
+                state.limit = min(max(state.limit, self.min_concurrency), self.max_concurrency)
+            self._cond.notify_all()
+
+    def _host(self, host):
+        with self._cond:
+            state = self._hosts.get(host)
+            if state is None:
+                state = self._hosts[host] = _HostState(
+                    self.max_concurrency, TokenBucket(self.rate_per_host, self.burst))
+            return state
+
+    def bucket(self, host):
+        return self._host(host).bucket
+
+    def limit(self, host):
+        """Concorrência atual permitida para ``host``"""
+        return self._host(host).limit
+
+    def _acquire_slot(self, state):
+        with self._cond:
+            while state.in_flight >= int(state.limit):
+                check_cancelled(self.is_cancelled)
+                self._cond.wait(0.5)
+            state.in_flight += 1
+
+    def _release_slot(self, state, host, latency=None, throttled=False):
+        with self._cond:
+            saturated = state.in_flight >= int(state.limit)
+            state.in_flight -= 1
+            if latency is not None:
+                state.latency = latency if state.latency is None else 0.8 * state.latency + 0.2 * latency
+            if throttled:
+                self._decrease(state, host)
+            elif latency is not None and latency < self.target_latency and saturated:
+                # Aumento aditivo (~+1 a cada ``limit`` sucessos), só quando o limite está em uso
+                state.limit = min(self.max_concurrency, state.limit + 1 / state.limit)
+            self._cond.notify_all()
+
+    def _decrease(self, state, host):
+        # Diminuição multiplicativa, no máximo uma vez por tempo de resposta:
+        # as respostas que já estavam a caminho não derrubam o limite de novo
+        now = time.monotonic()
+        if now - state.last_decrease > (state.latency or 0.0):
+            state.limit = max(self.min_concurrency, state.limit / 2)
+            state.last_decrease = now
+            self.log(f"🐢 Limite de requisições de {host}: concorrência reduzida para {int(state.limit)}")
+
+    def backoff(self, attempt, exc=None):
+        """Espera exponencial com jitter completo; Retry-After tem precedência"""
+        hinted = retry_after(exc) if exc is not None else None
+        if hinted is not None:
+            return min(self.max_delay, hinted)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def call(self, fn, url_or_host="www.youtube.com", transfer=False):
+        """Executa ``fn()`` respeitando taxa, concorrência e repetições.
+
+        Com ``transfer=True`` (download de mídia) só o início da requisição
+        passa pela vaga do host: ela é devolvida antes de ``fn`` rodar, e a
+        duração da transferência não entra na latência que guia o AIMD.
+        Respostas 429/5xx ainda reduzem a concorrência do host.
+        """
+        host = url_or_host
+        if "://" in url_or_host:
+            host = urlparse(url_or_host).hostname or url_or_host
+        state = self._host(host)
+        attempt = 0
+        while True:
+            state.bucket.acquire(self.is_cancelled)
+            self._acquire_slot(state)
+            if transfer:
+                self._release_slot(state, host)
+            started = time.monotonic()
+            try:
+                self._count("requests")
+                result = fn()
+            except OperationCancelled:
+                if not transfer:
+                    self._release_slot(state, host)
+                raise
+            except Exception as e:
+                status = error_status(e)
+                retryable = status in RETRYABLE_STATUS
+                if not transfer:
+                    self._release_slot(state, host, latency=time.monotonic() - started, throttled=retryable)
+                elif retryable:
+                    with self._cond:
+                        self._decrease(state, host)
+                if not retryable or attempt >= self.max_retries:
+                    self._count("errors")
+                    raise
+                self._count("retries")
+                if status == 429:
+                    self._count("throttled")
+                delay = self.backoff(attempt, e)
+                self.log(f"   ⏳ HTTP {status} em {host}: nova tentativa em {delay:.1f}s")
+                attempt += 1
+                self._sleep(delay)
+                continue
+            if not transfer:
+                self._release_slot(state, host, latency=time.monotonic() - started)
+            return result
+
+    def _sleep(self, seconds):
+        deadline = time.monotonic() + seconds
+        while True:
+            check_cancelled(self.is_cancelled)
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            time.sleep(min(remaining, 0.5))
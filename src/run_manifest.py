@@ -0,0 +1,126 @@
+import os
+import json
+import time
+import threading
+
+PENDING = "pending"
+SUBTITLE_DONE = "subtitle_done"
+AI_DONE = "ai_done"
+FAILED = "failed"
+
+DONE_STATES = (SUBTITLE_DONE, AI_DONE)
+
+
+class RunManifest:
+    """Estado de cada vídeo de uma pasta de saída, gravado a cada conclusão.
+
+    Permite que uma nova execução da mesma playlist pule os vídeos já
+    concluídos e tente novamente apenas os pendentes ou com falha.
+
+    Cada mudança vira uma linha curta num diário JSON-lines ao lado do
+    manifesto; ``close`` (fim da execução) grava o manifesto completo uma
+    única vez e apaga o diário. Se a execução for interrompida, o diário é
+    reaplicado na próxima leitura.
+    """
+
+    FILENAME = ".transcriber_manifest.json"
+    JOURNAL = ".transcriber_manifest.journal"
+
+    def __init__(self, folder):
+        self.path = os.path.join(folder, self.FILENAME)
+        self.journal_path = os.path.join(folder, self.JOURNAL)
+        self._lock = threading.Lock()
+        self._journal = None
+        self.data = {"playlist_url": None, "updated": None, "videos": {}}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self.data = json.load(f)
+            except (OSError, ValueError):
+                pass
+        self.data.setdefault("videos", {})
+        self._replay()
+
+    def _replay(self):
+        """Aplica as mudanças de uma execução que não chegou ao ``close``"""
+        if not os.path.exists(self.journal_path):
+            return
+        try:
+            with open(self.journal_path, "r", encoding="utf-8") as f:
+                lines = f.readlines()
+        except OSError:
+            return
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # Última linha cortada por uma interrupção
+                continue
+            if record.get("op") == "run":
+                self.data["playlist_url"] = record.get("playlist_url")
+                for vid_id in record.get("pending", []):
+                    self.data["videos"].setdefault(vid_id, {})["state"] = PENDING
+            elif record.get("op") == "update":
+                self.data["videos"][record["id"]] = record["entry"]
+
+    def entry(self, vid_id):
+        return self.data["videos"].get(vid_id)
+
+    def is_done(self, vid_id):
+        """Concluído e com o arquivo de transcrição ainda presente na pasta"""
+        entry = self.entry(vid_id)
+        if not entry or entry.get("state") not in DONE_STATES:
+            return False
+        filepath = entry.get("file")
+        return bool(filepath) and os.path.exists(os.path.join(os.path.dirname(self.path), filepath))
+
+    def start_run(self, playlist_url, vid_ids=()):
+        """Marca como pendentes os vídeos da execução que ainda não foram concluídos"""
+        with self._lock:
+            self.data["playlist_url"] = playlist_url
+            pending = [vid_id for vid_id in vid_ids if not self.is_done(vid_id)]
+            for vid_id in pending:
+                self.data["videos"].setdefault(vid_id, {})["state"] = PENDING
+            self._append({"op": "run", "playlist_url": playlist_url, "pending": pending})
+
+    def update(self, vid_id, state, reason=None, elapsed=None, filepath=None, title=None, path=None):
+        with self._lock:
+            entry = self.data["videos"].setdefault(vid_id, {})
+            entry["state"] = state
+            entry["reason"] = reason
+            if elapsed is not None:
+                entry["elapsed"] = round(elapsed, 2)
+            if filepath:
+                entry["file"] = os.path.basename(filepath)
+            if title:
+                entry["title"] = title
+            if path:
+                # Caminho usado ("subtitle" ou "ai"), aproveitado pelo agendamento
+                entry["path"] = path
+            entry["updated"] = time.time()
+            self._append({"op": "update", "id": vid_id, "entry": entry})
+
+    def _append(self, record):
+        if self._journal is None:
+            self._journal = open(self.journal_path, "a", encoding="utf-8")
+        self._journal.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._journal.flush()
+
+    def close(self):
+        """Compacta: grava o manifesto completo e descarta o diário"""
+        with self._lock:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+            if not os.path.exists(self.journal_path):
+                return
+            self._save()
+            os.remove(self.journal_path)
+
+    def _save(self):
+        """Gravação atômica: arquivo temporário + rename"""
+        self.data["updated"] = time.time()
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.data, f, ensure_ascii=False)
+        os.replace(tmp, self.path)
@@ -0,0 +1,47 @@
+PLAYLIST_ORDER = "playlist"
+LONGEST_FIRST = "longest_first"
+SHORTEST_FIRST = "shortest_first"
+POLICIES = (PLAYLIST_ORDER, LONGEST_FIRST, SHORTEST_FIRST)
+
+# Custos aproximados em segundos de trabalho
+SUBTITLE_COST = 3.0          # extração + download da legenda, independe da duração
+AI_REALTIME_FACTOR = 0.3     # Whisper em CPU: ~0.3 s de inferência por segundo de áudio
+UNKNOWN_DURATION = 600.0     # entradas da listagem sem duração
+
+
+def estimate_cost(video, path=None):
+    """Custo estimado de um vídeo.
+
+    ``path`` é o caminho conhecido: "cache" (sem trabalho), "subtitle", "ai"
+    ou None quando ainda não se sabe se haverá legenda.
+    """
+    if path == "cache":
+        return 0.0
+    duration = video.get('duration') or UNKNOWN_DURATION
+    if path == "subtitle":
+        return SUBTITLE_COST
+    if path == "ai":
+        return SUBTITLE_COST + duration * AI_REALTIME_FACTOR
+    # Sem informação: metade de chance de cair na IA
+    return SUBTITLE_COST + duration * AI_REALTIME_FACTOR / 2
+
+
+def order_entries(entries, policy=PLAYLIST_ORDER, path_of=None):
+    """Reordena ``(indice, video)`` segundo a política.
+
+    - ``playlist``: ordem original;
+    - ``longest_first``: maiores custos primeiro (menor tempo total, os vídeos
+      da IA chegam cedo aos workers de inferência);
+    - ``shortest_first``: menores custos primeiro (primeiros resultados rápidos).
+
+    ``path_of(video)`` informa o caminho conhecido para ``estimate_cost``.
+    A ordenação é estável: empates mantêm a ordem da playlist.
+    """
+    if policy not in POLICIES:
+        raise ValueError(f"Política de agendamento desconhecida: {policy}")
+    if policy == PLAYLIST_ORDER:
+        return list(entries)
+    path_of = path_of or (lambda video: None)
+    costed = [(estimate_cost(video, path_of(video)), i, video) for i, video in entries]
+    costed.sort(key=lambda item: item[0], reverse=(policy == LONGEST_FIRST))
+    return [(i, video) for _, i, video in costed]
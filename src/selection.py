@@ -0,0 +1,109 @@
+"""Estado da lista de seleção de vídeos, independente da interface gráfica.
+
+Guarda a seleção num bitmap (um bit por vídeo) e a lista filtrada como
+índices, para que playlists com milhares de vídeos abram e filtrem sem
+criar um widget ou variável por entrada.
+"""
+
+UNAVAILABLE_TITLES = ('[Deleted video]', '[Private video]')
+
+
+def format_duration(seconds):
+    """``3725`` -> ``1:02:05``; ``None`` -> ``--:--``"""
+    if not seconds:
+        return "--:--"
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{secs:02d}" if hours else f"{minutes}:{secs:02d}"
+
+
+class SelectionModel:
+    """Seleção e filtro sobre as entradas de uma playlist.
+
+    ``view`` são os índices (na playlist) das entradas visíveis com o filtro
+    atual; vídeos removidos ou privados nunca aparecem nem são selecionados.
+    Todos começam marcados.
+    """
+
+    def __init__(self, videos, selected=True):
+        self.videos = videos
+        self._bits = bytearray(b"\xff" if selected else b"\x00") * ((len(videos) + 7) // 8)
+        # Bits de vídeos indisponíveis e do preenchimento final ficam zerados
+        self._base = []
+        for i, video in enumerate(videos):
+            if video.get('title', 'Sem título') in UNAVAILABLE_TITLES:
+                self._set(i, False)
+            else:
+                self._base.append(i)
+        for i in range(len(videos), len(self._bits) * 8):
+            self._set(i, False)
+        self._keys = None       # títulos em minúsculas, calculados no primeiro filtro
+        self._query = ""
+        self.view = self._base
+        # Âncora da seleção com Shift: (posição em ``view``, valor aplicado)
+        self.anchor = None
+
+    def _set(self, index, value):
+        if value:
+            self._bits[index >> 3] |= 1 << (index & 7)
+        else:
+            self._bits[index >> 3] &= ~(1 << (index & 7)) & 0xFF
+
+    def is_selected(self, index):
+        return bool(self._bits[index >> 3] & (1 << (index & 7)))
+
+    def title(self, index):
+        return self.videos[index].get('title', 'Sem título')
+
+    def count(self):
+        """Quantos vídeos estão selecionados (em toda a playlist, não só no filtro)"""
+        return bin(int.from_bytes(self._bits, "little")).count("1")
+
+    def total(self):
+        return len(self._base)
+
+    def toggle(self, position):
+        """Inverte a linha ``position`` de ``view`` e a torna âncora de um Shift-clique"""
+        index = self.view[position]
+        value = not self.is_selected(index)
+        self._set(index, value)
+        self.anchor = (position, value)
+        return value
+
+    def extend_to(self, position):
+        """Aplica o valor da âncora da linha âncora até ``position`` (Shift-clique)"""
+        if self.anchor is None or self.anchor[0] >= len(self.view):
+            return self.toggle(position)
+        start, value = self.anchor
+        for pos in range(min(start, position), max(start, position) + 1):
+            self._set(self.view[pos], value)
+        return value
+
+    def set_all(self, value):
+        """Marca ou desmarca todas as entradas visíveis (com filtro, só as filtradas)"""
+        for index in self.view:
+            self._set(index, value)
+
+    def filter(self, query):
+        """Filtra por trecho do título (sem diferenciar maiúsculas).
+
+        Quando o texto novo apenas estende o anterior, procura só entre os
+        resultados atuais, então digitar letra a letra fica cada vez mais barato.
+        """
+        query = query.strip().lower()
+        if query == self._query:
+            return self.view
+        if not query:
+            self.view = self._base
+        else:
+            if self._keys is None:
+                self._keys = [self.title(i).lower() for i in range(len(self.videos))]
+            source = self.view if self._query and query.startswith(self._query) else self._base
+            self.view = [i for i in source if query in self._keys[i]]
+        self._query = query
+        self.anchor = None
+        return self.view
+
+    def selected_indices(self):
+        """Índices (na playlist) selecionados, em ordem"""
+        return [i for i in self._base if self.is_selected(i)]
@@ -1,28 +1,199 @@
 import os
 import re
-import glob
+import time
 import shutil
+import queue
+import threading
 import warnings
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from yt_dlp import YoutubeDL
+from audio import download_audio, load_audio, remove_audio_files
+from cancellation import OperationCancelled
+from captions import fetch_caption, guess_language, normalize_language, pick_caption_track
+from vtt_parser import parse_vtt, parse_vtt_file
+from chunked import checkpoint_path
+from transcript_cache import TranscriptCache
+from request_scheduler import RequestScheduler
+from prefetch import AudioPrefetcher
+from scheduling import PLAYLIST_ORDER, order_entries
+from run_manifest import RunManifest, AI_DONE, SUBTITLE_DONE, FAILED, PENDING
+from model_registry import ModelRegistry, default_device
+from backends import WHISPER, get_backend
+from batching import BatchingStage
+from inference_engine import InferenceEngine, InferenceStage, gather_futures, transcribe_audio
+from metrics import (RunMetrics, PLAYLIST_FETCH, SUBTITLE_PROBE, CAPTION_DOWNLOAD, VTT_PARSE, AUDIO_DOWNLOAD,
+                     LANGUAGE_DETECT, MODEL_LOAD, INFERENCE, WRITE)
 
 warnings.filterwarnings("ignore")
 
+
+def is_shutdown_error(error):
+    """``executor.submit`` depois do ``shutdown`` (execução cancelada), não uma falha da listagem"""
+    return isinstance(error, RuntimeError) and "after shutdown" in str(error)
+
+
 class TranscriberCore:
-    def __init__(self, logger_callback=None):
+    def __init__(self, logger_callback=None, progress_callback=None, model_size="base", device=None,
+                 model_idle_timeout=300, model_replicas=1,
+                 inference_mode="process", inference_workers=None,
+                 chunk_seconds=600, chunk_overlap=2.0, split_segment_seconds=None,
+                 use_cache=True, cache_max_mb=500, schedule_policy=PLAYLIST_ORDER,
+                 prefetch_audio=False, prefetch_max_mb=300, prefetch_workers=2, engine=WHISPER,
+                 batch_size=1, batch_max_latency=2.0, batch_video_seconds=300,
+                 language=None, language_lock=False, trim_silence=True,
+                 metrics_callback=None, metrics_log=None, metrics_file=None):
         self.logger = logger_callback
+        # Recebe um dict por evento de progresso (ver ``emit_progress``)
+        self.progress_callback = progress_callback
+        # Tempos por etapa e contadores: eventos em ``metrics_callback``, log JSON-lines
+        # em ``metrics_log`` e formato texto do Prometheus em ``metrics_file``
+        self.metrics = RunMetrics(callback=metrics_callback, log_path=metrics_log, prometheus_path=metrics_file)
+        self._video_stats = {}
         self.has_ffmpeg = shutil.which("ffmpeg") is not None
-        self.has_whisper = False
         self._is_cancelled = False
-        try:
-            import whisper
-            self.has_whisper = True
-        except ImportError:
-            pass
+        self._manifest = None
+        self._engine = None
+        self._ai_stage = None
+        self._batcher = None
+        # Pool de inferência da execução: criado no primeiro vídeo que precisa da IA
+        self._inference_lock = threading.Lock()
+        self._inference_workers = 1
+        # Última listagem de cada playlist: url -> (instante, titulo, videos)
+        self._playlist_snapshots = {}
+        self.playlist_snapshot_ttl = 600
+        self.model_size = model_size
+        self.device = device
+        # "process": inferência em pool de processos separado da rede
+        # "thread": inferência nos próprios workers de rede (modelo compartilhado)
+        self.inference_mode = inference_mode
+        self.inference_workers = inference_workers
+        # Janelas de áudio com memória constante (None desativa)
+        self.chunk_seconds = chunk_seconds
+        self.chunk_overlap = chunk_overlap
+        # Divide vídeos longos em silêncios para transcrever os trechos em paralelo
+        # no pool de processos (None desativa)
+        self.split_segment_seconds = split_segment_seconds
+        # Descarta silêncios longos antes da inferência (menos custo e menos alucinação)
+        self.trim_silence = trim_silence
+        # Vídeos de até ``batch_video_seconds`` têm as janelas de 30 s transcritas em
+        # lotes de ``batch_size`` junto com as de outros vídeos (1 desativa)
+        self.batch_size = batch_size
+        self.batch_max_latency = batch_max_latency
+        self.batch_video_seconds = batch_video_seconds
+        # Motor de transcrição ("whisper" ou "faster-whisper"). Só verifica a instalação:
+        # importar o Whisper traz torch e leva segundos
+        self.engine_name = engine
+        self.backend = get_backend(engine)
+        self.has_whisper = self.backend.available()
+        # Idioma passado à IA: fixo (``language``), travado no primeiro vídeo de cada
+        # playlist (``language_lock``) ou, por vídeo, o dos metadados; sem nenhum,
+        # o Whisper detecta sozinho
+        self.language = normalize_language(language)
+        self.language_lock = language_lock
+        self._locked_language = None
+        self._language_mutex = threading.Lock()
+        # Ordem de processamento: "playlist", "longest_first" ou "shortest_first"
+        self.schedule_policy = schedule_policy
+        # Controla taxa, repetições (429/5xx) e concorrência das requisições ao YouTube
+        self.scheduler = RequestScheduler(max_concurrency=5, logger=self.log, is_cancelled=self.is_cancelled,
+                                          on_count=self.count_request)
+        # Cache persistente de transcrições, consultado antes de qualquer acesso à rede
+        self.cache = TranscriptCache(max_bytes=int(cache_max_mb * 1024 * 1024)) if use_cache else None
+        # Download especulativo do áudio enquanto a legenda é consultada (None desativa)
+        self.prefetcher = None
+        if prefetch_audio and self.has_ffmpeg and self.has_whisper:
+            self.prefetcher = AudioPrefetcher(
+                max_bytes=int(prefetch_max_mb * 1024 * 1024),
+                workers=prefetch_workers,
+                call=lambda fn: self.scheduler.call(fn, "rr.googlevideo.com", transfer=True),
+                is_cancelled=self.is_cancelled,
+                logger=self.log
+            )
+        # Abaixo desta fração recente de vídeos sem legenda, não vale especular
+        self.prefetch_threshold = 0.3
+        # Modelos compartilhados entre todos os vídeos e workers
+        self.models = ModelRegistry(
+            loader=self.backend.load,
+            max_replicas=model_replicas,
+            idle_timeout=model_idle_timeout,
+            logger=self.log,
+            on_load=self.record_model_load
+        )
 
     def cancel(self):
+        """Cancela a execução em todas as etapas.
+
+        Downloads param no próximo bloco recebido (hook do yt-dlp), o ffmpeg é
+        encerrado, a inferência para no próximo segmento e os áudios
+        temporários são apagados.
+        """
         self._is_cancelled = True
         self.log("⚠️ Operação cancelada pelo usuário.")
+        with self._inference_lock:
+            ai_stage, batcher, engine = self._ai_stage, self._batcher, self._engine
+        if ai_stage is not None:
+            ai_stage.cancel()
+        if batcher is not None:
+            batcher.cancel()
+        if engine is not None:
+            engine.cancel()
+
+    def warm_up_imports(self):
+        """Adianta em segundo plano as importações pesadas da primeira transcrição por IA.
+
+        No modo "process" o Whisper só é importado nos processos de inferência;
+        aqui basta o torch, usado para escolher o device. Retorna a thread ou None.
+        """
+        if not self.has_whisper:
+            return None
+
+        def warm():
+            try:
+                if self.inference_mode == "process":
+                    default_device()
+                elif self.engine_name == WHISPER:
+                    import whisper  # noqa: F401
+                else:
+                    import faster_whisper  # noqa: F401
+            except Exception:
+                pass
+
+        thread = threading.Thread(target=warm, name="warm-imports", daemon=True)
+        thread.start()
+        return thread
+
+    def set_engine(self, engine=None, model_size=None):
+        """Troca o motor e/ou o tamanho do modelo (por execução)"""
+        if model_size:
+            self.model_size = model_size
+        if not engine or engine == self.engine_name:
+            return
+        backend = get_backend(engine)
+        # Libera os modelos do motor anterior
+        self.models.clear()
+        self.models = ModelRegistry(
+            loader=backend.load,
+            max_replicas=self.models.max_replicas,
+            idle_timeout=self.models.idle_timeout,
+            logger=self.log,
+            on_load=self.record_model_load
+        )
+        self.engine_name, self.backend = engine, backend
+        self.has_whisper = backend.available()
+
+    def model_tag(self):
+        if self.engine_name == WHISPER:
+            return self.model_size
+        return f"{self.engine_name}_{self.model_size}"
+
+    def ai_source(self):
+        """Fonte no cache das transcrições da IA com o motor e modelo atuais"""
+        if self.engine_name == WHISPER:
+            return f"whisper:{self.model_size}"
+        return f"{self.engine_name}:{self.model_size}"
+
+    def is_cancelled(self):
+        return self._is_cancelled
 
     def reset_cancel(self):
         self._is_cancelled = False
@@ -33,137 +204,507 @@ class TranscriberCore:
         else:
             print(message)
 
+    def emit_progress(self, event):
+        """Envia um evento estruturado de progresso.
+
+        Campos: ``event`` ("start", "video" ou "finish"), ``done``, ``total``
+        (None em streaming), ``success``, ``vid_id``, ``title``, ``source``,
+        ``ok``, ``bytes`` (baixados para o vídeo), ``seconds`` (do vídeo),
+        ``skipped_seconds`` (áudio sem fala não enviado à IA),
+        ``elapsed``, ``eta`` (segundos ou None) e ``videos_per_min``; em
+        "video", ``stages`` com os segundos por etapa e, em "finish",
+        ``metrics`` com os agregados (``RunMetrics.snapshot``).
+        """
+        self.metrics.log(event)
+        if self.progress_callback:
+            try:
+                self.progress_callback(event)
+            except Exception:
+                pass
+
+    def count_request(self, key):
+        # "errors" do scheduler são falhas de requisição, não os erros por etapa
+        self.metrics.count("http_errors" if key == "errors" else key)
+
+    def record_model_load(self, key, seconds):
+        self.metrics.record(None, MODEL_LOAD, seconds, model=key[0], device=key[1])
+
+    def add_video_bytes(self, vid_id, amount):
+        stats = self._video_stats.setdefault(vid_id, {})
+        stats["bytes"] = stats.get("bytes", 0) + amount
+
     def sanitize_filename(self, name):
         return re.sub(r'[\\/*?:"<>|]', "", name)
 
     def vtt_to_text(self, vtt_path):
-        text_lines = []
-        seen_lines = set()
         try:
-            with open(vtt_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            for line in content.splitlines():
-                if 'WEBVTT' in line or '-->' in line or not line.strip(): continue
-                clean = re.sub(r'<[^>]+>', '', line).strip()
-                clean = re.sub(r'\d{2}:\d{2}:\d{2}\.\d{3}', '', clean).strip()
-                if clean and clean not in seen_lines:
-                    text_lines.append(clean)
-                    seen_lines.add(clean)
-                    if len(seen_lines) > 10: seen_lines.remove(next(iter(seen_lines)))
-            return " ".join(text_lines)
+            return parse_vtt_file(vtt_path)
+        except:
+            return ""
+
+    def vtt_content_to_text(self, content):
+        try:
+            return parse_vtt(content)
         except:
             return ""
 
-    def transcribe_with_ai(self, video_url, output_base):
+    def video_info_opts(self):
+        return {'skip_download': True, 'quiet': True, 'no_warnings': True, 'nocheckcertificate': True}
+
+    def obtain_audio(self, video_url, vid_id, info=None):
+        """Áudio do vídeo: o pré-carregado, se houver, ou um download agora"""
+        with self.metrics.stage(vid_id, AUDIO_DOWNLOAD):
+            audio_file = self.prefetcher.take(vid_id) if self.prefetcher is not None else None
+            if audio_file:
+                self.log("   ⚡ Usando áudio pré-carregado")
+                return audio_file
+            return self.scheduler.call(
+                lambda: download_audio(video_url, vid_id, info=info, is_cancelled=self.is_cancelled),
+                "rr.googlevideo.com", transfer=True)
+
+    def should_prefetch(self, ahead=False):
+        """Especula só quando boa parte dos vídeos recentes precisou da IA.
+
+        Sem histórico, especula em paralelo à legenda mas não adiantado: o
+        download adiantado não tem os metadados e custa uma extração a mais.
+        """
+        if self.prefetcher is None:
+            return False
+        ratio = self.prefetcher.ai_ratio()
+        if ratio is None:
+            return not ahead
+        return ratio >= self.prefetch_threshold
+
+    def prefetch_ahead(self, vid):
+        """Adianta o áudio de um vídeo que ainda espera na fila"""
+        vid_id = vid.get('id')
+        path = self.known_path(vid)
+        if self.prefetcher is None or path in ("cache", "subtitle"):
+            return
+        if path == "ai" or self.should_prefetch(ahead=True):
+            self.prefetcher.start(f"https://www.youtube.com/watch?v={vid_id}", vid_id,
+                                  duration=vid.get('duration'))
+
+    def transcribe_with_ai(self, video_url, vid_id, info=None):
         if not self.has_ffmpeg or not self.has_whisper:
             return "[Erro: Falta FFmpeg ou Whisper]"
 
-        import whisper
-        audio_file = f"{output_base}.mp3"
-        ydl_opts = {
-            'format': 'bestaudio/best',
-            'outtmpl': output_base,
-            'postprocessors': [{'key': 'FFmpegExtractAudio','preferredcodec': 'mp3'}],
-            'quiet': True, 'no_warnings': True, 'nocheckcertificate': True
-        }
-        
+        audio_file = None
         try:
-            with YoutubeDL(ydl_opts) as ydl:
-                ydl.download([video_url])
-            
-            if not os.path.exists(audio_file):
+            audio_file = self.obtain_audio(video_url, vid_id, info)
+            if not audio_file:
                 return "[Erro: Download falhou]"
+            self.add_video_bytes(vid_id, os.path.getsize(audio_file))
 
-            model = whisper.load_model("base")
-            result = model.transcribe(audio_file)
-            
-            try: os.remove(audio_file)
-            except: pass
-                
-            return result["text"].strip()
+            language = self.resolve_language(audio_file, info)
+            timings = {}
+            with self.models.use(self.model_size, self.device) as model:
+                text = transcribe_audio(model, audio_file, is_cancelled=self.is_cancelled, timings=timings,
+                                        **self.ai_options(vid_id, language))
+            self.record_inference_timings(vid_id, timings)
+            return text
+        except OperationCancelled:
+            return "[Erro IA: cancelado]"
         except Exception as e:
+            self.metrics.error("ai", e)
             return f"[Erro IA: {str(e)}]"
+        finally:
+            if audio_file:
+                try: os.remove(audio_file)
+                except: pass
+
+    def queue_ai_transcription(self, stage, video_url, vid_id, on_text, info=None):
+        """Baixa o áudio e enfileira a inferência no pool de processos.
+
+        Retorna um Future com o resultado de ``on_text(texto)`` sem esperar a
+        inferência, liberando o worker de rede para o próximo vídeo.
+        """
+        try:
+            audio_file = self.obtain_audio(video_url, vid_id, info)
+        except OperationCancelled:
+            return "[Erro IA: cancelado]"
+        except Exception as e:
+            self.metrics.error("audio", e)
+            return f"[Erro IA: {str(e)}]"
+        if not audio_file:
+            return "[Erro: Download falhou]"
+        self.add_video_bytes(vid_id, os.path.getsize(audio_file))
+        language = self.resolve_language(audio_file, info)
+
+        def on_done(text, error):
+            remove_audio_files(vid_id)
+            if isinstance(error, OperationCancelled) or (error is not None and self._is_cancelled):
+                text = "[Erro IA: cancelado]"
+            elif error is not None:
+                self.metrics.error("ai", error)
+                self.log(f"   ❌ Erro IA: {error}")
+                text = f"[Erro IA: {error}]"
+            return on_text(text)
+
+        def on_timings(timings):
+            # Tempos medidos no processo de inferência (decodificação, silêncios e modelo)
+            self.record_inference_timings(vid_id, timings)
+
+        duration = (info or {}).get('duration')
+        if self._batcher is not None and duration and duration <= self.batch_video_seconds:
+            # Vídeo curto: as janelas entram nos lotes compartilhados com outros vídeos
+            return self._batcher.put(audio_file, duration, on_done=on_done, language=language,
+                                     trim_silence=self.trim_silence, on_timings=on_timings)
+
+        segments = self.plan_parallel_segments(duration)
+        if len(segments) > 1:
+            self.log(f"   ✂️ Dividido em {len(segments)} trechos para transcrição paralela")
+            options = self.ai_options(vid_id, language, chunked=False)
+            parts = [stage.put(audio_file, on_timings=on_timings, clip=seg, **options)
+                     for seg in segments]
+            return gather_futures(parts, lambda texts, error: on_done(
+                None if error else " ".join(t for t in texts if t), error))
+
+        return stage.put(audio_file, on_done=on_done, on_timings=on_timings,
+                         **self.ai_options(vid_id, language))
+
+    def record_inference_timings(self, vid_id, timings):
+        """Registra os tempos da inferência; "skipped_seconds" é o áudio sem fala descartado"""
+        timings = dict(timings or {})
+        skipped = timings.pop("skipped_seconds", 0.0)
+        self.metrics.record_many(vid_id, timings)
+        if skipped >= 1.0:
+            stats = self._video_stats.setdefault(vid_id, {})
+            stats["skipped_seconds"] = round(stats.get("skipped_seconds", 0.0) + skipped, 1)
+            self.log(f"   🔇 {skipped:.0f}s sem fala ignorados")
+
+    def plan_parallel_segments(self, duration):
+        """Trechos ``(inicio, fim, margem)`` para dividir um vídeo entre os workers.
+
+        Os cortes nominais vêm da duração; cada processo de inferência move o
+        seu para a pausa mais próxima ao decodificar o trecho.
+        """
+        if not self.split_segment_seconds:
+            return [(0.0, None, 0.0)]
+        from vad import nominal_segments
+        return nominal_segments(duration, self.split_segment_seconds)
+
+    def resolve_language(self, audio_file, info=None):
+        """Idioma da transcrição: evita a detecção do Whisper a cada vídeo.
+
+        Com ``language_lock``, o primeiro vídeo da playlist define o idioma dos
+        demais: pelos metadados ou, sem eles, por uma única detecção no áudio.
+        """
+        if self.language:
+            return self.language
+        hint = guess_language(info)
+        if not self.language_lock:
+            return hint
+        with self._language_mutex:
+            if self._locked_language is None:
+                self._locked_language = hint or self.detect_language(audio_file, info)
+                if self._locked_language:
+                    self.log(f"🌐 Idioma da playlist: {self._locked_language}")
+            return self._locked_language
+
+    def detect_language(self, audio_file, info=None):
+        """Uma passada do encoder num trecho de 30 s, longe da abertura (músicas, vinhetas)"""
+        duration = (info or {}).get('duration')
+        start = min(120.0, duration * 0.25) if duration else 0.0
+        try:
+            with self.metrics.stage((info or {}).get('id'), LANGUAGE_DETECT):
+                if self._engine is not None:
+                    return self._engine.submit_detect(audio_file, start).result()
+                samples = load_audio(audio_file, start=start, duration=30.0, is_cancelled=self.is_cancelled)
+                with self.models.use(self.model_size, self.device) as model:
+                    return self.backend.detect_language(model, samples)
+        except Exception as e:
+            self.log(f"   ⚠️ Falha ao detectar o idioma: {e}")
+            return None
+
+    def ai_options(self, vid_id, language=None, chunked=True):
+        """Opções repassadas a ``transcribe_audio`` para um vídeo"""
+        options = {"language": language} if language else {}
+        if self.trim_silence:
+            options["trim_silence"] = True
+        if not (chunked and self.chunk_seconds):
+            return options
+        return {**options, "chunking": {
+            "window": self.chunk_seconds,
+            "overlap": self.chunk_overlap,
+            "checkpoint": checkpoint_path(vid_id, self.model_tag()),
+        }}
+
+    def cache_sources(self):
+        return ["sub:pt*", "sub:*", self.ai_source()]
+
+    def cache_lookup(self, vid_id):
+        """Legenda em qualquer idioma ou transcrição com o modelo atual"""
+        if self.cache is None or not vid_id:
+            return None
+        try:
+            return self.cache.get(vid_id, self.cache_sources())
+        except Exception:
+            return None
+
+    def known_path(self, video):
+        """Caminho já conhecido de um vídeo: "cache", "subtitle", "ai" ou None"""
+        vid_id = video.get('id')
+        try:
+            if self.cache is not None and vid_id and self.cache.contains(vid_id, self.cache_sources()):
+                return "cache"
+        except Exception:
+            pass
+        entry = self._manifest.entry(vid_id) if self._manifest is not None else None
+        return entry.get("path") if entry else None
+
+    def caption_status(self, video, manifest=None):
+        """Se o vídeo tem legenda, pelo que já se sabe localmente (sem acessar a rede).
+
+        Consulta os metadados da entrada, o cache e o ``manifest`` de uma
+        execução anterior. Retorna True, False (precisou da IA) ou None.
+        """
+        if video.get('subtitles') or video.get('automatic_captions'):
+            return pick_caption_track(video) is not None
+        vid_id = video.get('id')
+        try:
+            if self.cache is not None and vid_id and self.cache.contains(vid_id, ["sub:*"]):
+                return True
+        except Exception:
+            pass
+        entry = manifest.entry(vid_id) if manifest is not None and vid_id else None
+        return {"subtitle": True, "ai": False}.get(entry.get("path")) if entry else None
+
+    def cache_store(self, vid_id, cache_source, text, title, video_url):
+        if self.cache is None or not text or text.startswith("[Erro"):
+            return
+        try:
+            self.cache.put(vid_id, cache_source, text, {"title": title, "url": video_url})
+        except Exception as e:
+            self.log(f"   ⚠️ Falha ao gravar cache: {e}")
+
+    def write_transcript(self, filepath, title, video_url, source, full_text, vid_id=None, started=None):
+        elapsed = time.monotonic() - started if started else None
+        if vid_id:
+            self._video_stats.setdefault(vid_id, {}).update(source=source, seconds=elapsed)
+        if full_text and not full_text.startswith("[Erro"):
+            with self.metrics.stage(vid_id, WRITE):
+                with open(filepath, "w", encoding="utf-8") as f:
+                    f.write(f"Título: {title}\nLink: {video_url}\nFonte: {source}\n\n{full_text}")
+            ai = source == "IA Whisper"
+            self.record_state(vid_id, AI_DONE if ai else SUBTITLE_DONE, elapsed=elapsed, filepath=filepath,
+                              title=title, path="ai" if ai else "subtitle")
+            return True
+        if self._is_cancelled:
+            # Interrompido: continua pendente para a próxima execução
+            self.record_state(vid_id, PENDING, reason="Cancelado", elapsed=elapsed, title=title)
+            return False
+        reason = full_text if full_text and full_text.startswith("[Erro") else "Sem legenda ou transcrição"
+        self.record_state(vid_id, FAILED, reason=reason, elapsed=elapsed, title=title)
+        return False
 
-    def process_single_video(self, video_data, folder, index, total):
+    def record_state(self, vid_id, state, **details):
+        """Atualiza o manifesto da execução atual (se houver)"""
+        if self._manifest is None or not vid_id:
+            return
+        try:
+            self._manifest.update(vid_id, state, **details)
+        except OSError as e:
+            self.log(f"   ⚠️ Falha ao gravar manifesto: {e}")
+
+    def process_single_video(self, video_data, folder, index, total, pooled=False):
+        """Processa um vídeo. Com ``pooled``, o fallback de IA é enfileirado no
+        pool de processos (``inference_stage``) e o retorno passa a ser um
+        Future com o mesmo booleano de sucesso."""
         if self._is_cancelled:
             return False
+        started = time.monotonic()
         title = video_data.get('title', 'SemTitulo')
         vid_id = video_data.get('id')
         video_url = f"https://www.youtube.com/watch?v={vid_id}"
         
         if title in ['[Deleted video]', '[Private video]']:
+            self.record_state(vid_id, FAILED, reason="Vídeo indisponível", title=title)
             return False
 
         safe_title = self.sanitize_filename(title)
         filepath = os.path.join(folder, f"{index+1:02d} - {safe_title}.txt")
-        temp_base = os.path.join(folder, f"temp_{vid_id}")
         
         self.log(f"[{index+1}/{total}] Processando: {title[:40]}...")
         
         full_text = None
         source = "Nenhum"
 
-        # 1. Tenta Legenda
-        ydl_opts_subs = {
-            'skip_download': True, 'write_sub': True, 'write_auto_sub': True,
-            'sub_langs': ['pt.*', 'en.*'], 'quiet': True, 'outtmpl': temp_base,
-            'nocheckcertificate': True
-        }
-        
+        # 0. Cache local (sem acesso à rede)
+        cached = self.cache_lookup(vid_id)
+        if cached:
+            cache_source, full_text, _ = cached
+            source = "Legenda YouTube" if cache_source.startswith("sub:") else "IA Whisper"
+            self.log(f"   💾 Usando cache ({cache_source}) para: {title[:20]}...")
+            self.metrics.count("cache_hits")
+            if self.prefetcher is not None:
+                self.prefetcher.discard(vid_id)
+            return self.write_transcript(filepath, title, video_url, source, full_text, vid_id, started)
+
+        # 1. Tenta Legenda: uma única extração de metadados, reaproveitada pelo áudio
+        info = None
         try:
-            with YoutubeDL(ydl_opts_subs) as ydl:
-                ydl.download([video_url])
-            vtt_files = glob.glob(f"{temp_base}*.vtt")
-            if vtt_files:
-                pt_subs = [f for f in vtt_files if '.pt' in f]
-                target_vtt = pt_subs[0] if pt_subs else vtt_files[0]
-                full_text = self.vtt_to_text(target_vtt)
-                source = "Legenda YouTube"
-                for f in vtt_files: os.remove(f)
-        except: pass
+            with YoutubeDL(self.video_info_opts()) as ydl:
+                with self.metrics.stage(vid_id, SUBTITLE_PROBE):
+                    info = self.scheduler.call(lambda: ydl.extract_info(video_url, download=False, process=False))
+                picked = pick_caption_track(info)
+                if picked:
+                    lang, track = picked
+                    if self.should_prefetch():
+                        # Baixa o áudio em paralelo; descartado se a legenda servir
+                        self.prefetcher.start(video_url, vid_id, info=info)
+                    with self.metrics.stage(vid_id, CAPTION_DOWNLOAD):
+                        content = self.scheduler.call(lambda: fetch_caption(ydl, track), track["url"])
+                    self.add_video_bytes(vid_id, len(content))
+                    with self.metrics.stage(vid_id, VTT_PARSE):
+                        full_text = self.vtt_content_to_text(content)
+                    source = "Legenda YouTube"
+                    if full_text and len(full_text) >= 50:
+                        self.cache_store(vid_id, f"sub:{lang}", full_text, title, video_url)
+        except OperationCancelled:
+            return False
+        except Exception as e:
+            self.metrics.error("subtitle", e)
+            self.log(f"   ⚠️ Legenda indisponível ({type(e).__name__}): {str(e)[:120]}")
+
+        if self._is_cancelled:
+            return False
+
+        needs_ai = not full_text or len(full_text) < 50
+        if self.prefetcher is not None:
+            self.prefetcher.record_outcome(needs_ai)
+            if not needs_ai:
+                self.prefetcher.discard(vid_id)
 
         # 2. Tenta IA
-        if (not full_text or len(full_text) < 50) and self.has_ffmpeg and self.has_whisper:
+        if needs_ai and self.has_ffmpeg and self.has_whisper:
             self.log(f"   -> Usando IA para: {title[:20]}...")
-            full_text = self.transcribe_with_ai(video_url, temp_base)
+            self.metrics.count("ai_fallbacks")
+            self.record_state(vid_id, PENDING, title=title, path="ai")
+            ai_source = self.ai_source()
+            if pooled:
+                def on_text(text):
+                    self.cache_store(vid_id, ai_source, text, title, video_url)
+                    return self.write_transcript(filepath, title, video_url, "IA Whisper", text, vid_id, started)
+                try:
+                    ai_stage = self.inference_stage()
+                except OperationCancelled:
+                    return False
+                queued = self.queue_ai_transcription(ai_stage, video_url, vid_id, on_text, info)
+                if isinstance(queued, Future):
+                    return queued
+                full_text = queued
+            else:
+                full_text = self.transcribe_with_ai(video_url, vid_id, info)
             if full_text and not full_text.startswith("[Erro"):
                 source = "IA Whisper"
+                self.cache_store(vid_id, ai_source, full_text, title, video_url)
 
-        if full_text and not full_text.startswith("[Erro"):
-            with open(filepath, "w", encoding="utf-8") as f:
-                f.write(f"Título: {title}\nLink: {video_url}\nFonte: {source}\n\n{full_text}")
-            return True
-        return False
+        return self.write_transcript(filepath, title, video_url, source, full_text, vid_id, started)
+
+    def fetch_playlist_videos(self, playlist_url, max_age=None):
+        """Busca os vídeos da playlist sem processar. Retorna (playlist_title, videos)
+
+        Com ``max_age`` (segundos), reaproveita a última listagem da mesma URL
+        se ela for mais recente que isso.
+        """
+        snapshot = self._playlist_snapshots.get(playlist_url)
+        if max_age is not None and snapshot and time.monotonic() - snapshot[0] <= max_age:
+            return snapshot[1], snapshot[2]
 
-    def fetch_playlist_videos(self, playlist_url):
-        """Busca os vídeos da playlist sem processar. Retorna (playlist_title, videos)"""
         self.log(f"🔍 Analisando playlist...")
         ydl_opts = {'extract_flat': True, 'quiet': True, 'nocheckcertificate': True}
         
         with YoutubeDL(ydl_opts) as ydl:
             try:
-                info = ydl.extract_info(playlist_url, download=False)
+                with self.metrics.stage(None, PLAYLIST_FETCH):
+                    info = self.scheduler.call(lambda: ydl.extract_info(playlist_url, download=False))
                 playlist_title = info.get('title', 'Playlist_Youtube')
-                videos = info.get('entries', [])
+                if info.get('_type') in ('playlist', 'multi_video') or 'entries' in info:
+                    videos = info.get('entries') or []
+                else:
+                    # URL de um único vídeo
+                    videos = [info]
             except Exception as e:
                 self.log(f"❌ Erro: {e}")
                 raise Exception(f"Erro ao buscar playlist: {e}")
 
         if not videos:
             raise Exception("Nenhum vídeo encontrado na playlist.")
-            
+
+        self._playlist_snapshots[playlist_url] = (time.monotonic(), playlist_title, videos)
         return playlist_title, videos
 
-    def run_playlist(self, playlist_url, output_folder, selected_video_indices=None, max_workers=3):
-        """Processa vídeos da playlist. Se selected_video_indices for None, processa todos."""
-        try:
-            playlist_title, videos = self.fetch_playlist_videos(playlist_url)
-        except Exception as e:
-            self.log(str(e))
-            return
+    def iter_playlist_videos(self, playlist_url):
+        """Gera as entradas da playlist conforme as páginas da listagem chegam.
+
+        Diferente de ``fetch_playlist_videos``, não espera a playlist inteira:
+        o primeiro vídeo fica disponível assim que a primeira página chega.
+        """
+        self.log("🔍 Analisando playlist (modo streaming)...")
+        ydl_opts = {'extract_flat': True, 'lazy_playlist': True, 'quiet': True, 'nocheckcertificate': True}
+        with YoutubeDL(ydl_opts) as ydl:
+            try:
+                with self.metrics.stage(None, PLAYLIST_FETCH):
+                    info = self.scheduler.call(
+                        lambda: ydl.extract_info(playlist_url, download=False, process=False))
+            except Exception as e:
+                self.log(f"❌ Erro: {e}")
+                raise Exception(f"Erro ao buscar playlist: {e}")
+            if info.get('_type') not in ('playlist', 'multi_video'):
+                # URL de um único vídeo
+                yield info
+                return
+            for entry in info.get('entries') or []:
+                if self._is_cancelled:
+                    return
+                if entry:
+                    yield entry
+
+    def run_playlist(self, playlist_url, output_folder, selected_video_indices=None, max_workers=3, videos=None,
+                     stream=False, max_queued=None, engine=None, model_size=None):
+        """Processa vídeos da playlist. Se selected_video_indices for None, processa todos.
+
+        ``videos`` recebe as entradas já buscadas por ``fetch_playlist_videos``,
+        garantindo que os índices selecionados apontem para a mesma lista que o
+        usuário viu. Sem ela, uma listagem com menos de ``playlist_snapshot_ttl``
+        segundos é reaproveitada antes de consultar o YouTube de novo.
 
-        if not os.path.exists(output_folder):
+        Com ``stream=True`` os vídeos entram na fila de trabalho conforme a
+        listagem é paginada; ``max_queued`` limita quantos ficam aguardando.
+        ``engine`` e ``model_size`` trocam o motor de IA para esta execução.
+        """
+        self.set_engine(engine, model_size)
+        created = not os.path.exists(output_folder)
+        if created:
             os.makedirs(output_folder)
+
+        self._manifest = RunManifest(output_folder)
+        self._locked_language = None
+        if stream and videos is None:
+            if self.schedule_policy != PLAYLIST_ORDER:
+                self.log("ℹ️ Em streaming os vídeos são processados na ordem da playlist.")
+            self.log(f"📂 Pasta: {output_folder} | Processando em streaming com {max_workers} workers...")
+            entries = self._pending_entries(playlist_url, enumerate(self.iter_playlist_videos(playlist_url)))
+            try:
+                self._process_entries(entries, output_folder, "?", max_workers, max_queued)
+            except Exception:
+                # Listagem falhou: não deixa para trás a pasta vazia criada para ela
+                if created:
+                    try:
+                        os.rmdir(output_folder)
+                    except OSError:
+                        pass
+                raise
+            return
+
+        if videos is None:
+            try:
+                playlist_title, videos = self.fetch_playlist_videos(playlist_url, max_age=self.playlist_snapshot_ttl)
+            except Exception as e:
+                self.log(str(e))
+                self._manifest = None
+                return
         
         # Se nenhum índice foi selecionado, processa todos
         if selected_video_indices is None:
@@ -172,19 +713,252 @@ class TranscriberCore:
         # Filtra apenas os vídeos selecionados
         selected_videos = [videos[i] for i in selected_video_indices if i < len(videos)]
         
-        self.log(f"📂 Pasta: {output_folder} | Processando {len(selected_videos)} vídeos com {max_workers} workers...")
-        
         total = len(selected_videos)
-        success_count = 0
-        
-        # Otimização: Processamento Paralelo
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = [executor.submit(self.process_single_video, vid, output_folder, i, total) for i, vid in enumerate(selected_videos)]
-            for future in futures:
+
+        # Retoma execuções anteriores: vídeos concluídos não geram nenhuma requisição
+        pending = [(i, vid) for i, vid in enumerate(selected_videos) if not self._manifest.is_done(vid.get('id'))]
+        self._manifest.start_run(playlist_url, [vid.get('id') for _, vid in pending])
+        skipped = total - len(pending)
+        if skipped:
+            self.log(f"⏭️ {skipped} vídeos já concluídos em execução anterior serão pulados.")
+
+        if self.schedule_policy != PLAYLIST_ORDER:
+            # Usa a duração da listagem e o caminho já conhecido (cache/legenda/IA)
+            pending = order_entries(pending, self.schedule_policy, self.known_path)
+            self.log(f"🗂️ Ordem de processamento: {self.schedule_policy}")
+        self.log(f"📂 Pasta: {output_folder} | Processando {len(pending)} vídeos com {max_workers} workers...")
+        self._process_entries(pending, output_folder, total, max_workers, max_queued, skipped)
+
+    def _pending_entries(self, playlist_url, entries):
+        """Filtra (em streaming) os vídeos já concluídos segundo o manifesto.
+
+        A execução é registrada no manifesto quando chega a primeira entrada;
+        os vídeos entram nele quando começam a ser processados.
+        """
+        started = False
+        for i, vid in entries:
+            if not started:
+                self._manifest.start_run(playlist_url)
+                started = True
+            if not self._manifest.is_done(vid.get('id')):
+                yield i, vid
+
+    def _process_entries(self, entries, output_folder, total, max_workers, max_queued=None, success_count=0):
+        """Distribui ``(indice, video)`` entre os workers de rede.
+
+        As entradas são consumidas sob demanda: no máximo ``max_workers`` +
+        ``max_queued`` vídeos ficam submetidos ao mesmo tempo, então um gerador
+        lento (listagem paginada) alimenta os workers sem acumular memória.
+        Os resultados são tratados na ordem em que terminam.
+        """
+        skipped = success_count
+        processed = 0
+        started = time.monotonic()
+        # O slider de workers passa a ser o teto; o scheduler ajusta a concorrência real
+        self.scheduler.set_max_concurrency(max_workers)
+        # Os processos de inferência só sobem no primeiro fallback de IA (``inference_stage``)
+        pooled = self.inference_mode == "process" and self.has_ffmpeg and self.has_whisper
+        self._inference_workers = max_workers
+        if self.split_segment_seconds and self.inference_mode != "process":
+            self.log("ℹ️ A divisão de vídeos longos em trechos só funciona com a inferência em processos; ignorada.")
+        slots = threading.BoundedSemaphore(max_workers + (max_queued or max_workers * 2))
+        in_flight = {"count": 0}
+        in_flight_lock = threading.Lock()
+
+        def release(_):
+            with in_flight_lock:
+                in_flight["count"] -= 1
+            slots.release()
+        submitted = queue.Queue()
+        self._video_stats = {}
+        self.metrics.clear_videos()
+        self.emit_progress({"event": "start", "done": skipped, "total": None if total == "?" else total,
+                            "success": success_count})
+
+        feed_error = {"error": None}
+        feeder = None
+
+        def feed(executor):
+            try:
+                for i, vid in entries:
+                    if self._is_cancelled:
+                        break
+                    slots.acquire()
+                    if self._is_cancelled:
+                        # Cancelada enquanto esperava vaga: o executor já pode ter sido encerrado
+                        slots.release()
+                        break
+                    with in_flight_lock:
+                        busy = in_flight["count"] >= max_workers
+                        in_flight["count"] += 1
+                    if busy:
+                        # Todos os workers ocupados: o vídeo vai esperar na fila
+                        self.prefetch_ahead(vid)
+                    try:
+                        future = executor.submit(self.process_single_video, vid, output_folder, i, total, pooled)
+                    except RuntimeError as e:
+                        if not is_shutdown_error(e):
+                            raise
+                        # Executor encerrado (cancelamento): a alimentação termina sem erro
+                        release(None)
+                        break
+                    future.add_done_callback(release)
+                    submitted.put((future, vid))
+            except Exception as e:
+                # Falha da listagem (streaming): relatada ao chamador no fim da execução
+                feed_error["error"] = e
+            finally:
+                submitted.put(None)
+
+        try:
+            # Threads fazem apenas o trabalho de rede; a inferência roda no pool de processos
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                feeder = threading.Thread(target=feed, args=(executor,), daemon=True)
+                feeder.start()
+                pending = {}
+                feeding = True
+                while (feeding or pending) and not self._is_cancelled:
+                    try:
+                        while True:
+                            item = submitted.get(timeout=0 if pending else 0.2)
+                            if item is None:
+                                feeding = False
+                                break
+                            pending[item[0]] = item[1]
+                    except queue.Empty:
+                        pass
+                    if not pending:
+                        continue
+                    done, _ = wait(list(pending), timeout=0.2, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        vid = pending.pop(future)
+                        try:
+                            result = future.result()
+                        except Exception as e:
+                            if not self._is_cancelled:
+                                self.metrics.error("video", e)
+                                self.log(f"   ❌ Erro inesperado em {vid.get('id')}: {e}")
+                            result = False
+                        if isinstance(result, Future):
+                            # Vídeo seguiu para o pool de inferência: aguarda o resultado final
+                            pending[result] = vid
+                            continue
+                        processed += 1
+                        success_count += bool(result)
+                        self._emit_video_progress(vid, bool(result), processed, skipped, success_count,
+                                                  total, started)
                 if self._is_cancelled:
                     executor.shutdown(wait=False, cancel_futures=True)
-                    break
-                if future.result():
-                    success_count += 1
+        finally:
+            with self._inference_lock:
+                engine, ai_stage, batcher = self._engine, self._ai_stage, self._batcher
+                self._engine, self._ai_stage, self._batcher = None, None, None
+            if feeder is not None:
+                # Cancelada, a listagem pode estar presa numa página: não espera indefinidamente
+                feeder.join(5.0 if self._is_cancelled else None)
+            if batcher is not None:
+                if self._is_cancelled:
+                    batcher.cancel()
+                batcher.close()
+            if self.prefetcher is not None:
+                self.prefetcher.clear()
+                stats = self.prefetcher.stats
+                if stats["started"]:
+                    self.log(f"⚡ Pré-carregamento: {stats['used']}/{stats['started']} áudios usados, "
+                             f"{stats['discarded']} descartados")
+            if ai_stage is not None:
+                if self._is_cancelled:
+                    ai_stage.cancel()
+                ai_stage.close()
+                engine.shutdown(cancel_futures=self._is_cancelled)
+            try:
+                self._manifest.close()
+            except OSError as e:
+                self.log(f"   ⚠️ Falha ao gravar manifesto: {e}")
+            self._manifest = None
+
+        if total == "?":
+            total = processed
+        self.emit_progress({"event": "finish", "done": processed + skipped, "total": total,
+                            "success": success_count, "elapsed": time.monotonic() - started,
+                            "cancelled": self._is_cancelled, "metrics": self.metrics.snapshot()})
+        self.metrics.flush(force=True)
+        listing_error = feed_error["error"]
+        if listing_error is not None and not self._is_cancelled and not is_shutdown_error(listing_error):
+            self.log(f"\n⚠️ Listagem interrompida! {success_count}/{total} transcritos.")
+            raise listing_error
+        if self._is_cancelled:
+            self.log(f"\n⚠️ Interrompido! {success_count}/{total} transcritos.")
+        else:
+            self.log(f"\n✅ Concluído! {success_count}/{total} transcritos.")
+
+    def _emit_video_progress(self, vid, ok, processed, skipped, success_count, total, started):
+        vid_id = vid.get('id')
+        stats = self._video_stats.pop(vid_id, {})
+        self.metrics.count("videos", result="ok" if ok else "failed")
+        elapsed = time.monotonic() - started
+        rate = processed / elapsed if elapsed > 0 else 0.0
+        known_total = None if total == "?" else total
+        eta = None
+        if known_total is not None and rate > 0:
+            eta = max(0, known_total - skipped - processed) / rate
+        self.emit_progress({
+            "event": "video", "done": processed + skipped, "total": known_total,
+            "success": success_count, "vid_id": vid_id, "title": vid.get('title'),
+            "source": stats.get("source"), "ok": ok, "bytes": stats.get("bytes", 0),
+            "seconds": stats.get("seconds"), "skipped_seconds": stats.get("skipped_seconds", 0.0),
+            "elapsed": elapsed, "eta": eta,
+            "videos_per_min": rate * 60, "stages": self.metrics.pop_video(vid_id),
+        })
+        self.metrics.flush()
+
+    def record_batch(self, seconds, windows):
+        # Um lote mistura vídeos: o tempo entra só nos agregados da execução
+        self.metrics.record(None, INFERENCE, seconds, windows=windows)
+
+    def start_batching_stage(self, engine):
+        """Lotes entre vídeos, se ativados e suportados pelo motor. Retorna o estágio ou None."""
+        if engine is None or self.batch_size <= 1:
+            return None
+        if not hasattr(self.backend, "decode_batch"):
+            self.log(f"ℹ️ O motor {self.engine_name} não suporta lotes entre vídeos.")
+            return None
+        return BatchingStage(engine, self.batch_size, self.batch_max_latency, on_batch=self.record_batch)
+
+    def inference_stage(self):
+        """Estágio de inferência da execução, criado na primeira chamada.
+
+        Execuções resolvidas só com cache e legendas não sobem processos nem
+        carregam o modelo.
+        """
+        with self._inference_lock:
+            if self._is_cancelled:
+                raise OperationCancelled("Inferência cancelada")
+            if self._ai_stage is None:
+                self._engine, self._ai_stage = self.start_inference_stage(self._inference_workers)
+                self._batcher = self.start_batching_stage(self._engine)
+            return self._ai_stage
+
+    def start_inference_stage(self, max_workers):
+        """Cria o pool de inferência (modo "process"). Retorna (engine, stage) ou (None, None)."""
+        if self.inference_mode != "process" or not (self.has_ffmpeg and self.has_whisper):
+            return None, None
+        device = self.device or default_device()
+        # Em GPU um único processo evita múltiplas cópias do modelo na VRAM
+        workers = self.inference_workers or (1 if device != "cpu" else max_workers)
+        engine = InferenceEngine(self.model_size, device, workers=workers, backend=self.backend)
+        self.log(f"🧠 Iniciando {engine.workers} processo(s) de inferência...")
+        loaded = set()
+
+        def record_load(future):
+            # Um processo pode responder a mais de um ping: conta a carga uma vez por pid
+            if future.cancelled() or future.exception() is not None:
+                return
+            pid, _, seconds = future.result()
+            if seconds is not None and pid not in loaded:
+                loaded.add(pid)
+                self.metrics.record(None, MODEL_LOAD, seconds, model=self.model_size, pid=pid)
 
-        self.log(f"\n✅ Concluído! {success_count}/{total} transcritos.")
+        for future in engine.warm_up():
+            future.add_done_callback(record_load)
+        return engine, InferenceStage(engine)
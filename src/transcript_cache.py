@@ -0,0 +1,180 @@
+import os
+import json
+import time
+import sqlite3
+import argparse
+import threading
+
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".youtube_transcriber", "cache")
+
+
+class TranscriptCache:
+    """Cache local e persistente de transcrições.
+
+    Cada entrada é identificada pelo ID do vídeo e pela fonte do texto
+    (``sub:<idioma>`` para legendas do YouTube, ``whisper:<modelo>`` para a
+    IA). Guarda o texto limpo e os metadados; quando o tamanho total passa de
+    ``max_bytes``, as entradas usadas há mais tempo são removidas (LRU).
+    """
+
+    def __init__(self, path=None, max_bytes=500 * 1024 * 1024):
+        self.path = path or os.path.join(CACHE_DIR, "transcripts.db")
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS transcripts ("
+                " video_id TEXT NOT NULL, source TEXT NOT NULL, text TEXT NOT NULL,"
+                " metadata TEXT, size INTEGER NOT NULL,"
+                " created REAL NOT NULL, last_access REAL NOT NULL,"
+                " PRIMARY KEY (video_id, source))"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_last_access ON transcripts (last_access)"
+            )
+
+    def get(self, video_id, sources):
+        """Retorna ``(source, text, metadata)`` da primeira fonte disponível ou None.
+
+        ``sources`` é uma lista em ordem de prioridade; ``"sub:*"`` aceita
+        legenda em qualquer idioma.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT source, text, metadata FROM transcripts WHERE video_id = ?", (video_id,)
+            ).fetchall()
+            if not rows:
+                return None
+            by_source = {row[0]: row for row in rows}
+            for wanted in sources:
+                if wanted.endswith("*"):
+                    match = sorted(s for s in by_source if s.startswith(wanted[:-1]))
+                    row = by_source[match[0]] if match else None
+                else:
+                    row = by_source.get(wanted)
+                if row:
+                    with self._conn:
+                        self._conn.execute(
+                            "UPDATE transcripts SET last_access = ? WHERE video_id = ? AND source = ?",
+                            (time.time(), video_id, row[0])
+                        )
+                    return row[0], row[1], json.loads(row[2] or "{}")
+        return None
+
+    def contains(self, video_id, sources):
+        """Como ``get``, mas sem ler o texto nem atualizar o LRU"""
+        with self._lock:
+            found = {row[0] for row in self._conn.execute(
+                "SELECT source FROM transcripts WHERE video_id = ?", (video_id,))}
+        return any(any(s.startswith(w[:-1]) for s in found) if w.endswith("*") else w in found
+                   for w in sources)
+
+    def put(self, video_id, source, text, metadata=None):
+        size = len(text.encode("utf-8"))
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO transcripts VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (video_id, source, text, json.dumps(metadata or {}, ensure_ascii=False), size, now, now)
+            )
+        self.prune()
+
+    def remove(self, video_id):
+        with self._lock, self._conn:
+            return self._conn.execute(
+                "DELETE FROM transcripts WHERE video_id = ?", (video_id,)
+            ).rowcount
+
+    def clear(self):
+        with self._lock, self._conn:
+            return self._conn.execute("DELETE FROM transcripts").rowcount
+
+    def prune(self, max_bytes=None, older_than=None):
+        """Remove entradas antigas até o cache caber em ``max_bytes``.
+
+        ``older_than`` (segundos) remove também tudo sem acesso nesse período.
+        Retorna quantas entradas foram removidas.
+        """
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        removed = 0
+        with self._lock, self._conn:
+            if older_than is not None:
+                removed += self._conn.execute(
+                    "DELETE FROM transcripts WHERE last_access < ?", (time.time() - older_than,)
+                ).rowcount
+            if max_bytes is None:
+                return removed
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM transcripts").fetchone()[0]
+            if total <= max_bytes:
+                return removed
+            doomed = []
+            for video_id, source, size in self._conn.execute(
+                    "SELECT video_id, source, size FROM transcripts ORDER BY last_access"):
+                if total <= max_bytes:
+                    break
+                doomed.append((video_id, source))
+                total -= size
+            self._conn.executemany(
+                "DELETE FROM transcripts WHERE video_id = ? AND source = ?", doomed
+            )
+            removed += len(doomed)
+        return removed
+
+    def entries(self):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT video_id, source, size, created, last_access, metadata"
+                " FROM transcripts ORDER BY last_access DESC"
+            ).fetchall()
+
+    def stats(self):
+        with self._lock:
+            count, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM transcripts"
+            ).fetchone()
+        return {"entries": count, "bytes": total, "max_bytes": self.max_bytes, "path": self.path}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def main(argv=None):
+    """Inspeciona e limpa o cache de transcrições pela linha de comando"""
+    parser = argparse.ArgumentParser(description="Cache de transcrições do YouTube Transcriber Pro")
+    parser.add_argument("--path", help="arquivo do cache (padrão: ~/.youtube_transcriber/cache)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("stats", help="mostra tamanho e número de entradas")
+    sub.add_parser("list", help="lista as entradas, mais recentes primeiro")
+    prune = sub.add_parser("prune", help="remove entradas antigas (LRU)")
+    prune.add_argument("--max-mb", type=float, help="tamanho máximo após a limpeza")
+    prune.add_argument("--older-than-days", type=float, help="remove entradas sem acesso há N dias")
+    remove = sub.add_parser("remove", help="remove todas as entradas de um vídeo")
+    remove.add_argument("video_id")
+    sub.add_parser("clear", help="apaga todo o cache")
+    args = parser.parse_args(argv)
+
+    cache = TranscriptCache(path=args.path, max_bytes=None)
+    if args.command == "stats":
+        stats = cache.stats()
+        print(f"📦 {stats['entries']} entradas, {stats['bytes'] / 1024 / 1024:.1f} MB em {stats['path']}")
+    elif args.command == "list":
+        for video_id, source, size, _, last_access, metadata in cache.entries():
+            title = json.loads(metadata or "{}").get("title", "")
+            when = time.strftime("%Y-%m-%d %H:%M", time.localtime(last_access))
+            print(f"{video_id}\t{source}\t{size} B\t{when}\t{title}")
+    elif args.command == "prune":
+        max_bytes = int(args.max_mb * 1024 * 1024) if args.max_mb is not None else None
+        older_than = args.older_than_days * 86400 if args.older_than_days is not None else None
+        print(f"🧹 {cache.prune(max_bytes=max_bytes, older_than=older_than)} entradas removidas")
+    elif args.command == "remove":
+        print(f"🧹 {cache.remove(args.video_id)} entradas removidas")
+    elif args.command == "clear":
+        print(f"🧹 {cache.clear()} entradas removidas")
+    cache.close()
+
+
+if __name__ == "__main__":
+    main()
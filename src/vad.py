@@ -0,0 +1,146 @@
+import time
+import numpy as np
+from audio import SAMPLE_RATE
+
+FRAME_SECONDS = 0.03
+
+
+def frame_energy_db(samples, frame_seconds=FRAME_SECONDS, sr=SAMPLE_RATE):
+    """Energia RMS (dB) de cada quadro de ``frame_seconds``, vetorizada"""
+    frame = int(frame_seconds * sr)
+    n = len(samples) // frame
+    if n == 0:
+        return np.zeros(0, np.float32)
+    frames = samples[:n * frame].reshape(n, frame)
+    rms = np.sqrt(np.mean(np.square(frames, dtype=np.float32), axis=1))
+    return (20 * np.log10(rms + 1e-10)).astype(np.float32)
+
+
+def silence_mask(energy_db, margin_db=6.0, floor_db=-60.0):
+    """Quadros considerados silêncio, com limiar adaptado ao ruído de fundo"""
+    if len(energy_db) == 0:
+        return np.zeros(0, bool)
+    threshold = max(float(np.percentile(energy_db, 10)) + margin_db, floor_db)
+    return energy_db < threshold
+
+
+def silence_runs(mask, min_frames=1):
+    """Intervalos [inicio, fim) de quadros contínuos de silêncio"""
+    padded = np.concatenate([[False], mask, [False]])
+    edges = np.flatnonzero(np.diff(padded.astype(np.int8)))
+    starts, ends = edges[0::2], edges[1::2]
+    keep = (ends - starts) >= min_frames
+    return starts[keep], ends[keep]
+
+
+def nominal_segments(duration, target_seconds):
+    """Divide ``duration`` segundos em trechos de ~``target_seconds``.
+
+    Retorna ``[(inicio, fim, margem)]`` (o último com fim None) ou uma lista
+    com um único item quando não vale dividir. Os cortes exatos são escolhidos
+    por quem decodifica cada trecho (``boundary_cut``), até ``margem`` segundos
+    antes ou depois do corte nominal.
+    """
+    if not duration or duration <= target_seconds * 1.5:
+        return [(0.0, None, 0.0)]
+    bounds = [0.0]
+    while duration - bounds[-1] > target_seconds * 1.5:
+        bounds.append(bounds[-1] + target_seconds)
+    margin = target_seconds / 4
+    ends = bounds[1:] + [None]
+    return [(start, end, margin) for start, end in zip(bounds, ends)]
+
+
+def boundary_cut(samples, center, radius, min_silence=0.3, tolerance_db=3.0, sr=SAMPLE_RATE):
+    """Índice em ``samples`` onde cortar perto de ``center`` segundos.
+
+    Só a região ``center ± radius`` é considerada, então os dois trechos
+    vizinhos, que decodificam essa mesma região, escolhem o mesmo corte: o
+    meio do trecho de ``min_silence`` segundos mais silencioso (até
+    ``tolerance_db`` acima do mínimo) mais próximo do centro.
+    """
+    lo = max(0, int((center - radius) * sr))
+    hi = min(len(samples), int((center + radius) * sr))
+    energy = frame_energy_db(samples[lo:hi])
+    if len(energy) == 0:
+        return min(max(int(center * sr), 0), len(samples))
+    width = max(1, min(len(energy), int(min_silence / FRAME_SECONDS)))
+    smooth = np.convolve(energy, np.ones(width, np.float32) / width, mode="valid")
+    starts, ends = silence_runs(smooth <= smooth.min() + tolerance_db)
+    middles = (starts + ends - 1) // 2 + width // 2
+    cut = int(middles[np.argmin(abs(middles - len(energy) // 2))])
+    return lo + cut * int(FRAME_SECONDS * sr)
+
+
+def speech_spans(energy_db, frame_seconds=FRAME_SECONDS, min_silence=2.0, pad=0.5, ceiling_db=-40.0):
+    """Trechos com fala ``[(inicio, fim)]`` em segundos.
+
+    Só são removidos silêncios de pelo menos ``min_silence`` segundos e abaixo
+    de ``ceiling_db`` (fala sobre música de fundo nunca é cortada); cada corte
+    deixa ``pad`` segundos de folga dos dois lados.
+    """
+    total = len(energy_db)
+    if total == 0:
+        return []
+    mask = silence_mask(energy_db) & (energy_db < ceiling_db)
+    starts, ends = silence_runs(mask, int(min_silence / frame_seconds))
+    pad_frames = int(pad / frame_seconds)
+    # Início e fim do arquivo não precisam de folga
+    starts = np.where(starts > 0, starts + pad_frames, 0)
+    ends = np.where(ends < total, ends - pad_frames, total)
+    keep = ends > starts
+    bounds = np.column_stack([starts[keep], ends[keep]]).ravel()
+    edges = np.concatenate([[0], bounds, [total]]).reshape(-1, 2)
+    return [(round(float(a) * frame_seconds, 3), round(float(b) * frame_seconds, 3)) for a, b in edges if b > a]
+
+
+def compact_audio(samples, spans, offset=0.0, sr=SAMPLE_RATE):
+    """Mantém de ``samples`` (que começa em ``offset`` s do arquivo) só os trechos de ``spans``.
+
+    Retorna ``(array, mapa)``: o mapa tem ``(inicio_no_array, inicio_original)``
+    por trecho, em segundos relativos a ``samples``, para ``original_time``.
+    """
+    duration = len(samples) / sr
+    pieces, mapping, position = [], [], 0
+    for start, end in spans:
+        a, b = max(start - offset, 0.0), min(end - offset, duration)
+        if b <= a:
+            continue
+        i, j = int(a * sr), int(b * sr)
+        pieces.append(samples[i:j])
+        mapping.append((position / sr, i / sr))
+        position += j - i
+    if not pieces:
+        return np.zeros(0, np.float32), []
+    return np.concatenate(pieces), mapping
+
+
+def drop_silence(samples, timings=None, sr=SAMPLE_RATE):
+    """Remove de ``samples`` os silêncios longos (``speech_spans``).
+
+    Retorna ``(array, mapa)`` como ``compact_audio``; sem nada a remover, o
+    próprio ``samples`` e None. ``timings`` (dict) acumula os segundos da
+    análise em "vad_scan" e o áudio descartado em "skipped_seconds".
+    """
+    started = time.perf_counter()
+    energy = frame_energy_db(samples)
+    spans = speech_spans(energy)
+    kept = sum(end - start for start, end in spans)
+    if kept >= len(energy) * FRAME_SECONDS:
+        result = (samples, None)
+    else:
+        result = compact_audio(samples, spans, sr=sr)
+    if timings is not None:
+        timings["vad_scan"] = timings.get("vad_scan", 0.0) + time.perf_counter() - started
+        skipped = (len(samples) - len(result[0])) / sr
+        timings["skipped_seconds"] = timings.get("skipped_seconds", 0.0) + skipped
+    return result
+
+
+def original_time(t, mapping):
+    """Converte um tempo do áudio compactado para o tempo do áudio original"""
+    if not mapping:
+        return t
+    index = max(0, int(np.searchsorted([m[0] for m in mapping], t, side="right")) - 1)
+    compact_start, original_start = mapping[index]
+    return original_start + (t - compact_start)
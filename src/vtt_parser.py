@@ -0,0 +1,112 @@
+import re
+import html
+from collections import deque
+
+# Padrões compilados uma única vez
+_TIMING_RE = re.compile(r'^\s*(?:(\d+):)?(\d{1,2}):(\d{2})[.,](\d{3})\s+-->')
+# Tags (inclusive as de karaokê <00:00:01.000>) e timestamps soltos no texto
+_TAG_RE = re.compile(r'<[^>]*>|\d{2}:\d{2}:\d{2}\.\d{3}')
+
+
+def _parse_start(timing_line):
+    match = _TIMING_RE.match(timing_line or "")
+    if not match:
+        return 0.0
+    hours, minutes, seconds, millis = match.groups()
+    return int(hours or 0) * 3600 + int(minutes) * 60 + int(seconds) + int(millis) / 1000
+
+
+class VTTParser:
+    """Parser WebVTT incremental, linha a linha.
+
+    Só considera texto dentro de cues (ignora cabeçalho, NOTE, STYLE e
+    identificadores). Remove repetições com uma janela ordenada de tamanho fixo
+    e colapsa as cues "rolantes" das legendas automáticas do YouTube, em que
+    cada cue repete a linha anterior ou cresce a partir dela.
+    """
+
+    def __init__(self, window=10, keep_timestamps=False):
+        self.keep_timestamps = keep_timestamps
+        self._recent = deque(maxlen=window)
+        self._recent_set = set()
+        self._in_cue = False
+        self._timing_line = None
+        self.lines = []      # texto (ou tuplas (inicio, texto)) na ordem
+
+    def _cue_start(self):
+        return _parse_start(self._timing_line)
+
+    def _remember(self, text):
+        if len(self._recent) == self._recent.maxlen:
+            self._recent_set.discard(self._recent[0])
+        self._recent.append(text)
+        self._recent_set.add(text)
+
+    def _emit(self, text):
+        if text in self._recent_set:
+            return
+        last = self.lines[-1] if self.lines else None
+        last_text = last[1] if self.keep_timestamps and last else last
+        if last_text and text.startswith(last_text + " "):
+            # Cue crescente: a nova linha contém a anterior, substitui
+            self.lines[-1] = (last[0], text) if self.keep_timestamps else text
+        else:
+            self.lines.append((self._cue_start(), text) if self.keep_timestamps else text)
+        self._remember(text)
+
+    def feed(self, line):
+        self.feed_lines((line,))
+
+    def feed_lines(self, lines):
+        # Laço único com variáveis locais: este é o caminho quente do parser
+        in_cue = self._in_cue
+        emit = self._emit
+        tag_sub = _TAG_RE.sub
+        for line in lines:
+            line = line.rstrip('\r\n')
+            if not line:
+                # Só a linha realmente vazia encerra a cue (o YouTube usa linhas com " ")
+                in_cue = False
+                continue
+            if '-->' in line:
+                # O horário só é convertido se a cue gerar texto novo com timestamps
+                self._timing_line = line
+                in_cue = True
+                continue
+            if not in_cue:
+                continue
+            if '<' in line:
+                line = tag_sub('', line)
+            if '&' in line:
+                line = html.unescape(line)
+            clean = " ".join(line.split())
+            if clean:
+                emit(clean)
+        self._in_cue = in_cue
+        return self
+
+    def text(self):
+        if self.keep_timestamps:
+            return " ".join(text for _, text in self.lines)
+        return " ".join(self.lines)
+
+
+def parse_vtt(content, keep_timestamps=False, window=10):
+    """Converte um payload VTT (str) em texto corrido.
+
+    Com ``keep_timestamps`` retorna a lista ``[(inicio_em_segundos, texto)]``.
+    """
+    parser = VTTParser(window, keep_timestamps).feed_lines(content.splitlines())
+    return parser.lines if keep_timestamps else parser.text()
+
+
+def parse_vtt_file(path, keep_timestamps=False, window=10):
+    """Lê o arquivo em streaming, sem carregá-lo inteiro na memória"""
+    with open(path, 'r', encoding='utf-8') as f:
+        parser = VTTParser(window, keep_timestamps).feed_lines(f)
+    return parser.lines if keep_timestamps else parser.text()
+
+
+def parse_vtt_batch(payloads, keep_timestamps=False, window=10):
+    """Converte vários payloads VTT em memória, sem tocar no disco"""
+    return [parse_vtt(content, keep_timestamps, window) for content in payloads]
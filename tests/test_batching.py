@@ -0,0 +1,82 @@
+"""BatchingStage: só caminhos e limites vão ao processo, que decodifica as janelas."""
+import os
+import sys
+import unittest
+from unittest import mock
+from concurrent.futures import Future
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+import inference_engine  # noqa: E402
+from audio import SAMPLE_RATE  # noqa: E402
+from batching import BatchingStage, WINDOW_SECONDS, plan_windows  # noqa: E402
+
+
+def fake_audio(seconds):
+    rng = np.random.default_rng(1)
+    samples = (rng.standard_normal(int(seconds * SAMPLE_RATE)) * 0.3).astype(np.float32)
+    # Pausas perto de cada corte nominal (27 s, 54 s, ...)
+    for cut in np.arange(27.0, seconds, 27.0):
+        samples[int((cut + 0.6) * SAMPLE_RATE):int((cut + 1.0) * SAMPLE_RATE)] *= 1e-4
+    return samples
+
+
+class FakeEngine:
+    """Roda ``_decode_batch`` no próprio processo, com um modelo que devolve a duração"""
+    workers = 1
+
+    def __init__(self):
+        self.batches = []
+
+    def submit_batch(self, windows, **options):
+        self.batches.append(windows)
+        future = Future()
+        arrays, timings = inference_engine.load_windows(windows)
+        future.set_result(([f"{len(a) / SAMPLE_RATE:.2f}" for a in arrays], timings))
+        return future
+
+
+class BatchingTest(unittest.TestCase):
+    def setUp(self):
+        self.files = {"a.webm": fake_audio(100), "b.webm": fake_audio(20)}
+        self.decodes = []
+
+        def load_audio(source, start=None, duration=None, is_cancelled=None):
+            self.decodes.append(source)
+            first = int((start or 0) * SAMPLE_RATE)
+            last = None if duration is None else first + int(duration * SAMPLE_RATE)
+            return self.files[source][first:last]
+
+        patcher = mock.patch.object(inference_engine, "load_audio", load_audio)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_plan_windows_never_exceed_whisper_context(self):
+        self.assertEqual(plan_windows(20), [(0.0, None, 1.5)])
+        windows = plan_windows(100)
+        self.assertEqual([w[0] for w in windows], [0.0, 27.0, 54.0, 81.0])
+        self.assertIsNone(windows[-1][1])
+
+    def test_windows_are_decoded_in_the_worker(self):
+        engine = FakeEngine()
+        stage = BatchingStage(engine, batch_size=8, max_latency=0.05)
+        timings = {}
+        long_video = stage.put("a.webm", 100, on_timings=timings.update)
+        short_video = stage.put("b.webm", 20)
+        stage.close()
+
+        lengths = [float(t) for t in long_video.result(5).split()]
+        self.assertAlmostEqual(sum(lengths), 100.0, delta=0.01)
+        self.assertTrue(all(length <= WINDOW_SECONDS for length in lengths))
+        # Cada corte caiu na pausa logo depois do corte nominal
+        self.assertAlmostEqual(lengths[0], 27.8, delta=0.1)
+        self.assertEqual(short_video.result(5), "20.00")
+        # Só tuplas (caminho, limites) chegam ao processo, e cada arquivo é decodificado uma vez
+        self.assertTrue(all(isinstance(w[0], str) for batch in engine.batches for w in batch))
+        self.assertEqual(sorted(self.decodes), ["a.webm", "b.webm"])
+        self.assertIn("decode", timings)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+"""Cancelar uma execução com mais vídeos na fila que vagas termina sem exceção."""
+import io
+import os
+import sys
+import time
+import shutil
+import tempfile
+import threading
+import contextlib
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+import transcriber  # noqa: E402
+
+VTT = "WEBVTT\n\n00:00:00.000 --> 00:00:05.000\numa legenda longa o bastante para dispensar a transcrição\n"
+
+
+class SlowYDL:
+    """Playlist de 50 vídeos; cada consulta de vídeo demora 50 ms"""
+
+    def __init__(self, opts):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def extract_info(self, url, download=False, process=True, **kwargs):
+        if "watch" in url:
+            time.sleep(0.05)
+            return {"id": url.split("=")[1], "subtitles": {"pt": [{"ext": "vtt", "url": "u"}]},
+                    "automatic_captions": {}}
+        entries = ({"id": f"v{i}", "title": f"Video {i}", "duration": 60} for i in range(50))
+        return {"_type": "playlist", "title": "PL", "entries": entries if not process else list(entries)}
+
+    def urlopen(self, url):
+        return contextlib.closing(io.BytesIO(VTT.encode()))
+
+
+class CancelRunTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.original = transcriber.YoutubeDL
+        transcriber.YoutubeDL = SlowYDL
+        self.events = []
+        self.core = transcriber.TranscriberCore(use_cache=False, progress_callback=self.events.append)
+
+    def tearDown(self):
+        transcriber.YoutubeDL = self.original
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def cancel_run(self, stream):
+        timer = threading.Timer(0.5, self.core.cancel)
+        timer.start()
+        try:
+            self.core.run_playlist("pl", self.folder, max_workers=1, max_queued=1, stream=stream)
+        finally:
+            timer.cancel()
+        finish = [e for e in self.events if e["event"] == "finish"]
+        self.assertEqual(len(finish), 1)
+        self.assertTrue(finish[0]["cancelled"])
+        self.assertLess(finish[0]["success"], 50)
+
+    def test_cancel_with_queued_videos(self):
+        self.cancel_run(stream=False)
+
+    def test_cancel_while_streaming(self):
+        self.cancel_run(stream=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
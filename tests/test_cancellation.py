@@ -0,0 +1,95 @@
+"""Cancelamento da inferência do openai-whisper, com um pacote ``whisper`` substituto.
+
+O substituto reproduz a estrutura do original: ``whisper/__init__`` importa a
+função ``transcribe`` por cima do módulo de mesmo nome, e o laço de segmentos
+atualiza uma barra ``tqdm`` a cada janela.
+"""
+import os
+import sys
+import shutil
+import tempfile
+import textwrap
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+import cancellation  # noqa: E402
+from cancellation import OperationCancelled, cancel_scope  # noqa: E402
+
+STAND_INS = {
+    "tqdm/__init__.py": """
+        class tqdm:
+            def __init__(self, *args, **kwargs):
+                pass
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                return False
+
+            def update(self, n=1):
+                pass
+    """,
+    "whisper/__init__.py": """
+        from .transcribe import transcribe
+    """,
+    "whisper/transcribe.py": """
+        import tqdm
+
+        def transcribe(model, audio, segments=20, **options):
+            done = []
+            with tqdm.tqdm(total=segments, disable=True) as pbar:
+                for i in range(segments):
+                    done.append(i)
+                    pbar.update(1)
+            return {"text": "", "segments": done}
+    """,
+}
+
+
+class WhisperCancellationTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        for name, code in STAND_INS.items():
+            path = os.path.join(self.folder, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(textwrap.dedent(code))
+        self.saved = {name: sys.modules.pop(name) for name in list(sys.modules)
+                      if name.split(".")[0] in ("whisper", "tqdm")}
+        sys.path.insert(0, self.folder)
+        cancellation._hook_installed = False
+
+    def tearDown(self):
+        sys.path.remove(self.folder)
+        for name in list(sys.modules):
+            if name.split(".")[0] in ("whisper", "tqdm"):
+                del sys.modules[name]
+        sys.modules.update(self.saved)
+        cancellation._hook_installed = False
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def test_cancel_stops_at_next_segment(self):
+        import whisper
+        checks = []
+
+        def is_cancelled():
+            checks.append(1)
+            return len(checks) >= 3
+
+        with self.assertRaises(OperationCancelled):
+            with cancel_scope(is_cancelled):
+                whisper.transcribe(None, None, segments=20)
+        self.assertEqual(len(checks), 3)
+
+    def test_no_scope_runs_every_segment(self):
+        import whisper
+        with cancel_scope(lambda: False):
+            result = whisper.transcribe(None, None, segments=5)
+        # Fora de um escopo cancelado, o gancho não interfere
+        self.assertEqual(len(whisper.transcribe(None, None, segments=4)["segments"]), 4)
+        self.assertEqual(len(result["segments"]), 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+"""Checkpoint do processamento em janelas: só é retomado com a mesma configuração."""
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+import chunked  # noqa: E402
+from audio import SAMPLE_RATE  # noqa: E402
+
+
+class FakeModel:
+    """Numera as janelas transcritas: "janela1", "janela2", ..."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def transcribe(self, audio, **options):
+        self.calls += 1
+        text = f" janela{self.calls}"
+        return {"text": text, "segments": [{"start": 0.0, "end": 1.0, "text": text}]}
+
+
+class CheckpointTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.path = os.path.join(self.folder, "vid_base.json")
+        self.starts = []
+
+        def iter_audio_windows(source, window, overlap, start=0.0, is_cancelled=None):
+            self.starts.append(start)
+            for offset in (0.0, 10.0):
+                if offset + 10.0 > start:
+                    yield offset, np.full(10 * SAMPLE_RATE, 0.3, np.float32)
+
+        patcher = mock.patch.object(chunked, "iter_audio_windows", iter_audio_windows)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def interrupted_run(self, trim_silence, language):
+        chunked.save_checkpoint(self.path, {
+            "window": 10.0, "overlap": 0.0, "trim_silence": trim_silence, "language": language,
+            "next_offset": 10.0, "segments": [{"start": 0.0, "end": 1.0, "text": " antigo"}],
+        })
+
+    def transcribe(self, trim_silence=False, **options):
+        return chunked.transcribe_chunked(FakeModel(), "audio.webm", checkpoint=self.path, window=10.0,
+                                          overlap=0.0, trim_silence=trim_silence, **options)
+
+    def test_resumes_with_same_settings(self):
+        self.interrupted_run(False, "pt")
+        self.assertEqual(self.transcribe(language="pt"), "antigo janela1")
+        self.assertEqual(self.starts, [10.0])
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_other_language_starts_over(self):
+        self.interrupted_run(False, "pt")
+        self.assertEqual(self.transcribe(language="en"), "janela1 janela2")
+        self.assertEqual(self.starts, [0.0])
+
+    def test_other_trim_setting_starts_over(self):
+        self.interrupted_run(False, None)
+        self.assertNotIn("antigo", self.transcribe(trim_silence=True))
+        self.assertEqual(self.starts, [0.0])
+
+    def test_checkpoint_without_settings_is_discarded(self):
+        chunked.save_checkpoint(self.path, {"window": 10.0, "overlap": 0.0, "next_offset": 10.0,
+                                            "segments": [{"start": 0.0, "end": 1.0, "text": " antigo"}]})
+        self.assertIsNone(chunked.load_checkpoint(self.path, 10.0, 0.0))
+
+    def test_saved_state_records_settings(self):
+        with mock.patch.object(chunked, "save_checkpoint") as save:
+            self.transcribe(trim_silence=True, language="pt")
+        state = save.call_args[0][1]
+        self.assertEqual((state["trim_silence"], state["language"]), (True, "pt"))
+
+
+if __name__ == "__main__":
+    unittest.main()
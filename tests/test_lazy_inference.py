@@ -0,0 +1,109 @@
+"""O pool de inferência só sobe no primeiro vídeo que precisa da IA."""
+import io
+import os
+import sys
+import shutil
+import tempfile
+import contextlib
+import unittest
+from concurrent.futures import Future
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+import transcriber  # noqa: E402
+
+VTT = "WEBVTT\n\n00:00:00.000 --> 00:00:05.000\numa legenda longa o bastante para dispensar a transcrição\n"
+
+
+def fake_youtube(captioned):
+    class FakeYDL:
+        def __init__(self, opts):
+            pass
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *args):
+            pass
+
+        def extract_info(self, url, download=False, process=True, **kwargs):
+            if "watch" in url:
+                vid_id = url.split("=")[1]
+                captions = {"pt": [{"ext": "vtt", "url": "u"}]} if vid_id in captioned else {}
+                return {"id": vid_id, "subtitles": captions, "automatic_captions": {}}
+            return {"_type": "playlist", "title": "PL",
+                    "entries": [{"id": "v0", "title": "Video 0", "duration": 60},
+                                {"id": "v1", "title": "Video 1", "duration": 60}]}
+
+        def urlopen(self, url):
+            return contextlib.closing(io.BytesIO(VTT.encode()))
+
+    return FakeYDL
+
+
+class FakeStage:
+    def __init__(self):
+        self.videos = []
+
+    def put(self, audio, on_done=None, on_timings=None, **options):
+        self.videos.append(audio)
+        future = Future()
+        future.set_running_or_notify_cancel()
+        future.set_result(on_done("texto transcrito pela inferência de teste", None))
+        return future
+
+    def cancel(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class FakeEngine:
+    def shutdown(self, cancel_futures=False):
+        pass
+
+
+class LazyInferenceTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.audio = os.path.join(self.folder, "audio.webm")
+        with open(self.audio, "wb") as f:
+            f.write(b"audio")
+        self.core = transcriber.TranscriberCore(use_cache=False, inference_mode="process",
+                                                chunk_seconds=None, trim_silence=False)
+        self.core.has_ffmpeg = self.core.has_whisper = True
+        self.core.obtain_audio = lambda *args, **kwargs: self.audio
+        self.starts = []
+        self.stage = FakeStage()
+
+        def start_inference_stage(max_workers):
+            self.starts.append(max_workers)
+            return FakeEngine(), self.stage
+
+        self.core.start_inference_stage = start_inference_stage
+
+    def tearDown(self):
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def run_playlist(self, captioned):
+        original = transcriber.YoutubeDL
+        transcriber.YoutubeDL = fake_youtube(captioned)
+        try:
+            self.core.run_playlist("pl", os.path.join(self.folder, "out"), max_workers=2)
+        finally:
+            transcriber.YoutubeDL = original
+
+    def test_captions_only_run_starts_no_processes(self):
+        self.run_playlist({"v0", "v1"})
+        self.assertEqual(self.starts, [])
+        self.assertEqual(len(os.listdir(os.path.join(self.folder, "out"))), 3)
+
+    def test_first_ai_fallback_starts_pool_once(self):
+        self.run_playlist(set())
+        self.assertEqual(self.starts, [2])
+        self.assertEqual(self.stage.videos, [self.audio, self.audio])
+        self.assertIsNone(self.core._ai_stage)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+"""RunMetrics: arquivo do Prometheus (textfile collector) e log JSON-lines."""
+import os
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+import metrics  # noqa: E402
+from metrics import RunMetrics  # noqa: E402
+
+
+class RunMetricsTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.prom = os.path.join(self.folder, "textfile", "transcriber.prom")
+        self.log = os.path.join(self.folder, "run.jsonl")
+        self.metrics = RunMetrics(log_path=self.log, prometheus_path=self.prom)
+
+    def tearDown(self):
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def test_prometheus_textfile(self):
+        self.metrics.record("v1", metrics.INFERENCE, 2.5)
+        self.metrics.count("videos", result="ok")
+        with mock.patch.object(metrics.os, "replace", wraps=os.replace) as replace:
+            self.metrics.flush(force=True)
+
+        replace.assert_called_once_with(f"{self.prom}.tmp", self.prom)
+        self.assertEqual(os.listdir(os.path.dirname(self.prom)), ["transcriber.prom"])
+        with open(self.prom, encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        self.assertIn("# TYPE transcriber_stage_seconds summary", lines)
+        self.assertIn('transcriber_stage_seconds{stage="inference",quantile="0.5"} 2.500000', lines)
+        self.assertIn('transcriber_stage_seconds_sum{stage="inference"} 2.500000', lines)
+        self.assertIn('transcriber_stage_seconds_count{stage="inference"} 1', lines)
+        self.assertIn("# TYPE transcriber_videos_total counter", lines)
+        self.assertIn('transcriber_videos_total{result="ok"} 1', lines)
+
+    def test_flush_is_rate_limited(self):
+        self.metrics.flush(force=True)
+        self.metrics.count("cache_hits")
+        self.metrics.flush()
+        with open(self.prom, encoding="utf-8") as f:
+            self.assertNotIn("cache_hits", f.read())
+        self.metrics.flush(force=True)
+        with open(self.prom, encoding="utf-8") as f:
+            self.assertIn("transcriber_cache_hits_total 1", f.read().splitlines())
+
+    def test_label_values_are_escaped(self):
+        self.metrics.error("write", OSError('disco "cheio"'))
+        self.metrics.count("errors", stage='a"b', type="X")
+        text = self.metrics.render_prometheus()
+        self.assertIn('transcriber_errors_total{stage="write",type="OSError"} 1', text)
+        self.assertIn('transcriber_errors_total{stage="a\\"b",type="X"} 1', text)
+
+    def test_json_lines_log(self):
+        self.metrics.record("v1", metrics.DECODE, 0.25, bytes=1024)
+        self.metrics.count("videos", result="ok")
+        self.metrics.log({"event": "finish", "success": 1})
+        with open(self.log, encoding="utf-8") as f:
+            events = [json.loads(line) for line in f]
+        self.assertEqual([e["event"] for e in events], ["stage", "count", "finish"])
+        self.assertTrue(all("ts" in e for e in events))
+        self.assertEqual({k: events[0][k] for k in ("vid_id", "stage", "seconds", "bytes")},
+                         {"vid_id": "v1", "stage": "decode", "seconds": 0.25, "bytes": 1024})
+        self.assertEqual((events[1]["name"], events[1]["result"]), ("videos", "ok"))
+
+
+if __name__ == "__main__":
+    unittest.main()
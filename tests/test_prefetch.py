@@ -0,0 +1,55 @@
+"""AudioPrefetcher: ``take`` não espera downloads que ainda estão na fila."""
+import os
+import sys
+import time
+import shutil
+import tempfile
+import threading
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from prefetch import AudioPrefetcher  # noqa: E402
+
+
+class PrefetchTakeTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.release = threading.Event()
+        self.started = []
+
+        def download(video_url, vid_id, info=None, is_cancelled=None):
+            self.started.append(vid_id)
+            self.release.wait(5)
+            path = os.path.join(self.folder, f"{vid_id}.webm")
+            with open(path, "wb") as f:
+                f.write(b"audio")
+            return path
+
+        self.prefetcher = AudioPrefetcher(workers=1, download=download)
+
+    def tearDown(self):
+        self.release.set()
+        self.prefetcher.clear()
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def test_queued_prefetch_is_cancelled_instead_of_awaited(self):
+        self.prefetcher.start("url", "ahead", duration=60)
+        self.prefetcher.start("url", "current", duration=60)
+        while not self.started:
+            time.sleep(0.01)
+
+        started = time.monotonic()
+        self.assertIsNone(self.prefetcher.take("current"))
+        self.assertLess(time.monotonic() - started, 1.0)
+        self.assertFalse(self.prefetcher.pending("current"))
+        self.assertEqual(self.prefetcher.stats["not_started"], 1)
+
+        self.release.set()
+        path = self.prefetcher.take("ahead")
+        self.assertEqual(path, os.path.join(self.folder, "ahead.webm"))
+        self.assertEqual(self.started, ["ahead"])
+        self.assertEqual(self.prefetcher._reserved, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,223 @@
+"""RequestScheduler: backoff, Retry-After e ajuste AIMD da concorrência por host."""
+import os
+import sys
+import time
+import threading
+import unittest
+import urllib.error
+import urllib.request
+from unittest import mock
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from request_scheduler import RequestScheduler, error_status, retry_after  # noqa: E402
+
+HOST = "www.youtube.com"
+
+
+class HTTPStatus(Exception):
+    def __init__(self, code, headers=None):
+        super().__init__(f"HTTP Error {code}")
+        self.code = code
+        self.headers = headers or {}
+
+
+def fail_with(code, headers=None):
+    def fn():
+        raise HTTPStatus(code, headers)
+    return fn
+
+
+class BackoffTest(unittest.TestCase):
+    def test_exponential_with_full_jitter(self):
+        scheduler = RequestScheduler(base_delay=1.0, max_delay=10.0)
+        with mock.patch("request_scheduler.random.uniform", side_effect=lambda a, b: b):
+            self.assertEqual([scheduler.backoff(n) for n in range(5)], [1.0, 2.0, 4.0, 8.0, 10.0])
+        with mock.patch("request_scheduler.random.uniform", side_effect=lambda a, b: a):
+            self.assertEqual(scheduler.backoff(3), 0)
+
+    def test_retry_after_takes_precedence(self):
+        scheduler = RequestScheduler(base_delay=1.0, max_delay=10.0)
+        self.assertEqual(scheduler.backoff(0, HTTPStatus(429, {"Retry-After": "7"})), 7.0)
+        self.assertEqual(scheduler.backoff(0, HTTPStatus(429, {"Retry-After": "120"})), 10.0)
+        self.assertIsNone(retry_after(HTTPStatus(429, {"Retry-After": "amanhã"})))
+
+    def test_error_status_from_message(self):
+        self.assertEqual(error_status(Exception("HTTP Error 503: Service Unavailable")), 503)
+        self.assertIsNone(error_status(ValueError("sem código")))
+
+    def test_gives_up_after_max_retries(self):
+        scheduler = RequestScheduler(max_retries=2, base_delay=0.0, rate_per_host=1000, burst=1000)
+        with self.assertRaises(HTTPStatus):
+            scheduler.call(fail_with(503), HOST)
+        self.assertEqual(scheduler.stats, {"requests": 3, "retries": 2, "throttled": 0, "errors": 1})
+
+    def test_client_errors_are_not_retried(self):
+        scheduler = RequestScheduler(base_delay=0.0)
+        with self.assertRaises(HTTPStatus):
+            scheduler.call(fail_with(404), HOST)
+        self.assertEqual(scheduler.stats["requests"], 1)
+        self.assertEqual(scheduler.limit(HOST), scheduler.max_concurrency)
+
+
+class RetryAfterServerTest(unittest.TestCase):
+    """O 429 de um servidor local pede Retry-After: 0.3; a segunda tentativa passa."""
+
+    def setUp(self):
+        hits = self.hits = []
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                hits.append(time.monotonic())
+                if len(hits) == 1:
+                    self.send_response(429)
+                    self.send_header("Retry-After", "0.3")
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                else:
+                    body = b"ok"
+                    self.send_response(200)
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/timedtext"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_waits_retry_after_then_succeeds(self):
+        scheduler = RequestScheduler(max_concurrency=4, base_delay=5.0)
+        body = scheduler.call(lambda: urllib.request.urlopen(self.url, timeout=5).read(), self.url)
+        self.assertEqual(body, b"ok")
+        self.assertEqual(len(self.hits), 2)
+        # base_delay de 5 s: só o Retry-After explica uma espera tão curta
+        self.assertGreaterEqual(self.hits[1] - self.hits[0], 0.3)
+        self.assertLess(self.hits[1] - self.hits[0], 2.0)
+        self.assertEqual(scheduler.stats["throttled"], 1)
+        self.assertEqual(scheduler.limit("127.0.0.1"), 2)
+
+    def test_http_error_status_is_recognised(self):
+        with self.assertRaises(urllib.error.HTTPError) as caught:
+            urllib.request.urlopen(self.url, timeout=5)
+        self.assertEqual(error_status(caught.exception), 429)
+        self.assertEqual(retry_after(caught.exception), 0.3)
+
+
+class AimdTest(unittest.TestCase):
+    def scheduler(self, **kwargs):
+        return RequestScheduler(max_concurrency=8, base_delay=0.0, rate_per_host=1000, burst=1000,
+                                **kwargs)
+
+    def test_throttling_halves_limit_down_to_minimum(self):
+        scheduler = self.scheduler(min_concurrency=2)
+        responses = iter([HTTPStatus(429), HTTPStatus(429), HTTPStatus(429), None])
+
+        def fn():
+            error = next(responses)
+            if error:
+                raise error
+            return "ok"
+
+        self.assertEqual(scheduler.call(fn, HOST), "ok")
+        # 8 -> 4 -> 2 e para no mínimo
+        self.assertEqual(scheduler.limit(HOST), 2)
+        self.assertEqual(scheduler.stats["throttled"], 3)
+
+    def test_one_decrease_per_response_time(self):
+        scheduler = self.scheduler()
+        scheduler._host(HOST).latency = 60.0
+        responses = iter([HTTPStatus(503), HTTPStatus(503), HTTPStatus(503), None])
+
+        def fn():
+            error = next(responses)
+            if error:
+                raise error
+
+        scheduler.call(fn, HOST)
+        # As três falhas chegam dentro do mesmo tempo de resposta: só a primeira conta
+        self.assertEqual(scheduler.limit(HOST), 4)
+
+    def test_successes_increase_limit_additively(self):
+        scheduler = self.scheduler(min_concurrency=1, target_latency=1.0)
+        state = scheduler._host(HOST)
+        state.limit = 1.0
+        scheduler.call(lambda: None, HOST)
+        # Com o limite em uso (1 de 1), o sucesso soma 1/limite
+        self.assertEqual(scheduler.limit(HOST), 2.0)
+        # Chamadas em sequência não usam as 2 vagas: o limite não sobe mais
+        scheduler.call(lambda: None, HOST)
+        self.assertEqual(scheduler.limit(HOST), 2.0)
+        # Duas ao mesmo tempo ocupam o limite: a primeira a terminar soma 1/2
+        with ThreadPoolExecutor(2) as executor:
+            list(executor.map(lambda _: scheduler.call(lambda: time.sleep(0.05), HOST), range(2)))
+        self.assertAlmostEqual(scheduler.limit(HOST), 2.5)
+
+    def test_slow_responses_do_not_increase_limit(self):
+        scheduler = self.scheduler(target_latency=0.01)
+        scheduler._host(HOST).limit = 1.0
+        scheduler.call(lambda: time.sleep(0.05), HOST)
+        self.assertEqual(scheduler.limit(HOST), 1.0)
+
+    def test_hosts_have_separate_limits(self):
+        scheduler = self.scheduler()
+        responses = iter([HTTPStatus(429), None])
+
+        def fn():
+            error = next(responses)
+            if error:
+                raise error
+
+        scheduler.call(fn, "rr.googlevideo.com")
+        self.assertEqual(scheduler.limit("rr.googlevideo.com"), 4)
+        self.assertEqual(scheduler.limit(HOST), 8)
+
+
+class TransferTest(unittest.TestCase):
+    def test_transfers_do_not_hold_slots_or_feed_latency(self):
+        scheduler = RequestScheduler(max_concurrency=1, rate_per_host=1000, burst=1000)
+        release = threading.Event()
+        started = threading.Event()
+
+        def download():
+            started.set()
+            release.wait(5)
+
+        worker = threading.Thread(target=scheduler.call, args=(download, "rr.googlevideo.com"),
+                                  kwargs={"transfer": True})
+        worker.start()
+        started.wait(5)
+        try:
+            # Com limite 1 no host, uma segunda transferência ainda consegue começar
+            second = threading.Event()
+            scheduler.call(second.set, "rr.googlevideo.com", transfer=True)
+            self.assertTrue(second.is_set())
+        finally:
+            release.set()
+            worker.join(5)
+        state = scheduler._host("rr.googlevideo.com")
+        self.assertEqual(state.in_flight, 0)
+        self.assertIsNone(state.latency)
+
+    def test_transfer_throttling_still_decreases_limit(self):
+        scheduler = RequestScheduler(max_concurrency=4, base_delay=0.0, rate_per_host=1000, burst=1000)
+        responses = iter([HTTPStatus(429), None])
+
+        def fn():
+            error = next(responses)
+            if error:
+                raise error
+
+        scheduler.call(fn, "rr.googlevideo.com", transfer=True)
+        self.assertEqual(scheduler.limit("rr.googlevideo.com"), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+"""Diário do manifesto: reaplicado após interrupção e compactado no ``close``."""
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from run_manifest import RunManifest, AI_DONE, FAILED, PENDING  # noqa: E402
+
+
+class RunManifestTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def finish(self, manifest, vid_id):
+        open(os.path.join(self.folder, f"{vid_id}.txt"), "w").close()
+        manifest.update(vid_id, AI_DONE, filepath=f"{vid_id}.txt", path="ai")
+
+    def test_interrupted_run_is_replayed(self):
+        manifest = RunManifest(self.folder)
+        manifest.start_run("url", ["a", "b", "c"])
+        self.finish(manifest, "a")
+        manifest.update("b", FAILED, reason="erro")
+        # Sem close: simula a execução interrompida, com uma linha cortada no fim
+        manifest._journal.write('{"op": "upd')
+        manifest._journal.flush()
+
+        resumed = RunManifest(self.folder)
+        self.assertTrue(resumed.is_done("a"))
+        self.assertEqual(resumed.entry("b")["state"], FAILED)
+        self.assertEqual(resumed.entry("c")["state"], PENDING)
+        self.assertEqual(resumed.data["playlist_url"], "url")
+
+    def test_close_compacts_journal(self):
+        manifest = RunManifest(self.folder)
+        manifest.start_run("url", ["a", "b"])
+        self.finish(manifest, "a")
+        manifest.close()
+        self.assertFalse(os.path.exists(manifest.journal_path))
+
+        reloaded = RunManifest(self.folder)
+        self.assertTrue(reloaded.is_done("a"))
+        self.assertFalse(reloaded.is_done("b"))
+        # Uma nova execução não remarca como pendente o que já terminou
+        reloaded.start_run("url", ["a", "b"])
+        self.assertEqual(reloaded.entry("a")["state"], AI_DONE)
+        reloaded.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+"""SelectionModel: seleção em bitmap, Shift-clique e filtro, sem Tk."""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from selection import SelectionModel, format_duration  # noqa: E402
+
+TITLES = ["Aula 1", "Aula 2", "[Deleted video]", "Aula 3", "Extra: Revisão",
+          "Aula 4", "[Private video]", "Aula 5", "Extra: Exercícios", "Aula 10"]
+
+
+def playlist():
+    return [{"id": f"v{i}", "title": title} for i, title in enumerate(TITLES)]
+
+
+class SelectionModelTest(unittest.TestCase):
+    def setUp(self):
+        self.model = SelectionModel(playlist())
+
+    def test_starts_selected_without_unavailable_videos(self):
+        self.assertEqual(self.model.total(), 8)
+        self.assertEqual(self.model.count(), 8)
+        self.assertEqual(self.model.selected_indices(), [0, 1, 3, 4, 5, 7, 8, 9])
+        self.assertEqual(SelectionModel(playlist(), selected=False).count(), 0)
+
+    def test_select_none_and_all(self):
+        self.model.set_all(False)
+        self.assertEqual((self.model.count(), self.model.selected_indices()), (0, []))
+        self.model.set_all(True)
+        self.assertEqual(self.model.count(), 8)
+        self.assertFalse(self.model.is_selected(2))
+
+    def test_toggle_sets_anchor(self):
+        self.assertFalse(self.model.toggle(1))
+        self.assertEqual(self.model.anchor, (1, False))
+        self.assertFalse(self.model.is_selected(1))
+        self.assertTrue(self.model.toggle(1))
+        self.assertEqual(self.model.count(), 8)
+
+    def test_extend_to_applies_anchor_value_in_both_directions(self):
+        self.model.toggle(2)                    # "Aula 3" desmarcada
+        self.model.extend_to(5)                 # até "Aula 5", pulando o privado
+        self.assertEqual(self.model.selected_indices(), [0, 1, 8, 9])
+        self.model.set_all(False)
+        self.model.toggle(6)                    # "Extra: Exercícios" marcada
+        self.assertTrue(self.model.extend_to(4))
+        self.assertEqual(self.model.selected_indices(), [5, 7, 8])
+
+    def test_extend_without_anchor_toggles(self):
+        self.assertFalse(self.model.extend_to(0))
+        self.assertEqual(self.model.anchor, (0, False))
+
+    def test_filter_narrows_and_resets(self):
+        self.assertEqual(self.model.filter("aula"), [0, 1, 3, 5, 7, 9])
+        self.assertEqual(self.model.filter("AULA 1"), [0, 9])
+        # Texto que não estende o anterior volta a procurar na playlist inteira
+        self.assertEqual(self.model.filter("extra"), [4, 8])
+        self.assertEqual(self.model.filter("video"), [])
+        self.assertEqual(self.model.filter("  "), self.model.view)
+        self.assertEqual(len(self.model.view), 8)
+
+    def test_count_after_filter_covers_whole_playlist(self):
+        self.model.toggle(0)
+        self.model.filter("extra")
+        self.assertIsNone(self.model.anchor)
+        self.model.set_all(False)
+        # Só as filtradas foram desmarcadas; o total conta a playlist toda
+        self.assertEqual(self.model.count(), 5)
+        self.assertEqual(self.model.selected_indices(), [1, 3, 5, 7, 9])
+        self.model.extend_to(1)                 # sem âncora após o filtro: inverte a linha
+        self.assertEqual(self.model.count(), 6)
+        self.model.filter("")
+        self.assertEqual(self.model.count(), 6)
+
+    def test_format_duration(self):
+        self.assertEqual(format_duration(3725), "1:02:05")
+        self.assertEqual(format_duration(65), "1:05")
+        self.assertEqual(format_duration(None), "--:--")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+"""Cache de transcrições: LRU por último acesso, contagem de bytes e fonte por modelo."""
+import os
+import sys
+import shutil
+import tempfile
+import itertools
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+import transcript_cache  # noqa: E402
+from transcript_cache import TranscriptCache  # noqa: E402
+
+
+class TranscriptCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        # Relógio que sempre avança, para a ordem do LRU não depender da resolução de time.time()
+        clock = itertools.count(1000)
+        patcher = mock.patch.object(transcript_cache, "time", SimpleNamespace(time=lambda: float(next(clock))))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cache = TranscriptCache(path=os.path.join(self.folder, "cache", "transcripts.db"), max_bytes=30)
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def test_size_counts_utf8_bytes(self):
+        self.cache.put("a", "sub:pt", "ação")
+        self.cache.put("b", "whisper:base", "texto", {"title": "Vídeo B"})
+        stats = self.cache.stats()
+        self.assertEqual((stats["entries"], stats["bytes"]), (2, 6 + 5))
+        self.assertEqual(self.cache.get("b", ["whisper:base"]), ("whisper:base", "texto", {"title": "Vídeo B"}))
+
+    def test_evicts_least_recently_read_entry(self):
+        for vid_id in ("a", "b", "c"):
+            self.cache.put(vid_id, "sub:pt", "x" * 10)
+        # "a" é o mais antigo, mas a leitura o torna o mais recente
+        self.assertIsNotNone(self.cache.get("a", ["sub:*"]))
+        self.cache.put("d", "sub:pt", "x" * 10)
+
+        self.assertIsNone(self.cache.get("b", ["sub:pt"]))
+        self.assertEqual(sorted(row[0] for row in self.cache.entries()), ["a", "c", "d"])
+        self.assertEqual(self.cache.stats()["bytes"], 30)
+
+    def test_contains_does_not_refresh_entry(self):
+        for vid_id in ("a", "b", "c"):
+            self.cache.put(vid_id, "sub:pt", "x" * 10)
+        self.assertTrue(self.cache.contains("a", ["sub:*"]))
+        self.cache.put("d", "sub:pt", "x" * 10)
+        self.assertFalse(self.cache.contains("a", ["sub:*"]))
+
+    def test_other_model_tag_misses(self):
+        self.cache.put("a", "whisper:base", "texto")
+        self.assertIsNone(self.cache.get("a", ["whisper:small"]))
+        self.assertFalse(self.cache.contains("a", ["whisper:small", "sub:*"]))
+        self.assertEqual(self.cache.get("a", ["whisper:small", "whisper:base"])[0], "whisper:base")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+"""Silêncios e cortes calculados no processo de inferência, sobre o áudio já decodificado."""
+import os
+import sys
+import unittest
+from unittest import mock
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+import inference_engine  # noqa: E402
+from audio import SAMPLE_RATE  # noqa: E402
+from vad import boundary_cut, drop_silence, nominal_segments  # noqa: E402
+
+
+def speech_with_pauses(seconds, pauses, seed=0):
+    """Ruído alto ("fala") com silêncios ``[(inicio, fim)]`` em segundos"""
+    rng = np.random.default_rng(seed)
+    samples = (rng.standard_normal(int(seconds * SAMPLE_RATE)) * 0.3).astype(np.float32)
+    for start, end in pauses:
+        samples[int(start * SAMPLE_RATE):int(end * SAMPLE_RATE)] *= 1e-4
+    return samples
+
+
+class FakeModel:
+    def __init__(self):
+        self.lengths = []
+
+    def transcribe(self, audio, **options):
+        self.lengths.append(len(audio) / SAMPLE_RATE)
+        return {"text": f" {len(audio) / SAMPLE_RATE:.1f}s ", "segments": []}
+
+
+class VadTest(unittest.TestCase):
+    def test_nominal_segments(self):
+        self.assertEqual(nominal_segments(100, 80), [(0.0, None, 0.0)])
+        self.assertEqual(nominal_segments(None, 80), [(0.0, None, 0.0)])
+        self.assertEqual(nominal_segments(250, 80),
+                         [(0.0, 80.0, 20.0), (80.0, 160.0, 20.0), (160.0, None, 20.0)])
+
+    def test_drop_silence_reports_skipped_audio(self):
+        samples = speech_with_pauses(30, [(10, 16)])
+        timings = {}
+        kept, mapping = drop_silence(samples, timings)
+        # 6 s de pausa menos 0,5 s de folga de cada lado
+        self.assertAlmostEqual(timings["skipped_seconds"], 5.0, delta=0.1)
+        self.assertAlmostEqual(len(kept) / SAMPLE_RATE, 25.0, delta=0.1)
+        self.assertIn("vad_scan", timings)
+        self.assertEqual(len(mapping), 2)
+
+    def test_drop_silence_keeps_continuous_speech(self):
+        samples = speech_with_pauses(10, [])
+        timings = {}
+        kept, mapping = drop_silence(samples, timings)
+        self.assertIs(kept, samples)
+        self.assertIsNone(mapping)
+        self.assertEqual(timings["skipped_seconds"], 0.0)
+
+    def test_neighbours_agree_on_boundary_cut(self):
+        samples = speech_with_pauses(200, [(93.0, 93.8), (108.2, 108.6)])
+        radius = 20.0
+        # Trecho da esquerda decodificado a partir de 0 s, o da direita a partir de 80 s
+        left = boundary_cut(samples, 100.0, radius)
+        right = boundary_cut(samples[80 * SAMPLE_RATE:], 20.0, radius) + 80 * SAMPLE_RATE
+        self.assertEqual(left, right)
+        self.assertAlmostEqual(left / SAMPLE_RATE, 93.4, delta=0.05)
+
+
+class WorkerTrimTest(unittest.TestCase):
+    def setUp(self):
+        self.samples = speech_with_pauses(200, [(50, 60), (97, 98)])
+
+        def load_audio(source, start=None, duration=None, is_cancelled=None):
+            first = int((start or 0) * SAMPLE_RATE)
+            last = None if duration is None else first + int(duration * SAMPLE_RATE)
+            return self.samples[first:last]
+
+        patcher = mock.patch.object(inference_engine, "load_audio", load_audio)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_trim_happens_on_decoded_audio(self):
+        model = FakeModel()
+        timings = {}
+        inference_engine.transcribe_audio(model, "audio.webm", trim_silence=True, timings=timings)
+        self.assertAlmostEqual(model.lengths[0], 191.0, delta=0.1)
+        self.assertAlmostEqual(timings["skipped_seconds"], 9.0, delta=0.1)
+        self.assertEqual({"decode", "vad_scan", "inference", "skipped_seconds"}, set(timings))
+
+    def test_split_segments_cover_the_file_once(self):
+        model = FakeModel()
+        for clip in nominal_segments(200, 80):
+            inference_engine.transcribe_audio(model, "audio.webm", clip=clip)
+        self.assertAlmostEqual(sum(model.lengths), 200.0, delta=0.01)
+        # O primeiro corte nominal (80 s) foi movido para a pausa em 97-98 s
+        self.assertAlmostEqual(model.lengths[0], 97.5, delta=0.1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+"""Parser WebVTT em streaming comparado com a limpeza original (regex por linha + set)."""
+import os
+import re
+import sys
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from vtt_parser import parse_vtt, parse_vtt_file  # noqa: E402
+
+# Legenda automática do YouTube: cada cue repete a linha anterior e traz a nova
+# com tags de karaokê; a cue de 10 ms seguinte repete a linha sozinha
+ROLLING = """WEBVTT
+Kind: captions
+Language: pt
+
+00:00:00.000 --> 00:00:02.000 align:start position:0%
+ 
+hoje<00:00:00.400><c> vamos</c><00:00:00.800><c> ver</c>
+
+00:00:02.000 --> 00:00:02.010 align:start position:0%
+hoje vamos ver
+ 
+
+00:00:02.010 --> 00:00:04.000 align:start position:0%
+hoje vamos ver
+como<00:00:02.500><c> funciona</c><00:00:03.000><c.colorE5E5E5> o</c><00:00:03.500><c> processo</c>
+
+00:00:04.000 --> 00:00:04.010 align:start position:0%
+como funciona o processo
+
+"""
+
+ENTITIES = """WEBVTT
+
+1
+00:00:00.000 --> 00:00:02.000
+Tom &amp; Jerry
+
+2
+00:00:02.000 --> 00:00:04.000
+<i>caf&eacute;</i> &quot;forte&quot; &lt;3
+"""
+
+DUPLICATES = """WEBVTT
+
+00:00:00.000 --> 00:00:01.000
+olá pessoal
+
+00:00:01.000 --> 00:00:02.000
+olá pessoal
+
+00:00:02.000 --> 00:00:03.000
+olá pessoal
+
+00:00:03.000 --> 00:00:04.000
+tudo bem
+
+00:00:04.000 --> 00:00:05.000
+olá pessoal
+"""
+
+GROWING = """WEBVTT
+
+00:00:01.000 --> 00:00:02.000
+isto é
+
+00:00:02.000 --> 00:00:03.000
+isto é um teste
+
+01:00:03.500 --> 01:00:05.000
+fim
+"""
+
+
+def legacy_vtt_to_text(content):
+    """Implementação original de TranscriberCore.vtt_to_text (para comparação)"""
+    text_lines = []
+    seen_lines = set()
+    for line in content.splitlines():
+        if 'WEBVTT' in line or '-->' in line or not line.strip(): continue
+        clean = re.sub(r'<[^>]+>', '', line).strip()
+        clean = re.sub(r'\d{2}:\d{2}:\d{2}\.\d{3}', '', clean).strip()
+        if clean and clean not in seen_lines:
+            text_lines.append(clean)
+            seen_lines.add(clean)
+            if len(seen_lines) > 10: seen_lines.remove(next(iter(seen_lines)))
+    return " ".join(text_lines)
+
+
+class VttParserTest(unittest.TestCase):
+    def test_rolling_cues_and_inline_tags(self):
+        self.assertEqual(parse_vtt(ROLLING), "hoje vamos ver como funciona o processo")
+        # O parser antigo dá o mesmo texto, mas deixa vazar o cabeçalho
+        self.assertEqual(legacy_vtt_to_text(ROLLING),
+                         "Kind: captions Language: pt hoje vamos ver como funciona o processo")
+
+    def test_html_entities_are_decoded(self):
+        self.assertEqual(parse_vtt(ENTITIES), 'Tom & Jerry café "forte" <3')
+        # O antigo mantinha as entidades e também lia os identificadores das cues
+        self.assertEqual(legacy_vtt_to_text(ENTITIES), "1 Tom &amp; Jerry 2 caf&eacute; &quot;forte&quot; &lt;3")
+
+    def test_duplicate_cues_match_baseline(self):
+        self.assertEqual(parse_vtt(DUPLICATES), "olá pessoal tudo bem")
+        self.assertEqual(parse_vtt(DUPLICATES), legacy_vtt_to_text(DUPLICATES))
+
+    def test_growing_cue_replaces_previous_line(self):
+        self.assertEqual(parse_vtt(GROWING), "isto é um teste fim")
+        self.assertEqual(legacy_vtt_to_text(GROWING), "isto é isto é um teste fim")
+        self.assertEqual(parse_vtt(GROWING, keep_timestamps=True), [(1.0, "isto é um teste"), (3603.5, "fim")])
+
+    def test_file_matches_in_memory_parse(self):
+        folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, folder, True)
+        for content in (ROLLING, ENTITIES, DUPLICATES, GROWING):
+            path = os.path.join(folder, "legenda.vtt")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(content)
+            self.assertEqual(parse_vtt_file(path), parse_vtt(content))
+
+
+if __name__ == "__main__":
+    unittest.main()